@@ -0,0 +1,107 @@
+"""Run many CLI invocations in one process (`co batch`).
+
+Invocations are newline-delimited command lines (shell quoting, # comments)
+or a JSON array whose items are command lines or argument lists. They run in
+order inside a cache_session(), so the resolved protocol, .agent file indexes
+and parse caches are shared between them instead of being rebuilt by every
+process. Output of each invocation is captured into a BatchResult.
+"""
+
+import contextlib
+import io
+import json
+import shlex
+import time
+import traceback
+from collections.abc import Callable, Iterator
+from typing import Any, NamedTuple
+
+from cokodo_agent.cache import cache_session
+
+# Program names accepted (and dropped) in front of an invocation
+PROGRAM_NAMES = frozenset({"co", "cokodo", "cokodo-agent"})
+
+# Commands that cannot run inside a batch: nested batches and stdio servers
+UNSUPPORTED_COMMANDS = frozenset({"batch", "serve"})
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one invocation of a batch."""
+
+    position: int  # 0-based, among the batch's invocations
+    args: list[str]
+    exit_code: int
+    stdout: str
+    stderr: str
+    duration_ms: float
+
+
+def parse_batch(text: str) -> list[list[str]]:
+    """Parse batch input into argument lists; raises ValueError on malformed input."""
+    items: list[Any]
+    if text.lstrip().startswith("["):
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON ({e})") from e
+    else:
+        items = text.splitlines()
+
+    commands = []
+    for number, item in enumerate(items, 1):
+        if isinstance(item, str):
+            try:
+                args = shlex.split(item, comments=True)
+            except ValueError as e:
+                raise ValueError(f"entry {number}: {e}") from e
+        elif isinstance(item, list) and all(isinstance(arg, str) for arg in item):
+            args = list(item)
+        else:
+            raise ValueError(f"entry {number}: expected a command line or a list of arguments")
+        if args and args[0] in PROGRAM_NAMES:
+            args = args[1:]
+        if args:
+            commands.append(args)
+    return commands
+
+
+def _run_one(invoke: Callable[[list[str]], object], args: list[str]) -> tuple[int, str, str]:
+    """Run one invocation with stdout/stderr captured; return (exit_code, stdout, stderr)."""
+    if args[0] in UNSUPPORTED_COMMANDS:
+        return 2, "", f"Error: '{args[0]}' cannot run inside a batch\n"
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            invoke(args)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                exit_code = e.code or 0
+            else:
+                print(e.code, file=stderr)
+                exit_code = 1
+        except Exception:
+            traceback.print_exc(file=stderr)
+            exit_code = 1
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+def run_batch(
+    invoke: Callable[[list[str]], object],
+    commands: list[list[str]],
+    fail_fast: bool = False,
+) -> Iterator[BatchResult]:
+    """
+    Run commands in order and yield one BatchResult each, as soon as it is done.
+
+    invoke runs one argument list the way the CLI entry point would (exiting
+    via SystemExit). With fail_fast, the batch stops after the first failure.
+    """
+    with cache_session():
+        for position, args in enumerate(commands):
+            start = time.perf_counter()
+            exit_code, stdout, stderr = _run_one(invoke, args)
+            duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            yield BatchResult(position, args, exit_code, stdout, stderr, duration_ms)
+            if fail_fast and exit_code != 0:
+                return
@@ -0,0 +1,26 @@
+"""Benchmarks: synthetic .agent trees, timed scenarios and JSON baselines."""
+
+from cokodo_agent.bench.baseline import (
+    Comparison,
+    compare,
+    load_baseline,
+    save_baseline,
+    to_baseline,
+)
+from cokodo_agent.bench.scenarios import SCENARIOS, BenchResult, Scenario, run_scenarios
+from cokodo_agent.bench.synth import SCALES, TreeSpec, generate_tree
+
+__all__ = [
+    "SCALES",
+    "SCENARIOS",
+    "BenchResult",
+    "Comparison",
+    "Scenario",
+    "TreeSpec",
+    "compare",
+    "generate_tree",
+    "load_baseline",
+    "run_scenarios",
+    "save_baseline",
+    "to_baseline",
+]
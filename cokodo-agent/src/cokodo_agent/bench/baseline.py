@@ -0,0 +1,72 @@
+"""JSON baselines of benchmark results and regression checks."""
+
+import json
+import platform
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from cokodo_agent.bench.scenarios import BenchResult
+from cokodo_agent.bench.synth import TreeSpec
+from cokodo_agent.config import VERSION
+
+# Baseline file format version (bump on incompatible changes)
+BASELINE_FORMAT = 1
+
+
+class Comparison(NamedTuple):
+    """Median timing of one scenario in a baseline and a current run."""
+
+    name: str
+    baseline: float
+    current: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline > 0 else float("inf")
+
+    @property
+    def regressed(self) -> bool:
+        return self.ratio > 1 + self.threshold
+
+
+def to_baseline(spec: TreeSpec, results: list[BenchResult]) -> dict[str, Any]:
+    """Serialize results with the tree spec and environment they were measured on."""
+    return {
+        "format": BASELINE_FORMAT,
+        "cokodo_version": VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "spec": spec._asdict(),
+        "results": {r.name: {"min": r.min, "median": r.median, "runs": r.runs} for r in results},
+    }
+
+
+def save_baseline(path: Path, baseline: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> dict[str, Any]:
+    """Load a baseline file; raises ValueError when it is not a supported baseline."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path}: invalid JSON ({e})") from e
+    if not isinstance(data, dict) or data.get("format") != BASELINE_FORMAT:
+        raise ValueError(f"{path}: not a benchmark baseline (format {BASELINE_FORMAT})")
+    return data
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.2
+) -> list[Comparison]:
+    """Compare median timings of the scenarios present in both runs."""
+    comparisons = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is not None:
+            comparisons.append(
+                Comparison(name, float(previous["median"]), float(result["median"]), threshold)
+            )
+    return comparisons
@@ -0,0 +1,116 @@
+"""Timed benchmark scenarios for the lint, diff, sync, parse and context engines."""
+
+import contextlib
+import io
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+from cokodo_agent import config
+from cokodo_agent.config import TECH_STACKS
+from cokodo_agent.lintcache import LintCache
+from cokodo_agent.linter import ProtocolLinter
+from cokodo_agent.parser import HybridParser
+from cokodo_agent.sync import build_context_content, diff_protocol, get_context_files, sync_protocol
+
+
+class Scenario(NamedTuple):
+    """A named operation on a synthetic project root."""
+
+    name: str
+    run: Callable[[Path], object]
+    warmup: int = 1  # untimed runs first (fills caches for the warm scenarios)
+
+
+class BenchResult(NamedTuple):
+    """Timings of one scenario, in seconds."""
+
+    name: str
+    runs: list[float]
+
+    @property
+    def min(self) -> float:
+        return min(self.runs)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.runs)
+
+
+def _lint_cold(root: Path) -> object:
+    return ProtocolLinter(root / ".agent").lint_all()
+
+
+def _lint_warm(root: Path) -> object:
+    agent_dir = root / ".agent"
+    return ProtocolLinter(agent_dir, cache=LintCache(agent_dir)).lint_all()
+
+
+def _diff(root: Path) -> object:
+    return diff_protocol(root / ".agent", offline=True)
+
+
+def _sync(root: Path) -> object:
+    return sync_protocol(root / ".agent", offline=True, dry_run=True)
+
+
+def _parse(root: Path) -> object:
+    return HybridParser().parse_all(root)
+
+
+def _context(root: Path) -> object:
+    agent_dir = root / ".agent"
+    selected = []
+    for stack in [None, *TECH_STACKS]:
+        for task in [None, "coding", "review", *(f"task-{n}" for n in range(10))]:
+            files = get_context_files(agent_dir, stack=stack, task=task)
+            selected.append(build_context_content(agent_dir, files))
+    return selected
+
+
+SCENARIOS = [
+    Scenario("lint-cold", _lint_cold, warmup=0),
+    Scenario("lint-warm", _lint_warm),
+    Scenario("diff", _diff),
+    Scenario("sync-dry-run", _sync),
+    Scenario("parse", _parse),
+    Scenario("context", _context),
+]
+
+
+def run_scenarios(
+    root: Path,
+    scenarios: list[Scenario] | None = None,
+    repeat: int = 5,
+    progress: Callable[[str], None] | None = None,
+) -> list[BenchResult]:
+    """
+    Time each scenario repeat times on the project at root.
+
+    Caches live in a temporary directory for the duration of the run, so the
+    user cache is neither used nor polluted. Console output of the engines
+    (e.g. protocol source messages) is discarded.
+    """
+    results = []
+    saved_cache_dir = config.DEFAULT_CACHE_DIR
+    with tempfile.TemporaryDirectory(prefix="cokodo-bench-cache-") as cache_dir:
+        config.DEFAULT_CACHE_DIR = Path(cache_dir)
+        try:
+            for scenario in scenarios or SCENARIOS:
+                if progress is not None:
+                    progress(scenario.name)
+                runs = []
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for _ in range(scenario.warmup):
+                        scenario.run(root)
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        scenario.run(root)
+                        runs.append(time.perf_counter() - start)
+                results.append(BenchResult(scenario.name, runs))
+        finally:
+            config.DEFAULT_CACHE_DIR = saved_cache_dir
+    return results
@@ -0,0 +1,130 @@
+"""Synthetic project trees for benchmarks.
+
+A tree is the bundled protocol copied to <root>/.agent. It is grown with
+generated markdown documents that link to one another (optionally with
+#anchors), plus project skills and IDE instruction files at the root. The
+generator is deterministic for a given TreeSpec, so two runs on the same
+spec benchmark the same inputs.
+"""
+
+import json
+import random
+import shutil
+from pathlib import Path
+from typing import NamedTuple
+
+from cokodo_agent.fetcher.builtin import BuiltinFetcher
+from cokodo_agent.linter import update_checksums
+
+_WORDS = (
+    "agent protocol rule layer context skill workflow review module session "
+    "journal stack build test deploy cache index anchor link check file"
+).split()
+
+
+class TreeSpec(NamedTuple):
+    """Shape of a synthetic tree."""
+
+    files: int = 200  # generated markdown documents (besides the bundled protocol)
+    file_size: int = 4096  # approximate bytes per document
+    link_density: int = 4  # links per document
+    skills: int = 10  # project skills under skills/_project/
+    ide_files: int = 4  # Cursor rule files (CLAUDE.md, AGENTS.md, GEMINI.md are always added)
+    seed: int = 0
+
+
+SCALES: dict[str, TreeSpec] = {
+    "small": TreeSpec(files=50, file_size=2048, link_density=2, skills=3, ide_files=2),
+    "medium": TreeSpec(),
+    "large": TreeSpec(files=2000, file_size=8192, link_density=8, skills=50, ide_files=20),
+}
+
+
+def _paragraph(rng: random.Random, size: int) -> str:
+    words: list[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def _doc_paths(spec: TreeSpec) -> list[str]:
+    """Relative paths of the generated documents: locked core, project notes, skills."""
+    paths = []
+    for i in range(spec.files):
+        bucket = i % 5
+        if bucket < 3:
+            paths.append(f"core/generated/doc-{i:05d}.md")
+        elif bucket == 3 or spec.skills == 0:
+            paths.append(f"project/notes/note-{i:05d}.md")
+        else:
+            paths.append(f"skills/_project/skill-{i % spec.skills:03d}/ref-{i:05d}.md")
+    return paths
+
+
+def _relative_link(source: str, target: str) -> str:
+    depth = source.count("/")
+    return "../" * depth + target
+
+
+def _document(rng: random.Random, spec: TreeSpec, rel_path: str, targets: list[str]) -> str:
+    sections = max(1, spec.file_size // 512)
+    section_size = max(64, spec.file_size // sections)
+    lines = [f"# {Path(rel_path).stem.replace('-', ' ').title()}", ""]
+    links = [rng.choice(targets) for _ in range(spec.link_density)] if targets else []
+    for j in range(sections):
+        lines += [f"## Section {j}", "", _paragraph(rng, section_size)]
+        # Spread the links over the sections, half of them with an #anchor
+        for k in range(j, len(links), sections):
+            target = links[k]
+            anchor = f"#section-{rng.randrange(sections)}" if k % 2 else ""
+            lines.append(f"See [{Path(target).stem}]({_relative_link(rel_path, target)}{anchor}).")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def generate_tree(root: Path, spec: TreeSpec | None = None) -> Path:
+    """Create a synthetic project under root and return its .agent directory."""
+    spec = spec or TreeSpec()
+    rng = random.Random(spec.seed)
+    protocol_path, _ = BuiltinFetcher().fetch()
+    agent_dir = root / ".agent"
+    shutil.copytree(protocol_path, agent_dir, dirs_exist_ok=True)
+
+    paths = _doc_paths(spec)
+    for rel_path in paths:
+        _write(agent_dir / rel_path, _document(rng, spec, rel_path, paths))
+
+    for k in range(spec.skills):
+        skill_dir = agent_dir / "skills" / "_project" / f"skill-{k:03d}"
+        _write(skill_dir / "SKILL.md", f"# Skill {k}\n\n{_paragraph(rng, 256)}\n")
+
+    # Task workflows reference the generated documents, so context selection
+    # has real work to do
+    manifest_path = agent_dir / "manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    layers = manifest.setdefault("loading_strategy", {}).setdefault("layers", {})
+    mappings = layers.setdefault("workflows", {}).setdefault("mappings", {})
+    for n, rel_path in enumerate(paths):
+        mappings.setdefault(f"task-{n % 10}", []).append(rel_path)
+    manifest_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    update_checksums(agent_dir)
+
+    _write(root / "CLAUDE.md", f"# Project\n\n{_paragraph(rng, spec.file_size)}\n")
+    _write(root / "AGENTS.md", f"# Agents\n\n{_paragraph(rng, spec.file_size)}\n")
+    imports = "\n".join(f"@.agent/{p}" for p in paths[: spec.link_density])
+    _write(root / "GEMINI.md", f"# Gemini\n\n{imports}\n\n{_paragraph(rng, spec.file_size)}\n")
+    for i in range(spec.ide_files):
+        _write(
+            root / ".cursor" / "rules" / f"rule-{i:03d}.mdc",
+            f"---\ndescription: Rule {i}\nglobs: ['**/*.py']\nalwaysApply: false\n---\n\n"
+            f"{_paragraph(rng, spec.file_size)}\n",
+        )
+    return agent_dir
@@ -0,0 +1,106 @@
+"""Best-effort on-disk cache in the user cache directory.
+
+Cache files are plain JSON under DEFAULT_CACHE_DIR/<namespace>/. Reads that
+fail (missing, corrupt, wrong shape) behave like a cache miss and writes that
+fail are ignored, so callers never need to handle cache errors.
+
+Within a cache_session() (used by `co batch`), objects created through
+shared() are also kept in memory and reused by later commands.
+"""
+
+import hashlib
+import json
+import os
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, TypeVar
+
+from cokodo_agent import config
+
+# Files modified this close to (or after) the moment a stat snapshot was taken
+# cannot be trusted by size/mtime alone (coarse filesystem timestamps).
+RACY_WINDOW_NS = 2_000_000_000
+
+T = TypeVar("T")
+
+# In-memory objects shared while a cache_session() is active
+_session: dict[tuple[object, ...], Any] | None = None
+
+
+def cache_enabled() -> bool:
+    """Return False when caching is disabled via COKODO_NO_CACHE."""
+    return os.environ.get("COKODO_NO_CACHE", "").lower() not in ("1", "true", "yes")
+
+
+def cache_dir(namespace: str) -> Path:
+    """Return the cache directory for a namespace (not created)."""
+    return Path(config.DEFAULT_CACHE_DIR) / namespace
+
+
+def cache_key(*parts: object) -> str:
+    """Build a stable, filename-safe key from arbitrary parts."""
+    raw = "\0".join(str(p) for p in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def cache_path(namespace: str, *parts: object) -> Path:
+    """Return the JSON cache file path for a key in a namespace."""
+    return cache_dir(namespace) / f"{cache_key(*parts)}.json"
+
+
+def load_json(path: Path) -> Any:
+    """Load a cache file; return None on any error or when caching is disabled."""
+    if not cache_enabled():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def save_json(path: Path, data: Any) -> None:
+    """Atomically write a cache file; errors are ignored."""
+    if not cache_enabled():
+        return
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+@contextmanager
+def cache_session() -> Iterator[None]:
+    """Keep objects created through shared() in memory until the block exits."""
+    global _session
+    previous, _session = _session, {}
+    try:
+        yield
+    finally:
+        _session = previous
+
+
+def shared(
+    key: tuple[object, ...], create: Callable[[], T], reuse: Callable[[T], object] | None = None
+) -> T:
+    """
+    Return create(), memoized by key while a cache_session() is active.
+
+    reuse is called on a memoized object before it is handed out again, e.g.
+    to revalidate it against files changed by earlier commands.
+    """
+    if _session is None:
+        return create()
+    if key in _session:
+        value: T = _session[key]
+        if reuse is not None:
+            reuse(value)
+        return value
+    value = _session[key] = create()
+    return value
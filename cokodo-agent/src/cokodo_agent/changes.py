@@ -0,0 +1,65 @@
+"""Changed-file discovery for scoped lint runs.
+
+Changed files come from git (work tree or staged index) or from an explicit
+file list, and are mapped to POSIX paths relative to the .agent directory.
+"""
+
+import subprocess
+from collections.abc import Iterable
+from pathlib import Path
+
+
+def _git(cwd: Path, *args: str) -> str:
+    """Run a git command and return its stdout; raise RuntimeError on failure."""
+    try:
+        proc = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            capture_output=True,
+            encoding="utf-8",
+            errors="surrogateescape",
+            check=False,
+        )
+    except FileNotFoundError:
+        raise RuntimeError("git is not installed or not on PATH") from None
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or f"git {args[0]} failed")
+    return proc.stdout
+
+
+def git_changed_files(cwd: Path, staged: bool = False) -> list[Path]:
+    """
+    Return absolute paths of files changed in the git repository containing cwd.
+
+    staged=False: work tree vs HEAD, plus untracked files. staged=True: the
+    index vs HEAD. Deleted files are included; renames are reported as a
+    deletion plus an addition.
+    """
+    root = Path(_git(cwd, "rev-parse", "--show-toplevel").strip())
+    diff = ["diff", "--name-only", "--no-renames", "-z"]
+
+    if staged:
+        names = _git(root, *diff, "--cached")
+    else:
+        try:
+            names = _git(root, *diff, "HEAD")
+        except RuntimeError:
+            # No commits yet: everything staged or modified counts
+            names = _git(root, *diff, "--cached") + _git(root, *diff)
+        names += _git(root, "ls-files", "--others", "--exclude-standard", "-z")
+
+    return [root / name for name in dict.fromkeys(names.split("\0")) if name]
+
+
+def agent_relative(agent_dir: Path, paths: Iterable[Path]) -> set[str]:
+    """Map paths to POSIX paths relative to agent_dir, dropping paths outside it."""
+    base = agent_dir.resolve()
+    relative = set()
+    for path in paths:
+        try:
+            rel = Path(path).resolve().relative_to(base)
+        except ValueError:
+            continue
+        if rel.parts:
+            relative.add(rel.as_posix())
+    return relative
@@ -1,12 +1,12 @@
 """CLI commands for cokodo-agent."""
 
+from collections.abc import Callable, Iterable
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 import typer
 from rich.console import Console
 from rich.panel import Panel
-from rich.table import Table
 
 from cokodo_agent.config import (
     AI_TOOLS,
@@ -16,8 +16,13 @@ from cokodo_agent.config import (
 )
 from cokodo_agent.fetcher import get_protocol
 from cokodo_agent.generator import generate_adapters_for_tools, generate_protocol
-from cokodo_agent.parser import HybridParser
-from cokodo_agent.prompts import prompt_config
+
+# Heavier modules (parsers, interactive prompts, rich tables, engines) are imported
+# inside the commands that use them, so startup stays fast for every command.
+if TYPE_CHECKING:
+    from cokodo_agent.linter import LintResult, RuleProfile
+    from cokodo_agent.parser import HybridParser
+    from cokodo_agent.timing import Recorder
 
 app = typer.Typer(
     name="cokodo",
@@ -26,6 +31,70 @@ app = typer.Typer(
 )
 console = Console()
 
+# Exit code for `co diff --exit-code` when the local protocol differs from the latest
+EXIT_CHANGES = 2
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    timings: bool = typer.Option(
+        False,
+        "--timings",
+        help="Print time, files touched, bytes read and cache hits per phase (to stderr)",
+    ),
+    profile: Optional[Path] = typer.Option(
+        None,
+        "--profile",
+        help="Write cProfile data of the command to this file (pstats format)",
+    ),
+) -> None:
+    """Cokodo Agent - AI collaboration protocol generator"""
+    import os
+
+    from cokodo_agent import timing
+
+    trace = os.environ.get(timing.TRACE_ENV)
+    # Commands inside an instrumented `co batch` record into the batch's spans
+    if not (timings or profile or trace) or timing.current() is not None:
+        return
+
+    import contextlib
+
+    # Closed when the command finishes (including on typer.Exit), newest first
+    stack = contextlib.ExitStack()
+    ctx.call_on_close(stack.close)
+    recorder = stack.enter_context(timing.recording())
+    if trace:
+        stack.callback(recorder.write_trace, Path(trace))
+    if timings:
+        stack.callback(_print_timings, recorder)
+    if profile:
+        stack.enter_context(timing.profiling(profile))
+
+
+def _print_timings(recorder: "Recorder") -> None:
+    """Print per-phase totals, slowest first, to stderr (stdout stays machine-readable)."""
+    from rich.table import Table
+
+    table = Table(title="Timings")
+    table.add_column("Phase")
+    table.add_column("Calls", justify="right")
+    table.add_column("Time (ms)", justify="right")
+    table.add_column("Files", justify="right")
+    table.add_column("Bytes read", justify="right")
+    table.add_column("Cache hits", justify="right")
+    for p in sorted(recorder.phases.values(), key=lambda p: p.wall, reverse=True):
+        table.add_row(
+            p.name,
+            str(p.calls),
+            f"{p.wall * 1000:.1f}",
+            str(p.files),
+            str(p.bytes_read),
+            str(p.cache_hits),
+        )
+    Console(stderr=True).print(table)
+
 
 def find_agent_dir(path: Optional[Path] = None) -> Path:
     """Find .agent directory from given path or current directory."""
@@ -120,6 +189,8 @@ def init(
         }
     else:
         # Interactive prompts
+        from cokodo_agent.prompts import prompt_config
+
         config = prompt_config(
             default_name=name or target_path.name,
             default_stack=stack,
@@ -175,38 +246,213 @@ def lint(
         "-f",
         help="Output format (text/json/github)",
     ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Re-evaluate every file instead of replaying cached results",
+    ),
+    jobs: int = typer.Option(
+        1,
+        "--jobs",
+        "-j",
+        help="Worker threads for rules and per-file checks (0 = one per CPU)",
+    ),
+    only_failures: bool = typer.Option(
+        False,
+        "--only-failures",
+        help="Report failures only (skip passing checks)",
+    ),
+    max_errors: Optional[int] = typer.Option(
+        None,
+        "--max-errors",
+        min=1,
+        help="Stop checking after N errors",
+    ),
+    changed: bool = typer.Option(
+        False,
+        "--changed",
+        help="Only check files changed in the git work tree (and what links to them)",
+    ),
+    staged: bool = typer.Option(
+        False,
+        "--staged",
+        help="Only check files staged in the git index (and what links to them)",
+    ),
+    files: Optional[list[Path]] = typer.Option(
+        None,
+        "--file",
+        help="Only check this file (repeatable; combines with --changed/--staged)",
+    ),
+    recursive: bool = typer.Option(
+        False,
+        "--recursive",
+        "-R",
+        help="Lint every .agent under PATH (gitignore-aware); --jobs sets worker processes",
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Report wall time, files touched and bytes read per rule (runs rules serially)",
+    ),
 ) -> None:
     """Check protocol compliance."""
-    import json as json_module
-
+    from cokodo_agent.changes import agent_relative, git_changed_files
+    from cokodo_agent.lintcache import LintCache
     from cokodo_agent.linter import ProtocolLinter
 
+    if recursive:
+        if changed or staged or files or profile:
+            console.print(
+                "[red]Error:[/red] --recursive cannot be combined with "
+                "--changed/--staged/--file/--profile"
+            )
+            raise typer.Exit(1)
+        _lint_recursive(path, rule, format, no_cache, jobs, only_failures, max_errors)
+        return
+
     try:
         agent_dir = find_agent_dir(path)
     except FileNotFoundError as e:
         console.print(f"[red]Error:[/red] {e}")
         raise typer.Exit(1)
 
-    linter = ProtocolLinter(agent_dir)
+    scope: set[str] | None = None
+    if changed or staged or files:
+        changed_paths = [Path(f) for f in files or []]
+        try:
+            if changed:
+                changed_paths += git_changed_files(agent_dir.parent)
+            if staged:
+                changed_paths += git_changed_files(agent_dir.parent, staged=True)
+        except RuntimeError as e:
+            console.print(f"[red]Error:[/red] {e}")
+            raise typer.Exit(1)
+        scope = agent_relative(agent_dir, changed_paths)
+
+    cache = None if no_cache else LintCache(agent_dir)
+    linter = ProtocolLinter(
+        agent_dir,
+        cache=cache,
+        jobs=jobs,
+        only_failures=only_failures,
+        max_errors=max_errors,
+        changed=scope,
+        profile=profile,
+    )
+    stream = linter.iter_results([rule] if rule else None)
+
+    def footer(error_count: int) -> list[str]:
+        lines = []
+        if scope is not None:
+            lines.append(f"[dim]Scope: {len(scope)} changed path(s)[/dim]")
+        if linter.stopped_early:
+            lines.append(f"[yellow]Stopped after {error_count} error(s) (--max-errors)[/yellow]")
+        if cache is not None:
+            lines.append(f"[dim]Cache: {cache.hits} hit(s), {cache.misses} miss(es)[/dim]")
+        return lines
 
-    if rule:
-        results = linter.lint_rule(rule)
-    else:
-        results = linter.lint_all()
+    try:
+        _print_lint_report(stream, format, only_failures, footer)
+    finally:
+        if profile:
+            _print_lint_profile(linter.profiles)
+
+
+def _print_lint_profile(profiles: list["RuleProfile"]) -> None:
+    """Print per-rule cost, slowest first, to stderr (stdout stays machine-readable)."""
+    from rich.table import Table
+
+    table = Table(title="Lint profile")
+    table.add_column("Rule")
+    table.add_column("Time (ms)", justify="right")
+    table.add_column("Files", justify="right")
+    table.add_column("Bytes read", justify="right")
+    table.add_column("Results", justify="right")
+    for p in sorted(profiles, key=lambda p: p.seconds, reverse=True):
+        table.add_row(
+            p.rule, f"{p.seconds * 1000:.1f}", str(p.files), str(p.bytes_read), str(p.results)
+        )
+    table.add_row(
+        "[bold]Total[/bold]",
+        f"{sum(p.seconds for p in profiles) * 1000:.1f}",
+        "",
+        str(sum(p.bytes_read for p in profiles)),
+        str(sum(p.results for p in profiles)),
+    )
+    Console(stderr=True).print(table)
 
-    errors = [r for r in results if not r.passed]
 
-    if format == "json":
-        print(json_module.dumps([r._asdict() for r in results], indent=2, ensure_ascii=False))
+def _lint_recursive(
+    path: Optional[Path],
+    rule: Optional[str],
+    format: str,
+    no_cache: bool,
+    jobs: int,
+    only_failures: bool,
+    max_errors: Optional[int],
+) -> None:
+    """Lint every .agent tree under path and print one aggregated report."""
+    from cokodo_agent.multilint import aggregate_results, lint_trees
+    from cokodo_agent.walker import find_agent_dirs
+
+    root = (Path(path) if path else Path.cwd()).resolve()
+    agent_dirs = find_agent_dirs(root)
+    if not agent_dirs:
+        console.print(f"[red]Error:[/red] No .agent directories found under {root}")
+        raise typer.Exit(1)
+
+    reports = lint_trees(
+        agent_dirs,
+        jobs=jobs,
+        rules=[rule] if rule else None,
+        use_cache=not no_cache,
+        only_failures=only_failures,
+        max_errors=max_errors,
+    )
+
+    def footer(error_count: int) -> list[str]:
+        failing = sum(1 for r in reports if r.error or any(not x.passed for x in r.results))
+        lines = [f"Projects: {len(reports)} .agent tree(s), {failing} with errors"]
+        stopped = sum(1 for r in reports if r.stopped_early)
+        if stopped:
+            lines.append(f"[yellow]Stopped early in {stopped} tree(s) (--max-errors)[/yellow]")
+        if not no_cache:
+            hits = sum(r.hits for r in reports)
+            misses = sum(r.misses for r in reports)
+            lines.append(f"[dim]Cache: {hits} hit(s), {misses} miss(es)[/dim]")
+        return lines
+
+    _print_lint_report(aggregate_results(root, reports), format, only_failures, footer)
+
+
+def _print_lint_report(
+    stream: Iterable["LintResult"],
+    format: str,
+    only_failures: bool,
+    footer: Callable[[int], list[str]],
+) -> None:
+    """Print lint results as text, json or github annotations; text mode exits 1 on errors."""
+    import json as json_module
 
-    elif format == "github":
-        for r in results:
+    if format == "github":
+        # Annotations are printed as results arrive
+        error_count = 0
+        for r in stream:
             if not r.passed:
+                error_count += 1
                 file_part = f"file={r.file}" if r.file else ""
                 line_part = f",line={r.line}" if r.line else ""
-                print(f"::error {file_part}{line_part}::[{r.rule}] {r.message}")
-        if not errors:
+                col_part = f",col={r.column}" if r.line and r.column else ""
+                print(f"::error {file_part}{line_part}{col_part}::[{r.rule}] {r.message}")
+        if not error_count:
             print("::notice ::All protocol checks passed")
+        return
+
+    results = list(stream)
+    errors = [r for r in results if not r.passed]
+
+    if format == "json":
+        print(json_module.dumps([r._asdict() for r in results], indent=2, ensure_ascii=False))
 
     else:  # text format
         console.print()
@@ -226,22 +472,30 @@ def lint(
             passed = sum(1 for r in rule_results if r.passed)
             total = len(rule_results)
 
-            if passed == total:
+            if only_failures:
+                console.print(f"[red][FAIL][/red] {rule_name}: {total} error(s)")
+            elif passed == total:
                 console.print(f"[green][OK][/green] {rule_name}: {passed}/{total} passed")
             else:
                 console.print(f"[red][FAIL][/red] {rule_name}: {passed}/{total} passed")
 
+            if passed != total:
                 # Show errors
                 for r in rule_results:
                     if not r.passed:
                         loc = f"  {r.file}" if r.file else ""
                         if r.line:
                             loc += f":{r.line}"
+                            if r.column:
+                                loc += f":{r.column}"
                         console.print(f"    [red]x[/red]{loc}: {r.message}")
 
         console.print()
-        total_passed = len(results) - len(errors)
-        console.print(f"Total: {total_passed}/{len(results)} passed")
+        if not only_failures:
+            total_passed = len(results) - len(errors)
+            console.print(f"Total: {total_passed}/{len(results)} passed")
+        for line in footer(len(errors)):
+            console.print(line)
 
         if errors:
             console.print(f"\n[red][FAIL][/red] {len(errors)} error(s) found")
@@ -286,8 +540,15 @@ def diff(
         "--offline",
         help="Use built-in protocol (no network)",
     ),
+    exit_code: bool = typer.Option(
+        False,
+        "--exit-code",
+        help=f"Exit with {EXIT_CHANGES} when changes are available (0 = up to date)",
+    ),
 ) -> None:
     """Compare local .agent with latest protocol."""
+    from rich.table import Table
+
     from cokodo_agent.sync import diff_protocol
 
     try:
@@ -356,6 +617,9 @@ def diff(
 
     console.print("Run [cyan]co sync[/cyan] to update your protocol.")
 
+    if exit_code:
+        raise typer.Exit(EXIT_CHANGES)
+
 
 @app.command()
 def sync(
@@ -379,6 +643,16 @@ def sync(
         "-y",
         help="Skip confirmation prompt",
     ),
+    plan_out: Optional[Path] = typer.Option(
+        None,
+        "--plan-out",
+        help="Write the change plan to a JSON file instead of syncing",
+    ),
+    apply: Optional[Path] = typer.Option(
+        None,
+        "--apply",
+        help="Apply a plan written by --plan-out (no fetch, no diff)",
+    ),
 ) -> None:
     """Sync local .agent with latest protocol."""
     from cokodo_agent.sync import diff_protocol, sync_protocol
@@ -389,6 +663,18 @@ def sync(
         console.print(f"[red]Error:[/red] {e}")
         raise typer.Exit(1)
 
+    if plan_out and apply:
+        console.print("[red]Error:[/red] --plan-out and --apply cannot be used together")
+        raise typer.Exit(1)
+
+    if plan_out:
+        _sync_plan_out(agent_dir, plan_out, offline=offline)
+        return
+
+    if apply:
+        _sync_apply(agent_dir, apply, dry_run=dry_run, yes=yes)
+        return
+
     # First show diff
     console.print("[bold]Checking for updates...[/bold]")
     console.print()
@@ -456,6 +742,78 @@ def sync(
         console.print(f"[green]OK[/green] Synced to v{remote_version}")
 
 
+def _sync_plan_out(agent_dir: Path, plan_path: Path, offline: bool) -> None:
+    """Compute a sync plan and write it to plan_path."""
+    from cokodo_agent.sync import build_sync_plan, write_sync_plan
+
+    console.print("[bold]Computing sync plan...[/bold]")
+    console.print()
+
+    try:
+        plan = build_sync_plan(agent_dir, offline=offline)
+        write_sync_plan(plan, plan_path)
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+    console.print(f"Local version:  [cyan]{plan['local_version']}[/cyan]")
+    console.print(f"Remote version: [cyan]{plan['source_version']}[/cyan]")
+    console.print()
+    console.print(
+        f"[green]OK[/green] Wrote plan with {len(plan['operations'])} operation(s) to {plan_path}"
+    )
+    console.print(f"Run [cyan]co sync --apply {plan_path}[/cyan] to apply it.")
+
+
+def _sync_apply(agent_dir: Path, plan_path: Path, dry_run: bool, yes: bool) -> None:
+    """Apply a previously written sync plan."""
+    from cokodo_agent.sync import apply_sync_plan, load_sync_plan
+
+    try:
+        plan = load_sync_plan(plan_path)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+    operations = plan["operations"]
+    console.print(f"Plan source version: [cyan]{plan['source_version']}[/cyan]")
+    console.print()
+
+    if not operations:
+        console.print("[green]Plan contains no changes. Nothing to apply.[/green]")
+        return
+
+    console.print(f"[yellow]{len(operations)} file(s) will be updated[/yellow]")
+    console.print()
+
+    if not yes and not dry_run:
+        confirm = typer.confirm("Apply plan?")
+        if not confirm:
+            console.print("Aborted.")
+            raise typer.Exit(0)
+
+    if dry_run:
+        console.print("[bold]Dry run - no changes will be made[/bold]")
+        console.print()
+
+    result = apply_sync_plan(agent_dir, plan, dry_run=dry_run)
+
+    if result.updated:
+        console.print("[green]Updated:[/green]")
+        for f in result.updated:
+            console.print(f"  {f}")
+        console.print()
+
+    if result.errors:
+        console.print("[red]Errors:[/red]")
+        for err in result.errors:
+            console.print(f"  {err}")
+        raise typer.Exit(1)
+
+    if not dry_run:
+        console.print(f"[green]OK[/green] Applied plan (v{plan['source_version']})")
+
+
 @app.command()
 def adapt(
     tool: str = typer.Argument(
@@ -511,11 +869,27 @@ def detect(
         None,
         help="Project path (default: current directory)",
     ),
+    recursive: bool = typer.Option(
+        False,
+        "--recursive",
+        "-R",
+        help="Also detect nested projects (gitignore-aware; skips node_modules, build output)",
+    ),
+    max_depth: Optional[int] = typer.Option(
+        None,
+        "--max-depth",
+        help="With --recursive: directory levels below PATH to search",
+    ),
 ) -> None:
     """Detect IDE instruction files (Cursor, Claude, Copilot, Gemini) in the project."""
+    from cokodo_agent.parser import HybridParser
+
     target = Path(path) if path else Path.cwd()
     target = target.resolve()
     hybrid = HybridParser()
+    if recursive:
+        _detect_recursive(hybrid, target, max_depth)
+        return
     detected = hybrid.detect_all(target)
     if not detected:
         console.print("[yellow]No IDE instruction files detected.[/yellow]")
@@ -527,6 +901,22 @@ def detect(
             console.print(f"    {f.path} ({f.format_version})")
 
 
+def _detect_recursive(hybrid: "HybridParser", root: Path, max_depth: int | None) -> None:
+    """Print detected files of root and nested projects as they are found."""
+    found = False
+    for rel_dir, detected in hybrid.detect_recursive(root, max_depth):
+        if not found:
+            console.print("[bold]Detected IDE instruction files:[/bold]")
+            found = True
+        console.print(f"  [bold]{rel_dir or '.'}[/bold]")
+        for tool_name, files in sorted(detected.items()):
+            console.print(f"    [cyan]{tool_name}[/cyan]:")
+            for f in files:
+                console.print(f"      {f.path} ({f.format_version})")
+    if not found:
+        console.print("[yellow]No IDE instruction files detected.[/yellow]")
+
+
 @app.command("import")
 def import_rules(
     path: Optional[Path] = typer.Argument(
@@ -544,12 +934,26 @@ def import_rules(
         "--dry-run",
         help="Show what would be imported without writing",
     ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Re-parse every instruction file instead of reusing cached parses",
+    ),
+    jobs: int = typer.Option(
+        1,
+        "--jobs",
+        "-j",
+        help="Parser threads (0 = one per CPU)",
+    ),
 ) -> None:
     """Import rules from existing IDE instruction files into .agent protocol."""
+    from cokodo_agent.parser import DirectorySnapshot, HybridParser
+
     target = Path(path) if path else Path.cwd()
     target = target.resolve()
-    hybrid = HybridParser()
-    detected = hybrid.detect_all(target)
+    hybrid = HybridParser(use_cache=not no_cache, jobs=jobs)
+    snapshot = DirectorySnapshot(target)  # shared by detection and parsing
+    detected = hybrid.detect_all(target, snapshot)
     if not detected:
         console.print("[yellow]No IDE instruction files detected. Run from a project that has CLAUDE.md, AGENTS.md, GEMINI.md, or .cursor/rules/.[/yellow]")
         raise typer.Exit(0)
@@ -559,15 +963,14 @@ def import_rules(
         console.print("[red]Error:[/red] No .agent directory. Run [cyan]co init[/cyan] first.")
         raise typer.Exit(1)
 
-    tools_to_parse = list(detected.keys()) if source in (None, "auto") else [source]
     if source and source != "auto" and source not in detected:
         console.print(f"[red]Error:[/red] No files detected for '{source}'.")
         raise typer.Exit(1)
 
-    parsed_list: list = []
-    for tool in tools_to_parse:
-        if tool in detected:
-            parsed_list.extend(hybrid.parse_tool(target, tool))
+    if source in (None, "auto"):
+        parsed_list = hybrid.parse_all(target, snapshot)
+    else:
+        parsed_list = hybrid.parse_tool(target, source, snapshot)
 
     if not parsed_list:
         console.print("[yellow]Nothing to import.[/yellow]")
@@ -869,6 +1272,224 @@ def journal(
         raise typer.Exit(1)
 
 
+@app.command()
+def bench(
+    scale: str = typer.Option(
+        "medium",
+        "--scale",
+        help="Synthetic tree preset (small/medium/large)",
+    ),
+    files: Optional[int] = typer.Option(
+        None, "--files", min=0, help="Generated documents (overrides the preset)"
+    ),
+    file_size: Optional[int] = typer.Option(
+        None, "--file-size", min=1, help="Approximate bytes per document (overrides the preset)"
+    ),
+    link_density: Optional[int] = typer.Option(
+        None, "--link-density", min=0, help="Links per document (overrides the preset)"
+    ),
+    skills: Optional[int] = typer.Option(
+        None, "--skills", min=0, help="Project skills (overrides the preset)"
+    ),
+    repeat: int = typer.Option(5, "--repeat", "-n", min=1, help="Timed runs per scenario"),
+    scenario: Optional[list[str]] = typer.Option(
+        None, "--scenario", "-s", help="Run only this scenario (repeatable)"
+    ),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="Save results as a JSON baseline"
+    ),
+    baseline: Optional[Path] = typer.Option(
+        None, "--baseline", "-b", help="Compare against a saved baseline (exit 1 on regression)"
+    ),
+    threshold: float = typer.Option(
+        0.2, "--threshold", min=0.0, help="Allowed slowdown before flagging (0.2 = 20%)"
+    ),
+) -> None:
+    """Benchmark lint, diff, sync, parse and context on a synthetic tree."""
+    import tempfile
+
+    from rich.table import Table
+
+    from cokodo_agent.bench import (
+        SCALES,
+        SCENARIOS,
+        generate_tree,
+        load_baseline,
+        run_scenarios,
+        save_baseline,
+        to_baseline,
+    )
+
+    if scale not in SCALES:
+        console.print(f"[red]Error:[/red] Unknown scale '{scale}' ({'/'.join(SCALES)})")
+        raise typer.Exit(1)
+    overrides = {
+        "files": files,
+        "file_size": file_size,
+        "link_density": link_density,
+        "skills": skills,
+    }
+    spec = SCALES[scale]._replace(**{k: v for k, v in overrides.items() if v is not None})
+
+    selected = SCENARIOS
+    if scenario:
+        unknown = set(scenario) - {s.name for s in SCENARIOS}
+        if unknown:
+            console.print(f"[red]Error:[/red] Unknown scenario(s): {', '.join(sorted(unknown))}")
+            raise typer.Exit(1)
+        selected = [s for s in SCENARIOS if s.name in scenario]
+
+    previous = None
+    if baseline is not None:
+        try:
+            previous = load_baseline(baseline)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Error:[/red] {e}")
+            raise typer.Exit(1)
+
+    console.print(
+        f"[dim]Tree: {spec.files} document(s) x ~{spec.file_size} B, "
+        f"{spec.link_density} link(s) each, {spec.skills} skill(s)[/dim]"
+    )
+    with tempfile.TemporaryDirectory(prefix="cokodo-bench-") as tmpdir:
+        root = Path(tmpdir)
+        generate_tree(root, spec)
+        results = run_scenarios(
+            root,
+            selected,
+            repeat=repeat,
+            progress=lambda name: console.print(f"[dim]Running {name}...[/dim]"),
+        )
+
+    table = Table(title="Benchmark")
+    table.add_column("Scenario")
+    table.add_column("Min (ms)", justify="right")
+    table.add_column("Median (ms)", justify="right")
+    for r in results:
+        table.add_row(r.name, f"{r.min * 1000:.1f}", f"{r.median * 1000:.1f}")
+    console.print(table)
+
+    current = to_baseline(spec, results)
+    if output is not None:
+        save_baseline(output, current)
+        console.print(f"[green]OK[/green] Saved baseline to {output}")
+    if previous is not None:
+        _report_comparison(previous, current, threshold)
+
+
+@app.command("bench-compare")
+def bench_compare(
+    baseline: Path = typer.Argument(..., help="Baseline JSON (e.g. from the main branch)"),
+    current: Path = typer.Argument(..., help="JSON of the run to check"),
+    threshold: float = typer.Option(
+        0.2, "--threshold", min=0.0, help="Allowed slowdown before flagging (0.2 = 20%)"
+    ),
+) -> None:
+    """Compare two saved benchmark baselines and flag regressions."""
+    from cokodo_agent.bench import load_baseline
+
+    try:
+        previous, latest = load_baseline(baseline), load_baseline(current)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    _report_comparison(previous, latest, threshold)
+
+
+def _report_comparison(previous: dict[str, Any], current: dict[str, Any], threshold: float) -> None:
+    """Print median changes per scenario; exit 1 when any scenario regressed."""
+    from rich.table import Table
+
+    from cokodo_agent.bench import compare
+
+    if previous.get("spec") != current.get("spec"):
+        console.print("[yellow]Warning:[/yellow] Baselines were measured on different trees")
+
+    comparisons = compare(previous, current, threshold)
+    table = Table(title=f"Comparison (threshold {threshold:.0%})")
+    table.add_column("Scenario")
+    table.add_column("Baseline (ms)", justify="right")
+    table.add_column("Current (ms)", justify="right")
+    table.add_column("Change", justify="right")
+    for c in comparisons:
+        change = f"{c.ratio - 1:+.1%}"
+        table.add_row(
+            c.name,
+            f"{c.baseline * 1000:.1f}",
+            f"{c.current * 1000:.1f}",
+            f"[red]{change}[/red]" if c.regressed else change,
+        )
+    console.print(table)
+
+    regressed = [c.name for c in comparisons if c.regressed]
+    if regressed:
+        console.print(f"[red][FAIL][/red] Regression in: {', '.join(regressed)}")
+        raise typer.Exit(1)
+    console.print("[green][OK][/green] No regressions")
+
+
+@app.command()
+def batch(
+    file: Optional[Path] = typer.Argument(
+        None,
+        help="File of invocations, one per line or a JSON array (default: stdin)",
+    ),
+    fail_fast: bool = typer.Option(
+        False,
+        "--fail-fast",
+        help="Stop after the first command that exits non-zero",
+    ),
+) -> None:
+    """Run many commands in one process, printing one NDJSON result per command."""
+    import json as json_module
+    import sys
+
+    from cokodo_agent.batch import parse_batch, run_batch
+
+    try:
+        if file is None or str(file) == "-":
+            text = sys.stdin.read()
+        else:
+            text = file.read_text(encoding="utf-8")
+        commands = parse_batch(text)
+    except (OSError, ValueError) as e:
+        # stdout carries NDJSON only
+        Console(stderr=True).print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+    command = typer.main.get_command(app)
+    failed = False
+    for result in run_batch(
+        lambda args: command.main(args=args, prog_name="co"), commands, fail_fast
+    ):
+        print(json_module.dumps(result._asdict(), ensure_ascii=False), flush=True)
+        failed = failed or result.exit_code != 0
+    if failed:
+        raise typer.Exit(1)
+
+
+@app.command()
+def serve(
+    path: Optional[Path] = typer.Argument(
+        None,
+        help="Project root (default: the editor's workspace root)",
+    ),
+    stdio: bool = typer.Option(
+        False,
+        "--stdio",
+        help="Speak the Language Server Protocol over stdin/stdout",
+    ),
+) -> None:
+    """Run a lint language server for editors."""
+    if not stdio:
+        console.print("[red]Error:[/red] Only --stdio is supported")
+        raise typer.Exit(1)
+
+    from cokodo_agent.server import serve_stdio
+
+    raise typer.Exit(serve_stdio(path.resolve() if path else None))
+
+
 @app.command()
 def version() -> None:
     """Show version information."""
@@ -914,12 +1535,26 @@ def help(
             "options": [
                 ("-r, --rule", "Check specific rule only"),
                 ("-f, --format", "Output format (text/json/github)"),
+                ("--no-cache", "Ignore cached per-file results"),
+                ("-j, --jobs", "Worker threads (0 = one per CPU)"),
+                ("--only-failures", "Report failures only"),
+                ("--max-errors", "Stop checking after N errors"),
+                ("--changed", "Only check files changed in git"),
+                ("--staged", "Only check files staged in git"),
+                ("--file", "Only check this file (repeatable)"),
+                ("-R, --recursive", "Lint every .agent under PATH (monorepo)"),
+                ("--profile", "Report time and reads per rule"),
             ],
             "examples": [
                 ("co lint", "Check current directory"),
                 ("co lint -r integrity-violation", "Check specific rule"),
                 ("co lint -f json", "Output as JSON"),
                 ("co lint -f github", "Output for GitHub Actions"),
+                ("co lint -j 0", "Check using all CPUs"),
+                ("co lint --only-failures --max-errors 1", "Fail fast (pre-commit)"),
+                ("co lint --staged", "Check only what is being committed"),
+                ("co lint . -R -j 0", "Lint all sub-projects on all CPUs"),
+                ("co lint --profile", "Find slow rules"),
             ],
         },
         "diff": {
@@ -927,10 +1562,12 @@ def help(
             "usage": "co diff [PATH] [OPTIONS]",
             "options": [
                 ("--offline", "Use built-in protocol (no network)"),
+                ("--exit-code", f"Exit {EXIT_CHANGES} when changes are available"),
             ],
             "examples": [
                 ("co diff", "Show differences with latest"),
                 ("co diff --offline", "Compare with built-in protocol"),
+                ("co diff --offline --exit-code", "Scripting: 0 up to date, 2 changes"),
             ],
         },
         "sync": {
@@ -940,11 +1577,15 @@ def help(
                 ("--offline", "Use built-in protocol (no network)"),
                 ("--dry-run", "Show what would be updated"),
                 ("-y, --yes", "Skip confirmation prompt"),
+                ("--plan-out", "Write change plan to a JSON file"),
+                ("--apply", "Apply a plan written by --plan-out"),
             ],
             "examples": [
                 ("co sync", "Sync with confirmation"),
                 ("co sync -y", "Sync without confirmation"),
                 ("co sync --dry-run", "Preview changes"),
+                ("co sync --plan-out plan.json", "Record changes for later review"),
+                ("co sync --apply plan.json -y", "Apply a reviewed plan"),
             ],
         },
         "adapt": {
@@ -961,10 +1602,14 @@ def help(
         },
         "detect": {
             "description": "Detect IDE instruction files in the project",
-            "usage": "co detect [PATH]",
-            "options": [],
+            "usage": "co detect [PATH] [OPTIONS]",
+            "options": [
+                ("-R, --recursive", "Also detect nested projects (monorepos)"),
+                ("--max-depth", "With --recursive: directory levels to search"),
+            ],
             "examples": [
                 ("co detect", "List detected CLAUDE.md, AGENTS.md, GEMINI.md, .cursor/rules/"),
+                ("co detect -R --max-depth 3", "List instruction files of every package"),
             ],
         },
         "import": {
@@ -973,6 +1618,8 @@ def help(
             "options": [
                 ("-s, --source", "cursor | claude | copilot | gemini | auto"),
                 ("--dry-run", "Show what would be imported without writing"),
+                ("--no-cache", "Re-parse every instruction file"),
+                ("-j, --jobs", "Parser threads (0 = one per CPU)"),
             ],
             "examples": [
                 ("co import", "Import from all detected files"),
@@ -1018,6 +1665,57 @@ def help(
                 ("co update-checksums", "Update checksums"),
             ],
         },
+        "bench": {
+            "description": "Benchmark lint, diff, sync, parse and context on a synthetic tree",
+            "usage": "co bench [OPTIONS]",
+            "options": [
+                ("--scale", "Tree preset: small/medium/large"),
+                ("--files, --file-size", "Override document count and size"),
+                ("--link-density, --skills", "Override links per document and skills"),
+                ("-n, --repeat", "Timed runs per scenario"),
+                ("-s, --scenario", "Run only this scenario (repeatable)"),
+                ("-o, --output", "Save results as a JSON baseline"),
+                ("-b, --baseline", "Compare against a saved baseline"),
+                ("--threshold", "Allowed slowdown (default 0.2)"),
+            ],
+            "examples": [
+                ("co bench -o base.json", "Record a baseline"),
+                ("co bench -b base.json", "Fail if slower than the baseline"),
+                ("co bench-compare base.json new.json", "Compare two saved runs"),
+            ],
+        },
+        "bench-compare": {
+            "description": "Compare two benchmark baselines and flag regressions",
+            "usage": "co bench-compare BASELINE CURRENT [--threshold 0.2]",
+            "options": [
+                ("--threshold", "Allowed slowdown (default 0.2)"),
+            ],
+            "examples": [
+                ("co bench-compare main.json pr.json", "Exit 1 on a >20% slowdown"),
+            ],
+        },
+        "batch": {
+            "description": "Run many commands in one process with shared caches (NDJSON out)",
+            "usage": "co batch [FILE] [--fail-fast]",
+            "options": [
+                ("FILE", "Invocations, one per line or a JSON array (default: stdin)"),
+                ("--fail-fast", "Stop after the first failing command"),
+            ],
+            "examples": [
+                ("co batch commands.txt", "Run each line of commands.txt"),
+                ("echo '[[\"lint\", \"a\"], \"lint b\"]' | co batch", "Run a JSON array"),
+            ],
+        },
+        "serve": {
+            "description": "Run a lint language server (LSP) for editors",
+            "usage": "co serve [PATH] --stdio",
+            "options": [
+                ("--stdio", "Speak LSP over stdin/stdout"),
+            ],
+            "examples": [
+                ("co serve --stdio", "Start from the editor (workspace root from client)"),
+            ],
+        },
         "version": {
             "description": "Show version information",
             "usage": "co version",
@@ -1085,7 +1783,7 @@ def help(
         categories = {
             "Setup": ["init", "adapt", "detect", "import"],
             "Protocol Management": ["lint", "diff", "sync", "update-checksums"],
-            "Development": ["context", "journal"],
+            "Development": ["context", "journal", "batch", "serve", "bench", "bench-compare"],
             "Information": ["version", "help"],
         }
 
@@ -1100,6 +1798,10 @@ def help(
         console.print("[bold]Usage:[/bold]")
         console.print("  co <command> [options]")
         console.print()
+        console.print("[bold]Global options:[/bold]")
+        console.print("  co --timings <command>          # Per-phase time, reads and cache hits")
+        console.print("  co --profile out.prof <command> # Write cProfile data")
+        console.print()
         console.print("[bold]Get help for a command:[/bold]")
         console.print("  co help <command>")
         console.print()
@@ -5,8 +5,10 @@ from typing import List, Tuple
 
 from rich.console import Console
 
+from cokodo_agent.cache import shared
 from cokodo_agent.fetcher.base import BaseFetcher, FetcherError
 from cokodo_agent.fetcher.builtin import BuiltinFetcher
+from cokodo_agent.timing import span
 
 console = Console()
 
@@ -31,6 +33,9 @@ def get_protocol(offline: bool = False) -> Tuple[Path, str]:
         1. GitHub Release (when httpx installed via pip install cokodo-agent[network])
         2. Built-in (offline fallback)
 
+    The result is resolved once per cache_session() (e.g. for all commands
+    of a `co batch`).
+
     Args:
         offline: If True, skip network sources and use built-in directly
 
@@ -40,7 +45,11 @@ def get_protocol(offline: bool = False) -> Tuple[Path, str]:
     Raises:
         FetcherError: If all sources fail
     """
+    with span("fetch", offline=offline):
+        return shared(("protocol", offline), lambda: _resolve_protocol(offline))
+
 
+def _resolve_protocol(offline: bool) -> tuple[Path, str]:
     if offline:
         # Directly use built-in
         console.print("  [dim]Using offline mode[/dim]")
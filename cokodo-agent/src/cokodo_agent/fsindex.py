@@ -0,0 +1,330 @@
+"""Single-pass filesystem index for .agent trees.
+
+One os.scandir walk records every file and directory (with stat data) under
+a root. File contents are read lazily and cached, so rules that look at the
+same file share a single read, including rules running on worker threads.
+Large files can instead be memory-mapped and scanned as bytes, without a
+full read, copy or decode.
+"""
+
+import bisect
+import mmap
+import os
+import stat
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from cokodo_agent.cache import RACY_WINDOW_NS
+
+# Striped locks so concurrent rules never read the same file twice
+_READ_LOCKS = [threading.Lock() for _ in range(32)]
+
+# Files at least this large are memory-mapped by IndexedFile.mapped()
+MMAP_THRESHOLD = 256 * 1024
+
+# Like git, treat a file as binary when its first 8 KiB contain a NUL byte
+BINARY_SNIFF_BYTES = 8192
+
+
+def is_binary(data: bytes | mmap.mmap) -> bool:
+    """Check whether file contents look binary."""
+    return data.find(b"\0", 0, BINARY_SNIFF_BYTES) != -1
+
+
+def _line_starts(data: str | bytes | mmap.mmap) -> list[int]:
+    newline = "\n" if isinstance(data, str) else b"\n"
+    starts = [0]
+    find = data.find
+    pos = find(newline)  # type: ignore[arg-type]
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = find(newline, pos + 1)  # type: ignore[arg-type]
+    return starts
+
+
+class ReadStats:
+    """Files whose contents were accessed, and bytes read from disk, while recording."""
+
+    def __init__(self) -> None:
+        self.files: set[str] = set()
+        self.bytes_read = 0
+
+
+_recorder: ReadStats | None = None
+
+
+@contextmanager
+def record_reads(stats: ReadStats) -> Iterator[ReadStats]:
+    """
+    Record content access of every IndexedFile into stats (not thread-aware).
+
+    Nested recordings are also added to the enclosing one when they end.
+    """
+    global _recorder
+    previous, _recorder = _recorder, stats
+    files_before, bytes_before = set(stats.files), stats.bytes_read
+    try:
+        yield stats
+    finally:
+        _recorder = previous
+        if previous is not None and previous is not stats:
+            previous.files |= stats.files - files_before
+            previous.bytes_read += stats.bytes_read - bytes_before
+
+
+class IndexedFile:
+    """A file in a FileIndex with lazily cached contents."""
+
+    __slots__ = (
+        "rel_path",
+        "path",
+        "size",
+        "mtime_ns",
+        "_data",
+        "_text",
+        "_line_starts",
+    )
+
+    def __init__(self, rel_path: str, path: Path, size: int, mtime_ns: int):
+        self.rel_path = rel_path  # POSIX-style path relative to the index root
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self._data: bytes | None = None
+        self._text: str | None = None
+        self._line_starts: list[int] | None = None  # byte offsets
+
+    @property
+    def name(self) -> str:
+        return self.rel_path.rpartition("/")[2]
+
+    def read_bytes(self) -> bytes:
+        """Return file contents (read from disk at most once)."""
+        recorder = _recorder
+        if recorder is not None:
+            recorder.files.add(self.rel_path)
+        if self._data is None:
+            with _READ_LOCKS[hash(self.rel_path) % len(_READ_LOCKS)]:
+                if self._data is None:
+                    self._data = self.path.read_bytes()
+                    if recorder is not None:
+                        recorder.bytes_read += len(self._data)
+        return self._data
+
+    def read_text(self) -> str:
+        """Return file contents decoded as UTF-8 (decoded at most once)."""
+        if _recorder is not None:
+            _recorder.files.add(self.rel_path)
+        if self._text is None:
+            self._text = self.read_bytes().decode("utf-8")
+        return self._text
+
+    @contextmanager
+    def mapped(self) -> Iterator[bytes | mmap.mmap]:
+        """
+        Yield the contents as a bytes-like buffer.
+
+        Contents already in memory are reused; files of MMAP_THRESHOLD bytes
+        or more are memory-mapped (read-only, unmapped on exit) instead of
+        being read and cached.
+        """
+        if self._data is not None or self.size < MMAP_THRESHOLD:
+            yield self.read_bytes()
+            return
+        try:
+            with open(self.path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # e.g. emptied since indexing
+            yield self.read_bytes()
+            return
+        if _recorder is not None:
+            _recorder.files.add(self.rel_path)
+            _recorder.bytes_read += len(buffer)
+        with buffer:
+            yield buffer
+
+    def line_starts(self) -> list[int]:
+        """Return the byte offset at which each line starts (built at most once)."""
+        if self._line_starts is None:
+            self._line_starts = _line_starts(self.read_bytes())
+        return self._line_starts
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """Return the 1-based (line, column) of a byte offset, as byte_position()."""
+        return self.byte_position(self.read_bytes(), offset)
+
+    def byte_position(self, data: bytes | mmap.mmap, offset: int) -> tuple[int, int]:
+        """
+        Return the 1-based (line, column) of a byte offset into the contents.
+
+        The column counts characters; only the start of the line is decoded,
+        and lines are found in O(log lines) from a table built at most once.
+        """
+        if self._line_starts is None:
+            self._line_starts = _line_starts(data)
+        starts = self._line_starts
+        line = bisect.bisect_right(starts, offset)
+        prefix = data[starts[line - 1] : offset].decode("utf-8", errors="replace")
+        return line, len(prefix) + 1
+
+    def line_text(self, line: int) -> str:
+        """
+        Return the text of a 1-based line, without its newline ("" past the end).
+
+        Only that line is decoded, replacing invalid UTF-8 like byte_position().
+        """
+        data = self.read_bytes()
+        starts = self.line_starts()
+        if not 1 <= line <= len(starts):
+            return ""
+        end = starts[line] - 1 if line < len(starts) else len(data)
+        return data[starts[line - 1] : end].decode("utf-8", errors="replace")
+
+
+class FileIndex:
+    """Index of all files and directories under a root, built with one walk."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.files: dict[str, IndexedFile] = {}
+        self.dirs: set[str] = set()
+        self._children: dict[str, list[str]] = {}
+        self.scanned_ns = 0
+        self._walk()
+
+    def _walk(self) -> None:
+        self.scanned_ns = time.time_ns()
+        if not self.root.is_dir():
+            return
+        self.dirs.add("")
+        stack = [("", self.root)]
+        while stack:
+            rel_dir, dir_path = stack.pop()
+            children: list[str] = []
+            try:
+                entries = list(os.scandir(dir_path))
+            except OSError:
+                continue
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        self.dirs.add(rel)
+                        stack.append((rel, Path(entry.path)))
+                    elif entry.is_file():
+                        st = entry.stat()
+                        self.files[rel] = IndexedFile(
+                            rel, Path(entry.path), st.st_size, st.st_mtime_ns
+                        )
+                    else:
+                        continue
+                except OSError:
+                    continue
+                children.append(entry.name)
+            self._children[rel_dir] = sorted(children)
+        self.files = dict(sorted(self.files.items()))
+
+    def rescan(self) -> None:
+        """
+        Walk the root again, e.g. before reusing the index after other writes.
+
+        Files with the same size and mtime keep their cached contents, unless
+        they were modified within RACY_WINDOW_NS of the previous walk.
+        """
+        previous = self.files
+        trusted_before = self.scanned_ns - RACY_WINDOW_NS
+        self.files = {}
+        self.dirs = set()
+        self._children = {}
+        self._walk()
+        for rel_path, entry in self.files.items():
+            old = previous.get(rel_path)
+            if (
+                old is not None
+                and old.size == entry.size
+                and old.mtime_ns == entry.mtime_ns
+                and old.mtime_ns < trusted_before
+            ):
+                self.files[rel_path] = old
+
+    def set_contents(self, rel_path: str, data: bytes) -> IndexedFile:
+        """Replace (or add) a file's contents in memory, e.g. an unsaved editor buffer."""
+        entry = IndexedFile(rel_path, self.root / rel_path, len(data), time.time_ns())
+        entry._data = data
+        self._add(entry)
+        return entry
+
+    def refresh(self, rel_path: str) -> IndexedFile | None:
+        """Re-stat a file from disk, dropping cached contents; remove it if it is gone."""
+        path = self.root / rel_path
+        try:
+            st = path.stat()
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            self._remove(rel_path)
+            return None
+        entry = IndexedFile(rel_path, path, st.st_size, st.st_mtime_ns)
+        self._add(entry)
+        return entry
+
+    def _add(self, entry: IndexedFile) -> None:
+        rel_path = entry.rel_path
+        is_new = rel_path not in self.files
+        self.files[rel_path] = entry
+        if not is_new:
+            return
+        self.files = dict(sorted(self.files.items()))
+        # Register the file and any new parent directories
+        child = rel_path
+        while True:
+            parent, _, name = child.rpartition("/")
+            children = self._children.setdefault(parent, [])
+            if name in children:
+                break
+            children.append(name)
+            children.sort()
+            if parent in self.dirs:
+                break
+            self.dirs.add(parent)
+            child = parent
+
+    def _remove(self, rel_path: str) -> None:
+        if self.files.pop(rel_path, None) is None:
+            return
+        parent, _, name = rel_path.rpartition("/")
+        children = self._children.get(parent)
+        if children and name in children:
+            children.remove(name)
+
+    def get(self, rel_path: str) -> IndexedFile | None:
+        """Return the indexed file at rel_path, if any."""
+        return self.files.get(rel_path)
+
+    def is_file(self, rel_path: str) -> bool:
+        return rel_path in self.files
+
+    def is_dir(self, rel_path: str) -> bool:
+        return rel_path.rstrip("/") in self.dirs
+
+    def exists(self, rel_path: str) -> bool:
+        return self.is_file(rel_path) or self.is_dir(rel_path)
+
+    def list_dir(self, rel_dir: str) -> list[str]:
+        """Return sorted entry names directly under rel_dir."""
+        return list(self._children.get(rel_dir.rstrip("/"), []))
+
+    def iter_files(self, prefix: str = "", suffix: str = "") -> list[IndexedFile]:
+        """
+        Return files (sorted by path) under directory `prefix` ending with `suffix`.
+
+        An empty prefix means the whole tree.
+        """
+        if prefix:
+            prefix = prefix.rstrip("/") + "/"
+        return [
+            f for rel, f in self.files.items() if rel.startswith(prefix) and rel.endswith(suffix)
+        ]
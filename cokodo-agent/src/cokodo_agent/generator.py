@@ -6,8 +6,10 @@ from pathlib import Path
 from typing import Any, Dict, cast
 
 from cokodo_agent.config import AI_TOOLS, TECH_STACKS
+from cokodo_agent.timing import traced
 
 
+@traced("generate.protocol")
 def generate_protocol(
     source_path: Path,
     target_path: Path,
@@ -182,6 +184,7 @@ def _project_name_from_context(agent_dir: Path) -> str:
     return "Project"
 
 
+@traced("generate.adapters")
 def generate_adapters_for_tools(
     target_path: Path,
     agent_dir: Path,
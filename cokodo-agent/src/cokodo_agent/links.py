@@ -0,0 +1,102 @@
+"""Markdown heading anchors for link checking.
+
+Anchors follow GitHub's heading slugs: lowercase, punctuation removed,
+spaces turned into hyphens, with -1, -2, ... appended to repeated slugs.
+Explicit HTML anchors (<a name="..."> / id="...") are included as well.
+
+Documents may be given as UTF-8 bytes (or a memory map): lines are then
+matched as bytes and only heading text and anchor names are decoded.
+"""
+
+import mmap
+import re
+from collections.abc import Callable, Sequence
+from typing import AnyStr
+from urllib.parse import unquote
+
+ATX_HEADING = re.compile(r"^ {0,3}#{1,6}(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+SETEXT_UNDERLINE = re.compile(r"^ {0,3}(?:=+|-+)[ \t]*$")
+FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+HTML_ANCHOR = re.compile(r"""<[^>]*?\b(?:id|name)\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+
+# The same patterns for str and for bytes lines. They are ASCII-only, so as
+# bytes they match UTF-8 (and stray non-UTF-8 bytes) without decoding.
+_TEXT_PATTERNS = (ATX_HEADING, SETEXT_UNDERLINE, FENCE, HTML_ANCHOR)
+_BYTES_PATTERNS = tuple(
+    re.compile(regex.pattern.encode("ascii"), regex.flags & ~re.UNICODE)
+    for regex in _TEXT_PATTERNS
+)
+
+_INLINE_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_HTML_TAG = re.compile(r"<[^>]+>")
+_NON_SLUG = re.compile(r"[^\w\- ]")
+
+
+def github_slug(heading: str) -> str:
+    """Return the GitHub anchor slug for a heading's text (without de-duplication)."""
+    text = _INLINE_LINK.sub(r"\1", heading)
+    text = _HTML_TAG.sub("", text)
+    text = _NON_SLUG.sub("", text.strip().lower())
+    return text.replace(" ", "-")
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+def heading_anchors(content: str | bytes | mmap.mmap) -> frozenset[str]:
+    """Return every anchor a markdown document defines."""
+    if isinstance(content, str):
+        return _collect_anchors(content.splitlines(), _TEXT_PATTERNS, str)
+    return _collect_anchors(bytes(content).splitlines(), _BYTES_PATTERNS, _decode)
+
+
+def _collect_anchors(
+    lines: list[AnyStr],
+    patterns: Sequence[re.Pattern[AnyStr]],
+    decode: Callable[[AnyStr], str],
+) -> frozenset[str]:
+    atx_heading, setext_underline, fence_pattern, html_anchor = patterns
+    anchors: set[str] = set()
+    seen: dict[str, int] = {}
+
+    def add_heading(text: str) -> None:
+        slug = github_slug(text)
+        count = seen.get(slug, 0)
+        seen[slug] = count + 1
+        anchors.add(f"{slug}-{count}" if count else slug)
+
+    fence: AnyStr | None = None
+    previous: AnyStr | None = None
+    for line in lines:
+        if fence is not None:
+            if line.lstrip().startswith(fence):
+                fence = None
+            previous = None
+            continue
+        fence_match = fence_pattern.match(line)
+        if fence_match:
+            fence = fence_match.group(1)
+            previous = None
+            continue
+
+        heading = atx_heading.match(line)
+        if heading:
+            text = heading.group(1)
+            add_heading(decode(text) if text is not None else "")
+            previous = None
+            continue
+        if previous is not None and previous.strip() and setext_underline.match(line):
+            add_heading(decode(previous))
+            previous = None
+            continue
+
+        anchors.update(decode(m.group(1)).lower() for m in html_anchor.finditer(line))
+        previous = line
+
+    return frozenset(anchors)
+
+
+def normalize_anchor(fragment: str) -> str:
+    """Normalize a link fragment (without '#') for comparison with heading anchors."""
+    return unquote(fragment).lower()
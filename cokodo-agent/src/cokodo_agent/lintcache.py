@@ -0,0 +1,239 @@
+"""Incremental lint cache.
+
+Per-file rule results are stored on disk, keyed by rule version and file
+content hash, plus the dependency set for cross-file rules (for
+internal-links: whether each link target existed). Content hashes are reused
+from the previous run when a file's size and mtime are unchanged, so
+unchanged files are neither re-read nor re-scanned.
+
+Results of content-only rules (no dependencies) can also be shared between
+trees through a content-addressed ContentCache, so identical files in
+different .agent trees of a monorepo are scanned once. Its entries are
+separate files that no tree owns; reading one refreshes its mtime, and
+entries unused for CONTENT_CACHE_MAX_AGE_NS are deleted when a tree's cache
+is saved.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from cokodo_agent.cache import (
+    RACY_WINDOW_NS,
+    cache_dir,
+    cache_enabled,
+    cache_path,
+    load_json,
+    save_json,
+)
+from cokodo_agent.fsindex import IndexedFile
+
+# Bump when the cache layout changes
+LINT_CACHE_FORMAT = 2
+
+# Shared content entries not read or written for this long are pruned
+CONTENT_CACHE_MAX_AGE_NS = 30 * 24 * 3600 * 1_000_000_000
+
+# Serialized per-file result: (passed, message, line, column)
+CachedResult = tuple[bool, str, "int | None", "int | None"]
+
+
+class ContentCache:
+    """Per-file results of content-only rules, keyed by (rule, version, content hash)."""
+
+    def __init__(self) -> None:
+        self._memory: dict[tuple[str, int, str], list[CachedResult]] = {}
+        self._pruned = False
+
+    def get(self, rule: str, version: int, file_hash: str) -> list[CachedResult] | None:
+        key = (rule, version, file_hash)
+        results = self._memory.get(key)
+        if results is None:
+            path = cache_path("lint-content", *key)
+            data = load_json(path)
+            if not isinstance(data, list):
+                return None
+            results = [(bool(p), str(m), ln, col) for p, m, ln, col in data]
+            self._memory[key] = results
+            try:
+                os.utime(path)  # keep entries in use from being pruned
+            except OSError:
+                pass
+        return results
+
+    def put(self, rule: str, version: int, file_hash: str, results: list[CachedResult]) -> None:
+        key = (rule, version, file_hash)
+        if key not in self._memory:
+            self._memory[key] = results
+            save_json(cache_path("lint-content", *key), [list(r) for r in results])
+
+    def prune(self) -> None:
+        """Delete entries unused for CONTENT_CACHE_MAX_AGE_NS (once per instance)."""
+        if self._pruned or not cache_enabled():
+            return
+        self._pruned = True
+        cutoff = time.time_ns() - CONTENT_CACHE_MAX_AGE_NS
+        try:
+            with os.scandir(cache_dir("lint-content")) as entries:
+                for entry in entries:
+                    try:
+                        if entry.stat().st_mtime_ns < cutoff:
+                            os.unlink(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+
+class LintCache:
+    """On-disk cache of per-file lint results for one .agent directory."""
+
+    def __init__(self, agent_dir: Path, content: ContentCache | None = None):
+        self.path = cache_path("lint", agent_dir.resolve())
+        self.content = content
+        self.hits = 0
+        self.misses = 0
+        self._files: dict[str, dict[str, Any]] = {}
+        self._saved_ns = 0
+        self._dirty = False
+        self._lock = threading.Lock()  # rules may consult the cache from worker threads
+
+        data = load_json(self.path)
+        if isinstance(data, dict) and data.get("format") == LINT_CACHE_FORMAT:
+            files = data.get("files")
+            if isinstance(files, dict):
+                self._files = files
+                self._saved_ns = int(data.get("saved_ns", 0))
+
+    def file_hash(self, entry: IndexedFile) -> str:
+        """
+        Return the SHA256 of a file, reusing the cached hash when its stat is unchanged.
+
+        Stat data is only trusted for files last modified well before the
+        previous cache write (see RACY_WINDOW_NS).
+        """
+        stat = [entry.size, entry.mtime_ns]
+        with self._lock:
+            record = self._files.get(entry.rel_path)
+            if (
+                record is not None
+                and record.get("stat") == stat
+                and entry.mtime_ns < self._saved_ns - RACY_WINDOW_NS
+            ):
+                return str(record["sha256"])
+
+        with entry.mapped() as data:
+            file_hash = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            record = self._files.get(entry.rel_path)
+            if record is None or record.get("sha256") != file_hash:
+                record = {"sha256": file_hash, "rules": {}}
+                self._files[entry.rel_path] = record
+            if record.get("stat") != stat:
+                record["stat"] = stat
+                self._dirty = True
+        return file_hash
+
+    def lookup(
+        self,
+        rule: str,
+        version: int,
+        entry: IndexedFile,
+        deps_valid: Callable[[dict[str, bool]], bool] | None = None,
+    ) -> list[CachedResult] | None:
+        """Return cached results for (rule, version, file hash, deps) or None on a miss."""
+        file_hash = self.file_hash(entry)
+        with self._lock:
+            rule_record = self._files[entry.rel_path]["rules"].get(rule)
+        if (
+            isinstance(rule_record, dict)
+            and rule_record.get("v") == version
+            and rule_record.get("sha256") == file_hash
+            and (deps_valid is None or deps_valid(rule_record.get("deps", {})))
+        ):
+            with self._lock:
+                self.hits += 1
+            return [(bool(p), str(m), ln, col) for p, m, ln, col in rule_record["results"]]
+
+        shared = self.content.get(rule, version, file_hash) if self.content else None
+        if shared is not None:
+            self.store(rule, version, entry, shared)
+            with self._lock:
+                self.hits += 1
+            return list(shared)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def cached_deps(self, rule: str, version: int, entry: IndexedFile) -> dict[str, bool] | None:
+        """
+        Return the dependencies recorded for a rule without reading the file.
+
+        Only answers when the file's stat is unchanged and trusted (see
+        file_hash); otherwise returns None.
+        """
+        with self._lock:
+            record = self._files.get(entry.rel_path)
+        if (
+            record is None
+            or record.get("stat") != [entry.size, entry.mtime_ns]
+            or entry.mtime_ns >= self._saved_ns - RACY_WINDOW_NS
+        ):
+            return None
+        rule_record = record["rules"].get(rule)
+        if (
+            not isinstance(rule_record, dict)
+            or rule_record.get("v") != version
+            or rule_record.get("sha256") != record.get("sha256")
+        ):
+            return None
+        deps = rule_record.get("deps")
+        return deps if isinstance(deps, dict) else None
+
+    def store(
+        self,
+        rule: str,
+        version: int,
+        entry: IndexedFile,
+        results: list[CachedResult],
+        deps: dict[str, bool] | None = None,
+    ) -> None:
+        """Store per-file results for a rule."""
+        file_hash = self.file_hash(entry)
+        rule_record: dict[str, Any] = {
+            "v": version,
+            "sha256": file_hash,
+            "results": [list(r) for r in results],
+        }
+        if deps is not None:
+            rule_record["deps"] = deps
+        elif self.content is not None:
+            self.content.put(rule, version, file_hash, results)
+        with self._lock:
+            self._files[entry.rel_path]["rules"][rule] = rule_record
+            self._dirty = True
+
+    def prune(self, existing: set[str] | dict[str, Any]) -> None:
+        """Drop records for files that no longer exist."""
+        stale = [rel for rel in self._files if rel not in existing]
+        for rel in stale:
+            del self._files[rel]
+        if stale:
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back to disk if anything changed, pruning stale shared entries."""
+        if self.content is not None:
+            self.content.prune()
+        if not self._dirty:
+            return
+        save_json(
+            self.path,
+            {"format": LINT_CACHE_FORMAT, "saved_ns": time.time_ns(), "files": self._files},
+        )
+        self._dirty = False
@@ -3,11 +3,34 @@
 Based on .agent/meta/agent-protocol-rules.md v3.0.0
 """
 
+import functools
 import hashlib
 import json
+import os
 import re
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
-from typing import NamedTuple
+from typing import NamedTuple, TypeVar
+
+from cokodo_agent.cache import shared
+from cokodo_agent.fsindex import FileIndex, IndexedFile, ReadStats, is_binary, record_reads
+from cokodo_agent.links import heading_anchors, normalize_anchor
+from cokodo_agent.lintcache import CachedResult, LintCache
+from cokodo_agent.rules import LintRule, load_plugin_rules
+from cokodo_agent.scanner import PatternScanner, bytes_pattern
+from cokodo_agent.timing import span, timed_iter
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Normalize a --jobs value: 0 or less means one worker per CPU."""
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
 
 
 class LintResult(NamedTuple):
@@ -18,6 +41,17 @@ class LintResult(NamedTuple):
     message: str
     file: str | None = None
     line: int | None = None
+    column: int | None = None
+
+
+class RuleProfile(NamedTuple):
+    """Cost of one rule in a profiled run."""
+
+    rule: str
+    seconds: float
+    files: int  # files whose contents the rule accessed
+    bytes_read: int  # bytes read from disk (files already read by earlier rules are free)
+    results: int
 
 
 class ProtocolLinter:
@@ -64,10 +98,99 @@ class ProtocolLinter:
         "project",
     ]
 
-    def __init__(self, agent_dir: Path):
+    # Patterns that should NOT appear in start-here.md
+    START_HERE_PATTERNS = [
+        (r"^#\s+[A-Z][a-zA-Z0-9_-]+\s*$", "Project name as title"),
+        (r"项目概述|Project Overview", "Project overview section"),
+        (r"开发状态|Development Status", "Development status"),
+        (r"技术栈|Tech Stack", "Tech stack info"),
+        (r"目录结构|Directory Structure", "Directory structure"),
+        (r"核心数据类型|Core Data Types", "Core data types"),
+        (r"常用命令|Common Commands", "Common commands"),
+    ]
+
+    # Hardcoded machine-specific values in locked files
+    POLLUTION_PATTERNS = [
+        (r"[A-Z]:\\\\", "Windows path"),
+        (r"[A-Z]:/", "Windows path"),
+        (r"/home/\w+/", "Unix home path"),
+        (r"/Users/\w+/", "macOS user path"),
+        (r"localhost:\d+", "Hardcoded localhost"),
+        (r"127\.0\.0\.1:\d+", "Hardcoded IP"),
+    ]
+
+    # Each table compiled once into a single-pass scanner
+    START_HERE_SCANNER = PatternScanner(START_HERE_PATTERNS, re.MULTILINE)
+    POLLUTION_SCANNER = PatternScanner(POLLUTION_PATTERNS, re.IGNORECASE)
+
+    LINK_PATTERN = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+    LINK_BYTES_PATTERN = re.compile(bytes_pattern(LINK_PATTERN.pattern))
+
+    # Reported instead of scanning a file that looks binary
+    BINARY_SKIPPED: CachedResult = (True, "Binary file skipped", None, None)
+
+    # Per-file rule versions; bump to invalidate cached results after a logic change
+    RULE_VERSIONS = {
+        "start-here-spec": 3,
+        "engine-pollution": 3,
+        "internal-links": 2,
+    }
+
+    def __init__(
+        self,
+        agent_dir: Path,
+        index: FileIndex | None = None,
+        cache: LintCache | None = None,
+        jobs: int = 1,
+        only_failures: bool = False,
+        max_errors: int | None = None,
+        changed: set[str] | None = None,
+        rules: list[LintRule] | None = None,
+        profile: bool = False,
+    ):
         self.agent_dir = agent_dir
         self.results: list[LintResult] = []
         self.manifest = self._load_manifest()
+        self._index = index
+        self.cache = cache
+        self.jobs = resolve_jobs(jobs)
+        self.only_failures = only_failures
+        self.max_errors = max_errors
+        self.stopped_early = False  # set when max_errors cut a run short
+        # Changed paths (relative to agent_dir); when set, only affected checks run
+        self.changed = changed
+        # Registered rules in report order: built-ins, then installed plugins
+        if rules is None:
+            rules = [*BUILTIN_RULES, *load_plugin_rules()]
+        self.rules: dict[str, LintRule] = {}
+        for lint_rule in rules:
+            self.rules.setdefault(lint_rule.name, lint_rule)
+        # With profile set, rules run serially and their cost is recorded here
+        self.profile = profile
+        self.profiles: list[RuleProfile] = []
+        self._executor: Executor | None = None
+        # Per-run link resolution state: heading anchors per markdown file and
+        # existence of targets outside agent_dir
+        self._anchors: dict[str, frozenset[str]] = {}
+        self._outside_exists: dict[str, bool] = {}
+        # Link targets of each scanned file ({target[#anchor]: resolves})
+        self.link_deps: dict[str, dict[str, bool]] = {}
+
+    @property
+    def index(self) -> FileIndex:
+        """File index of agent_dir, built on first use and shared by all rules."""
+        if self._index is None:
+            self._index = self._open_index()
+        return self._index
+
+    def _open_index(self) -> FileIndex:
+        # Reused (after a rescan) by later commands of a cache_session(), e.g. `co batch`
+        with span("walk"):
+            return shared(
+                ("index", self.agent_dir.resolve()),
+                lambda: FileIndex(self.agent_dir),
+                FileIndex.rescan,
+            )
 
     def _load_manifest(self) -> dict[str, object]:
         """Load manifest.json."""
@@ -87,82 +210,243 @@ class ProtocolLinter:
 
     def get_all_locked_files(self) -> list[str]:
         """Get list of all locked file paths (relative to .agent)."""
+        index = self.index
         locked_files = []
 
         # Root locked files (except manifest.json which contains checksums)
         for f in self.LOCKED_FILES:
-            if f != "manifest.json":  # Skip manifest itself
-                path = self.agent_dir / f
-                if path.exists():
-                    locked_files.append(f)
+            if f != "manifest.json" and index.exists(f):  # Skip manifest itself
+                locked_files.append(f)
 
         # Locked directories
         for locked_dir in self.LOCKED_DIRS:
-            dir_path = self.agent_dir / locked_dir
-            if dir_path.exists():
-                for file_path in dir_path.rglob("*"):
-                    if file_path.is_file():
-                        rel_path = file_path.relative_to(self.agent_dir)
-                        locked_files.append(str(rel_path).replace("\\", "/"))
+            locked_files.extend(f.rel_path for f in index.iter_files(locked_dir))
 
         # Locked skills
-        skills_dir = self.agent_dir / "skills"
-        if skills_dir.exists():
-            for skill in self.LOCKED_SKILLS:
-                skill_path = skills_dir / skill
-                if skill_path.is_file():
-                    locked_files.append(f"skills/{skill}")
-                elif skill_path.is_dir():
-                    for file_path in skill_path.rglob("*"):
-                        if file_path.is_file():
-                            rel_path = file_path.relative_to(self.agent_dir)
-                            locked_files.append(str(rel_path).replace("\\", "/"))
+        for skill in self.LOCKED_SKILLS:
+            skill_path = f"skills/{skill}"
+            if index.is_file(skill_path):
+                locked_files.append(skill_path)
+            elif index.is_dir(skill_path):
+                locked_files.extend(f.rel_path for f in index.iter_files(skill_path))
 
         return sorted(set(locked_files))
 
+    def _hash_file(self, rel_path: str) -> str | None:
+        """SHA256 of an indexed file (contents are read once per run)."""
+        entry = self.index.get(rel_path)
+        if entry is None:
+            return None
+        if self.cache is not None:
+            return self.cache.file_hash(entry)
+        with entry.mapped() as data:
+            return hashlib.sha256(data).hexdigest()
+
+    def _hash_files(self, rel_paths: list[str]) -> dict[str, str | None]:
+        """Hash several indexed files, on the worker pool when one is active."""
+        return dict(zip(rel_paths, self._map(self._hash_file, rel_paths), strict=True))
+
     def generate_checksums(self) -> dict[str, str]:
         """Generate checksums for all locked files."""
-        checksums = {}
-        for rel_path in self.get_all_locked_files():
-            file_path = self.agent_dir / rel_path
-            if file_path.exists():
-                checksums[rel_path] = self.compute_sha256(file_path)
-        return checksums
+        with span("hash"):
+            hashes = self._hash_files(self.get_all_locked_files())
+        return {rel_path: h for rel_path, h in hashes.items() if h is not None}
+
+    def _rule_functions(self) -> dict[str, Callable[[], Iterable[LintResult]]]:
+        """Rule name -> result-returning implementation, in report order."""
+        return {name: functools.partial(self._run_rule, rule) for name, rule in self.rules.items()}
+
+    def _run_rule(self, rule: LintRule) -> Iterable[LintResult]:
+        """Run a registered rule; per-file rules are applied to each in-scope file."""
+        if not rule.per_file:
+            return rule.check(self)
+        entries = [
+            entry
+            for entry in self.index.iter_files(suffix=rule.suffix)
+            if self._in_scope(entry.rel_path)
+        ]
+        per_file = self._imap(lambda entry: list(rule.check(self, entry)), entries)
+        return (result for results in per_file for result in results)
 
     def lint_all(self) -> list[LintResult]:
         """Execute all checks."""
-        self.check_directory_structure()
-        self.check_required_files()
-        self.check_integrity()
-        self.check_start_here_spec()
-        self.check_naming_convention()
-        self.check_skills_placement()
-        self.check_engine_pollution()
-        self.check_internal_links()
+        self.results.extend(self.iter_results())
         return self.results
 
     def lint_rule(self, rule: str) -> list[LintResult]:
         """Execute specific rule check."""
-        rule_methods = {
-            "directory-structure": self.check_directory_structure,
-            "required-files": self.check_required_files,
-            "integrity-violation": self.check_integrity,
-            "start-here-spec": self.check_start_here_spec,
-            "naming-convention": self.check_naming_convention,
-            "skills-placement": self.check_skills_placement,
-            "engine-pollution": self.check_engine_pollution,
-            "internal-links": self.check_internal_links,
-        }
-        if rule in rule_methods:
-            rule_methods[rule]()
+        if rule in self._rule_functions():
+            self.results.extend(self.iter_results([rule]))
         return self.results
 
+    def iter_results(self, rules: list[str] | None = None) -> Iterator[LintResult]:
+        """
+        Yield results of the given rules (default: all) in rule order, then file order.
+
+        Results are not stored in self.results. Passing results are skipped
+        when only_failures is set, and the run stops after max_errors failures.
+        With jobs > 1, independent rules run concurrently and per-file work
+        inside a rule (hashing, scans) is spread over a shared worker pool.
+        """
+        functions = self._rule_functions()
+        rules = list(functions) if rules is None else [r for r in rules if r in functions]
+        if not rules:
+            return
+        if self._index is None:
+            # Build the index before any worker touches it
+            self._index = self._open_index()
+
+        self.stopped_early = False
+        errors = 0
+        try:
+            for result in timed_iter("lint", self._run_rules(functions, rules), rules=rules):
+                if result.passed:
+                    if self.only_failures:
+                        continue
+                else:
+                    errors += 1
+                yield result
+                if self.max_errors is not None and errors >= self.max_errors:
+                    self.stopped_early = True
+                    return
+        finally:
+            self._save_cache()
+
+    def _run_rules(
+        self, functions: dict[str, Callable[[], Iterable[LintResult]]], rules: list[str]
+    ) -> Iterator[LintResult]:
+        """Run rules serially (lazily, file by file) or on the worker pools."""
+        if self.profile:
+            # Serial, so time and reads are attributed to one rule at a time
+            for rule in rules:
+                yield from self._profiled(rule, functions[rule])
+            return
+        if self.jobs <= 1:
+            for rule in rules:
+                yield from functions[rule]()
+            return
+
+        file_pool = ThreadPoolExecutor(self.jobs)
+        rule_pool = ThreadPoolExecutor(min(self.jobs, len(rules)))
+        self._executor = file_pool
+        try:
+            for rule_results in rule_pool.map(lambda r: list(functions[r]()), rules):
+                yield from rule_results
+        finally:
+            # On early exit, drop queued work; rules still running fail fast
+            # once the file pool refuses new tasks.
+            rule_pool.shutdown(wait=False, cancel_futures=True)
+            file_pool.shutdown(wait=True, cancel_futures=True)
+            rule_pool.shutdown(wait=True)
+            self._executor = None
+
+    def _profiled(
+        self, rule: str, function: Callable[[], Iterable[LintResult]]
+    ) -> Iterator[LintResult]:
+        """Run a rule, timing only its own work (not the consumer's) between results."""
+        stats = ReadStats()
+        elapsed = 0.0
+        count = 0
+        try:
+            start = time.perf_counter()
+            with record_reads(stats):
+                results = iter(function())
+            elapsed += time.perf_counter() - start
+            while True:
+                start = time.perf_counter()
+                with record_reads(stats):
+                    result = next(results, None)
+                elapsed += time.perf_counter() - start
+                if result is None:
+                    return
+                count += 1
+                yield result
+        finally:
+            self.profiles.append(
+                RuleProfile(rule, elapsed, len(stats.files), stats.bytes_read, count)
+            )
+
+    def lint_file(self, rel_path: str) -> list[LintResult]:
+        """
+        Run every check that reports on a single file (e.g. for an editor).
+
+        Results are returned in rule order and not stored in self.results.
+        """
+        entry = self.index.get(rel_path)
+        if entry is None:
+            return []
+        functions = self._rule_functions()
+        saved, self.changed = self.changed, {rel_path}
+        try:
+            results: list[LintResult] = []
+            for rule in functions:
+                lint_rule = self.rules[rule]
+                if lint_rule.per_file:
+                    if rel_path.endswith(lint_rule.suffix):
+                        results.extend(lint_rule.check(self, entry))
+                elif rule == "internal-links":
+                    # Only this file's own links, not files linking to it
+                    if rel_path.endswith(".md"):
+                        results.extend(self._file_results(rule, entry, self._scan_links))
+                else:
+                    results.extend(functions[rule]())
+        finally:
+            self.changed = saved
+        return [r for r in results if r.file == rel_path and not (r.passed and self.only_failures)]
+
+    def invalidate(self, rel_path: str) -> None:
+        """Forget per-run state derived from a file after its contents changed."""
+        self._anchors.pop(rel_path, None)
+        self._outside_exists.clear()
+        if rel_path == "manifest.json":
+            self.manifest = self._load_manifest()
+
+    def linked_from(self, rel_path: str) -> list[str]:
+        """Return scanned files with a link (or #anchor link) to rel_path."""
+        return sorted(
+            source
+            for source, deps in self.link_deps.items()
+            if source != rel_path
+            and any(self._normalize_target(key.partition("#")[0]) == rel_path for key in deps)
+        )
+
+    def _in_scope(self, rel_path: str) -> bool:
+        """Check whether a path (or, for a directory, anything under it) is in the changed set."""
+        if self.changed is None or rel_path in self.changed:
+            return True
+        prefix = rel_path.rstrip("/") + "/"
+        return any(c.startswith(prefix) for c in self.changed)
+
+    def _imap(self, func: Callable[[T], R], items: Iterable[T]) -> Iterator[R]:
+        """Lazily apply func to items, on the worker pool when active; order is preserved."""
+        if self._executor is None:
+            return (func(item) for item in items)
+        return self._executor.map(func, items)
+
+    def _map(self, func: Callable[[T], R], items: Iterable[T]) -> list[R]:
+        """Apply func to items, on the worker pool when active; order is preserved."""
+        return list(self._imap(func, items))
+
+    def _save_cache(self) -> None:
+        """Persist the lint cache, dropping records of files that no longer exist."""
+        if self.cache is not None:
+            with span("lint.cache") as current:
+                current.add(cache_hits=self.cache.hits)
+                self.cache.prune(self.index.files)
+                self.cache.save()
+
     def check_directory_structure(self) -> None:
         """Check standard directories exist."""
+        self.results.extend(self._rule_directory_structure())
+
+    def _rule_directory_structure(self) -> list[LintResult]:
+        results: list[LintResult] = []
         for dir_name in self.STANDARD_DIRS:
+            if not self._in_scope(dir_name):
+                continue
             dir_path = self.agent_dir / dir_name
             if dir_path.exists() and dir_path.is_dir():
-                self.results.append(
+                results.append(
                     LintResult(
                         "directory-structure",
                         True,
@@ -171,7 +455,7 @@ class ProtocolLinter:
                     )
                 )
             else:
-                self.results.append(
+                results.append(
                     LintResult(
                         "directory-structure",
                         False,
@@ -179,26 +463,34 @@ class ProtocolLinter:
                         dir_name,
                     )
                 )
+        return results
 
     def check_required_files(self) -> None:
         """Check required files in project/ directory."""
+        self.results.extend(self._rule_required_files())
+
+    def _rule_required_files(self) -> list[LintResult]:
+        results: list[LintResult] = []
         project_dir = self.agent_dir / "project"
 
         if not project_dir.exists():
-            self.results.append(
-                LintResult(
-                    "required-files",
-                    False,
-                    "project/ directory does not exist",
-                    "project",
+            if self._in_scope("project"):
+                results.append(
+                    LintResult(
+                        "required-files",
+                        False,
+                        "project/ directory does not exist",
+                        "project",
+                    )
                 )
-            )
-            return
+            return results
 
         for file_name in self.REQUIRED_PROJECT_FILES:
+            if not self._in_scope(f"project/{file_name}"):
+                continue
             file_path = project_dir / file_name
             if file_path.exists():
-                self.results.append(
+                results.append(
                     LintResult(
                         "required-files",
                         True,
@@ -207,7 +499,7 @@ class ProtocolLinter:
                     )
                 )
             else:
-                self.results.append(
+                results.append(
                     LintResult(
                         "required-files",
                         False,
@@ -218,9 +510,11 @@ class ProtocolLinter:
 
         # Also check root required files
         for file_name in self.LOCKED_FILES:
+            if not self._in_scope(file_name):
+                continue
             file_path = self.agent_dir / file_name
             if file_path.exists():
-                self.results.append(
+                results.append(
                     LintResult(
                         "required-files",
                         True,
@@ -229,7 +523,7 @@ class ProtocolLinter:
                     )
                 )
             else:
-                self.results.append(
+                results.append(
                     LintResult(
                         "required-files",
                         False,
@@ -237,16 +531,19 @@ class ProtocolLinter:
                         file_name,
                     )
                 )
+        return results
 
     def check_integrity(self) -> None:
         """Check integrity of locked files using SHA256 checksums."""
+        self.results.extend(self._rule_integrity())
+
+    def _rule_integrity(self) -> list[LintResult]:
+        results: list[LintResult] = []
         checksums_obj = self.manifest.get("checksums", {})
-        stored_checksums: dict[str, str] = (
-            checksums_obj if isinstance(checksums_obj, dict) else {}
-        )
+        stored_checksums: dict[str, str] = checksums_obj if isinstance(checksums_obj, dict) else {}
 
         if not stored_checksums:
-            self.results.append(
+            results.append(
                 LintResult(
                     "integrity-violation",
                     False,
@@ -254,16 +551,19 @@ class ProtocolLinter:
                     "manifest.json",
                 )
             )
-            return
+            return results
 
         locked_files = self.get_all_locked_files()
+        if not self._in_scope("manifest.json"):
+            # Checksums unchanged: only changed locked files can have drifted
+            locked_files = [f for f in locked_files if self._in_scope(f)]
+            stored_checksums = {f: h for f, h in stored_checksums.items() if self._in_scope(f)}
+        hashes = self._hash_files([f for f in locked_files if f in stored_checksums])
 
         for rel_path in locked_files:
-            file_path = self.agent_dir / rel_path
-
             if rel_path not in stored_checksums:
                 # New file not in checksums - could be unauthorized addition
-                self.results.append(
+                results.append(
                     LintResult(
                         "integrity-violation",
                         False,
@@ -273,8 +573,9 @@ class ProtocolLinter:
                 )
                 continue
 
-            if not file_path.exists():
-                self.results.append(
+            current_hash = hashes[rel_path]
+            if current_hash is None:
+                results.append(
                     LintResult(
                         "integrity-violation",
                         False,
@@ -284,11 +585,10 @@ class ProtocolLinter:
                 )
                 continue
 
-            current_hash = self.compute_sha256(file_path)
             expected_hash = stored_checksums[rel_path]
 
             if current_hash == expected_hash:
-                self.results.append(
+                results.append(
                     LintResult(
                         "integrity-violation",
                         True,
@@ -297,7 +597,7 @@ class ProtocolLinter:
                     )
                 )
             else:
-                self.results.append(
+                results.append(
                     LintResult(
                         "integrity-violation",
                         False,
@@ -309,9 +609,8 @@ class ProtocolLinter:
         # Check for files in checksums that no longer exist
         for rel_path in stored_checksums:
             if rel_path not in locked_files:
-                file_path = self.agent_dir / rel_path
-                if not file_path.exists():
-                    self.results.append(
+                if not self.index.exists(rel_path):
+                    results.append(
                         LintResult(
                             "integrity-violation",
                             False,
@@ -319,216 +618,332 @@ class ProtocolLinter:
                             rel_path,
                         )
                     )
+        return results
 
     def check_start_here_spec(self) -> None:
         """Check start-here.md does not contain project-specific info."""
-        start_here = self.agent_dir / "start-here.md"
-
-        if not start_here.exists():
-            return  # Already reported in required-files
-
-        content = start_here.read_text(encoding="utf-8")
-
-        # Patterns that should NOT appear in start-here.md
-        forbidden_patterns = [
-            (r"^#\s+[A-Z][a-zA-Z0-9_-]+\s*$", "Project name as title"),
-            (r"项目概述|Project Overview", "Project overview section"),
-            (r"开发状态|Development Status", "Development status"),
-            (r"技术栈|Tech Stack", "Tech stack info"),
-            (r"目录结构|Directory Structure", "Directory structure"),
-            (r"核心数据类型|Core Data Types", "Core data types"),
-            (r"常用命令|Common Commands", "Common commands"),
-        ]
-
-        found_violation = False
-        for pattern, desc in forbidden_patterns:
-            matches = list(re.finditer(pattern, content, re.MULTILINE))
-            if matches:
-                found_violation = True
-                for match in matches:
-                    line_num = content[: match.start()].count("\n") + 1
-                    self.results.append(
-                        LintResult(
-                            "start-here-spec",
-                            False,
-                            f"Should not contain {desc}: '{match.group().strip()}'",
-                            "start-here.md",
-                            line_num,
-                        )
+        self.results.extend(self._rule_start_here_spec())
+
+    def _rule_start_here_spec(self) -> list[LintResult]:
+        start_here = self.index.get("start-here.md")
+
+        if start_here is None:
+            return []  # Already reported in required-files
+        if not self._in_scope(start_here.rel_path):
+            return []
+
+        return self._file_results("start-here-spec", start_here, self._scan_start_here)
+
+    def _scan_start_here(self, entry: IndexedFile) -> tuple[list[CachedResult], None]:
+        """Scan start-here.md for forbidden project-specific patterns."""
+        found: list[CachedResult] = []
+        with entry.mapped() as data:
+            if is_binary(data):
+                return [self.BINARY_SKIPPED], None
+            # Every match of each pattern, grouped by pattern in table order
+            for match in self.START_HERE_SCANNER.scan_each(data):
+                line_num, column = entry.byte_position(data, match.start)
+                found.append(
+                    (
+                        False,
+                        f"Should not contain {match.label}: '{match.text.strip()}'",
+                        line_num,
+                        column,
                     )
-
-        if not found_violation:
-            self.results.append(
-                LintResult(
-                    "start-here-spec",
-                    True,
-                    "No project-specific content detected",
-                    "start-here.md",
                 )
-            )
+
+        if not found:
+            found.append((True, "No project-specific content detected", None, None))
+        return found, None
 
     def check_naming_convention(self) -> None:
         """Check kebab-case naming convention for .md files."""
+        self.results.extend(self._rule_naming_convention())
+
+    def _rule_naming_convention(self) -> list[LintResult]:
+        results: list[LintResult] = []
         # kebab-case pattern (allows single word)
         pattern = re.compile(r"^[a-z0-9]+(-[a-z0-9]+)*\.md$")
         # Exceptions
         exceptions = {"MANIFEST.json", "VERSION", "SKILL.md", "README.md"}
 
-        for path in self.agent_dir.rglob("*.md"):
-            relative = path.relative_to(self.agent_dir)
-
-            if path.name in exceptions:
+        for entry in self.index.iter_files(suffix=".md"):
+            if entry.name in exceptions or not self._in_scope(entry.rel_path):
                 continue
 
-            if pattern.match(path.name):
-                self.results.append(
+            if pattern.match(entry.name):
+                results.append(
                     LintResult(
                         "naming-convention",
                         True,
                         "Follows kebab-case",
-                        str(relative),
+                        entry.rel_path,
                     )
                 )
             else:
-                self.results.append(
+                results.append(
                     LintResult(
                         "naming-convention",
                         False,
-                        f"Should use kebab-case: {path.name}",
-                        str(relative),
+                        f"Should use kebab-case: {entry.name}",
+                        entry.rel_path,
                     )
                 )
+        return results
 
     def check_skills_placement(self) -> None:
         """Check project-specific skills are in _project/ directory."""
-        skills_dir = self.agent_dir / "skills"
+        self.results.extend(self._rule_skills_placement())
 
-        if not skills_dir.exists():
-            return
+    def _rule_skills_placement(self) -> list[LintResult]:
+        results: list[LintResult] = []
+        if not self.index.is_dir("skills"):
+            return results
 
         # Get all items directly under skills/
-        for item in skills_dir.iterdir():
-            if item.name.startswith("."):
+        for name in self.index.list_dir("skills"):
+            relative = f"skills/{name}"
+            if name.startswith(".") or not self._in_scope(relative):
                 continue
 
-            relative = item.relative_to(self.agent_dir)
-
             # Check if it's a standard skill or _project
-            if item.name in self.LOCKED_SKILLS or item.name == "_project":
-                self.results.append(
+            if name in self.LOCKED_SKILLS or name == "_project":
+                results.append(
                     LintResult(
                         "skills-placement",
                         True,
                         "Valid skill location",
-                        str(relative),
+                        relative,
                     )
                 )
             else:
                 # Non-standard item in skills/ root
-                self.results.append(
+                results.append(
                     LintResult(
                         "skills-placement",
                         False,
-                        f"Project skill must be in skills/_project/: {item.name}",
-                        str(relative),
+                        f"Project skill must be in skills/_project/: {name}",
+                        relative,
                     )
                 )
+        return results
 
     def check_engine_pollution(self) -> None:
         """Check for hardcoded paths in locked directories."""
-        pollution_patterns = [
-            (r"[A-Z]:\\\\", "Windows path"),
-            (r"[A-Z]:/", "Windows path"),
-            (r"/home/\w+/", "Unix home path"),
-            (r"/Users/\w+/", "macOS user path"),
-            (r"localhost:\d+", "Hardcoded localhost"),
-            (r"127\.0\.0\.1:\d+", "Hardcoded IP"),
+        self.results.extend(self._rule_engine_pollution())
+
+    def _rule_engine_pollution(self) -> Iterator[LintResult]:
+        entries = [
+            entry
+            for locked_dir in self.LOCKED_DIRS
+            for entry in self.index.iter_files(locked_dir, suffix=".md")
+            if self._in_scope(entry.rel_path)
         ]
-
-        for locked_dir in self.LOCKED_DIRS:
-            dir_path = self.agent_dir / locked_dir
-            if not dir_path.exists():
-                continue
-
-            for path in dir_path.rglob("*.md"):
-                relative = path.relative_to(self.agent_dir)
-                content = path.read_text(encoding="utf-8")
-
-                found_pollution = False
-                for pattern, desc in pollution_patterns:
-                    matches = list(re.finditer(pattern, content, re.IGNORECASE))
-                    if matches:
-                        found_pollution = True
-                        for match in matches:
-                            line_num = content[: match.start()].count("\n") + 1
-                            self.results.append(
-                                LintResult(
-                                    "engine-pollution",
-                                    False,
-                                    f"Found {desc}: {match.group()}",
-                                    str(relative),
-                                    line_num,
-                                )
-                            )
-
-                if not found_pollution:
-                    self.results.append(
-                        LintResult(
-                            "engine-pollution",
-                            True,
-                            "No pollution detected",
-                            str(relative),
-                        )
-                    )
+        per_file = self._imap(
+            lambda e: self._file_results("engine-pollution", e, self._scan_pollution), entries
+        )
+        return (r for file_results in per_file for r in file_results)
+
+    def _scan_pollution(self, entry: IndexedFile) -> tuple[list[CachedResult], None]:
+        """Scan one locked file for hardcoded machine-specific paths."""
+        found: list[CachedResult] = []
+        with entry.mapped() as data:
+            if is_binary(data):
+                return [self.BINARY_SKIPPED], None
+            # Every match of each pattern, grouped by pattern in table order
+            for match in self.POLLUTION_SCANNER.scan_each(data):
+                line_num, column = entry.byte_position(data, match.start)
+                found.append((False, f"Found {match.label}: {match.text}", line_num, column))
+
+        if not found:
+            found.append((True, "No pollution detected", None, None))
+        return found, None
 
     def check_internal_links(self) -> None:
         """Check internal link validity."""
-        link_pattern = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+        self.results.extend(self._rule_internal_links())
 
-        for path in self.agent_dir.rglob("*.md"):
-            relative = path.relative_to(self.agent_dir)
-            content = path.read_text(encoding="utf-8")
+    def _rule_internal_links(self) -> Iterator[LintResult]:
+        per_file = self._imap(
+            lambda e: self._file_results("internal-links", e, self._scan_links),
+            self._link_sources(),
+        )
+        return (r for file_results in per_file for r in file_results)
+
+    def _link_sources(self) -> list[IndexedFile]:
+        """
+        Return the files whose links need checking.
+
+        With a changed-files scope: the changed files plus files linking to a
+        changed path (reverse edges from the cached link dependencies). Files
+        without trustworthy cached dependencies are always included.
+        """
+        entries = self.index.iter_files(suffix=".md")
+        if self.changed is None:
+            return entries
+
+        version = self.RULE_VERSIONS["internal-links"]
+        sources = []
+        for entry in entries:
+            if entry.rel_path in self.changed:
+                sources.append(entry)
+                continue
+            deps = None
+            if self.cache is not None:
+                deps = self.cache.cached_deps("internal-links", version, entry)
+            if deps is None or any(self._target_changed(target) for target in deps):
+                sources.append(entry)
+        return sources
+
+    def _target_changed(self, key: str) -> bool:
+        """Check whether a link dependency (target[#anchor]) points at a changed path."""
+        target = key.partition("#")[0]
+        normalized = os.path.normpath(target).replace("\\", "/") if target else "."
+        if normalized == "." or normalized == ".." or normalized.startswith("../"):
+            return False  # Root or outside .agent: never in the changed set
+        return self._in_scope(normalized)
+
+    def _scan_links(self, entry: IndexedFile) -> tuple[list[CachedResult], dict[str, bool]]:
+        """
+        Check links (and #anchors) in one file.
+
+        Also returns {target[#anchor]: resolves} for links into other files as
+        cache dependencies.
+        """
+        base_dir = entry.rel_path.rpartition("/")[0]
+        found: list[CachedResult] = []
+        deps: dict[str, bool] = {}
+        with entry.mapped() as data:
+            if is_binary(data):
+                return [self.BINARY_SKIPPED], deps
+            links = [
+                (
+                    match.group(2).decode("utf-8", errors="replace"),
+                    entry.byte_position(data, match.start()),
+                )
+                for match in self.LINK_BYTES_PATTERN.finditer(data)
+            ]
 
-            for match in link_pattern.finditer(content):
-                link_text, link_target = match.groups()
+        for link_target, (line_num, column) in links:
 
-                # Skip external links and anchors
-                if link_target.startswith(("http://", "https://", "#", "mailto:")):
-                    continue
+            # Skip external links
+            if link_target.startswith(("http://", "https://", "mailto:")):
+                continue
+
+            target, _, fragment = link_target.partition("#")
 
-                # Parse relative path
-                if link_target.startswith("/"):
-                    target_path = self.agent_dir / link_target[1:]
+            if not target:
+                # Same-file anchor: depends only on this file's own content
+                if fragment and normalize_anchor(fragment) not in self._anchors_of(entry):
+                    found.append((False, f"Broken anchor: {link_target}", line_num, column))
                 else:
-                    target_path = path.parent / link_target
+                    found.append((True, f"Link valid: {link_target}", line_num, column))
+                continue
 
-                # Handle anchors in path
-                target_str = str(target_path)
-                if "#" in target_str:
-                    target_path = Path(target_str.split("#")[0])
+            # Parse relative path
+            if target.startswith("/"):
+                target = target[1:]
+            elif base_dir:
+                target = f"{base_dir}/{target}"
 
-                line_num = content[: match.start()].count("\n") + 1
+            exists = self._target_exists(target)
+            deps[target] = exists
+            if not exists:
+                found.append((False, f"Broken link: {link_target}", line_num, column))
+                continue
 
-                if target_path.exists():
-                    self.results.append(
-                        LintResult(
-                            "internal-links",
-                            True,
-                            f"Link valid: {link_target}",
-                            str(relative),
-                            line_num,
-                        )
-                    )
-                else:
-                    self.results.append(
-                        LintResult(
-                            "internal-links",
-                            False,
-                            f"Broken link: {link_target}",
-                            str(relative),
-                            line_num,
-                        )
-                    )
+            if fragment:
+                anchor_ok = self._link_resolves(f"{target}#{fragment}")
+                deps[f"{target}#{fragment}"] = anchor_ok
+                if not anchor_ok:
+                    found.append((False, f"Broken anchor: {link_target}", line_num, column))
+                    continue
+
+            found.append((True, f"Link valid: {link_target}", line_num, column))
+
+        return found, deps
+
+    def _anchors_of(self, entry: IndexedFile) -> frozenset[str]:
+        """Heading anchors of a markdown file, computed once per run."""
+        anchors = self._anchors.get(entry.rel_path)
+        if anchors is None:
+            # Scanned as bytes: files of any encoding, without decoding them whole
+            with entry.mapped() as data:
+                anchors = self._anchors.setdefault(entry.rel_path, heading_anchors(data))
+        return anchors
+
+    def _link_resolves(self, key: str) -> bool:
+        """
+        Check a link dependency: target path, plus the #anchor if any.
+
+        Anchors are only verified in markdown files inside agent_dir.
+        """
+        target, _, fragment = key.partition("#")
+        if not self._target_exists(target):
+            return False
+        if not fragment:
+            return True
+        entry = self.index.get(self._normalize_target(target))
+        if entry is None or not entry.rel_path.endswith(".md"):
+            return True
+        return normalize_anchor(fragment) in self._anchors_of(entry)
+
+    def _file_results(
+        self,
+        rule: str,
+        entry: IndexedFile,
+        scan: Callable[[IndexedFile], tuple[list[CachedResult], dict[str, bool] | None]],
+    ) -> list[LintResult]:
+        """Run a per-file rule, replaying cached results when the lint cache is valid."""
+        version = self.RULE_VERSIONS[rule]
+        found = None
+        if self.cache is not None:
+            found = self.cache.lookup(rule, version, entry, self._deps_valid)
+        if found is None:
+            found, deps = scan(entry)
+            if deps is not None:
+                self.link_deps[entry.rel_path] = deps
+            if self.cache is not None:
+                self.cache.store(rule, version, entry, found, deps)
+        return [
+            LintResult(rule, passed, msg, entry.rel_path, line, column)
+            for passed, msg, line, column in found
+            if not (passed and self.only_failures)
+        ]
+
+    def _deps_valid(self, deps: dict[str, bool]) -> bool:
+        """Check that every recorded link target (and anchor) still resolves the same way."""
+        return all(self._link_resolves(key) == resolves for key, resolves in deps.items())
+
+    @staticmethod
+    def _normalize_target(target: str) -> str:
+        return os.path.normpath(target).replace("\\", "/") if target else "."
+
+    def _target_exists(self, target: str) -> bool:
+        """Check a link target (relative to agent_dir) with in-memory lookups."""
+        normalized = self._normalize_target(target)
+        if normalized == ".":
+            return True
+        if normalized == ".." or normalized.startswith("../"):
+            # Outside .agent (e.g. project README): not indexed, stat once per run
+            exists = self._outside_exists.get(normalized)
+            if exists is None:
+                exists = (self.agent_dir / normalized).exists()
+                self._outside_exists[normalized] = exists
+            return exists
+        return self.index.exists(normalized)
+
+
+BUILTIN_RULES = [
+    LintRule("directory-structure", ProtocolLinter._rule_directory_structure),
+    LintRule("required-files", ProtocolLinter._rule_required_files),
+    LintRule("integrity-violation", ProtocolLinter._rule_integrity),
+    LintRule("start-here-spec", ProtocolLinter._rule_start_here_spec),
+    LintRule("naming-convention", ProtocolLinter._rule_naming_convention),
+    LintRule("skills-placement", ProtocolLinter._rule_skills_placement),
+    LintRule("engine-pollution", ProtocolLinter._rule_engine_pollution),
+    LintRule("internal-links", ProtocolLinter._rule_internal_links),
+]
 
 
 def update_checksums(agent_dir: Path) -> dict[str, str]:
@@ -0,0 +1,101 @@
+"""Lint many .agent trees (monorepos) across worker processes.
+
+Each tree is linted independently with its own lint cache. Results of
+content-only rules are shared between trees through a ContentCache, kept in
+memory per worker process and on disk for every process.
+"""
+
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from cokodo_agent import config
+from cokodo_agent.lintcache import ContentCache, LintCache
+from cokodo_agent.linter import LintResult, ProtocolLinter, resolve_jobs
+
+_content_cache: ContentCache | None = None  # one per process
+
+
+class TreeReport(NamedTuple):
+    """Lint outcome for one .agent tree."""
+
+    agent_dir: Path
+    results: list[LintResult]
+    hits: int = 0
+    misses: int = 0
+    stopped_early: bool = False
+    error: str | None = None
+
+
+def _init_worker(cache_dir: str) -> None:
+    """Share the parent's cache location with worker processes."""
+    config.DEFAULT_CACHE_DIR = Path(cache_dir)
+
+
+def lint_tree(
+    agent_dir: Path,
+    rules: list[str] | None = None,
+    use_cache: bool = True,
+    only_failures: bool = False,
+    max_errors: int | None = None,
+) -> TreeReport:
+    """Lint one tree; errors are reported in the TreeReport instead of raised."""
+    global _content_cache
+    cache = None
+    if use_cache:
+        if _content_cache is None:
+            _content_cache = ContentCache()
+        cache = LintCache(agent_dir, content=_content_cache)
+
+    try:
+        linter = ProtocolLinter(
+            agent_dir, cache=cache, only_failures=only_failures, max_errors=max_errors
+        )
+        results = list(linter.iter_results(rules))
+    except (OSError, ValueError) as e:  # includes corrupt manifests and bad encodings
+        return TreeReport(agent_dir, [], error=str(e))
+
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    return TreeReport(agent_dir, results, hits, misses, linter.stopped_early)
+
+
+def lint_trees(
+    agent_dirs: list[Path],
+    jobs: int = 1,
+    rules: list[str] | None = None,
+    use_cache: bool = True,
+    only_failures: bool = False,
+    max_errors: int | None = None,
+) -> list[TreeReport]:
+    """Lint trees in order, on a process pool when jobs > 1 (0 = one per CPU)."""
+    task = functools.partial(
+        lint_tree,
+        rules=rules,
+        use_cache=use_cache,
+        only_failures=only_failures,
+        max_errors=max_errors,
+    )
+    workers = min(resolve_jobs(jobs), len(agent_dirs))
+    if workers <= 1:
+        return [task(agent_dir) for agent_dir in agent_dirs]
+
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(str(config.DEFAULT_CACHE_DIR),)
+    ) as pool:
+        return list(pool.map(task, agent_dirs))
+
+
+def aggregate_results(root: Path, reports: list[TreeReport]) -> list[LintResult]:
+    """Merge tree reports into one list with file paths relative to root."""
+    merged: list[LintResult] = []
+    for report in reports:
+        try:
+            prefix = report.agent_dir.relative_to(root).as_posix()
+        except ValueError:
+            prefix = report.agent_dir.as_posix()
+        if report.error is not None:
+            merged.append(LintResult("lint-error", False, report.error, prefix))
+        for r in report.results:
+            merged.append(r._replace(file=f"{prefix}/{r.file}" if r.file else prefix))
+    return merged
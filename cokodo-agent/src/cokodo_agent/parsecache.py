@@ -0,0 +1,154 @@
+"""Persistent cache of parsed IDE instruction files.
+
+Parses are stored per project root, keyed by the file's path, size and
+mtime_ns and by the parser's spec version (IDE_SPEC_VERSIONS) plus
+PARSER_VERSION, so a changed file or a parser update re-parses. Gemini files
+with @imports also record the stat of every referenced path, since their
+parse includes the imported files. Views into the raw content (rules,
+sections, references) are stored as offsets, so each text is stored once.
+"""
+
+import os
+import time
+from collections.abc import Mapping
+from dataclasses import fields
+from pathlib import Path
+from typing import Any
+
+from cokodo_agent.cache import RACY_WINDOW_NS, cache_path, load_json, save_json
+from cokodo_agent.parser.models import ParsedInstruction, SectionMap, SpanSequence
+
+# Bump when the cache layout changes
+PARSE_CACHE_FORMAT = 2
+# Bump when extraction changes without an IDE spec version change
+PARSER_VERSION = 1
+
+_FIELDS = [f.name for f in fields(ParsedInstruction)]
+
+
+def _encode(parsed: ParsedInstruction) -> list[Any]:
+    """Field values, with views into raw_content as [start, end] offsets."""
+    values: list[Any] = []
+    for name in _FIELDS:
+        value = getattr(parsed, name)
+        if isinstance(value, SpanSequence) and value.source is parsed.raw_content:
+            value = [list(span) for span in value.spans]
+        elif isinstance(value, SectionMap) and value.source is parsed.raw_content:
+            value = {heading: list(span) for heading, span in value.spans.items()}
+        elif isinstance(value, Mapping):
+            value = dict(value)
+        elif name in ("referenced_files", "rules"):
+            value = list(value)
+        values.append(value)
+    return values
+
+
+def _decode(values: list[Any]) -> ParsedInstruction:
+    parsed = ParsedInstruction(*values)
+    raw = parsed.raw_content
+    # Offsets are [start, end] pairs; materialized values are strings
+    for name in ("referenced_files", "rules"):
+        items = getattr(parsed, name)
+        if items and all(isinstance(item, list) for item in items):
+            setattr(parsed, name, SpanSequence(raw, [(s, e) for s, e in items]))
+    sections: Any = parsed.sections  # {heading: [start, end]} when stored as offsets
+    if sections and all(isinstance(span, list) for span in sections.values()):
+        parsed.sections = SectionMap(raw, {h: (s, e) for h, (s, e) in sections.items()})
+    return parsed
+
+
+def _stat(path: Path) -> list[int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class ParseCache:
+    """On-disk cache of ParsedInstruction results for one project root."""
+
+    def __init__(self, project_root: Path):
+        self.root = project_root
+        self.path = cache_path("parse", project_root.resolve())
+        self.hits = 0
+        self.misses = 0
+        self._files: dict[str, dict[str, Any]] = {}
+        self._saved_ns = 0
+        self._dirty = False
+
+        data = load_json(self.path)
+        if isinstance(data, dict) and data.get("format") == PARSE_CACHE_FORMAT:
+            files = data.get("files")
+            if isinstance(files, dict):
+                self._files = files
+                self._saved_ns = int(data.get("saved_ns", 0))
+
+    def _trusted(self, stat: list[int] | None) -> bool:
+        # See RACY_WINDOW_NS: recent mtimes cannot be trusted
+        return stat is None or stat[1] < self._saved_ns - RACY_WINDOW_NS
+
+    def get(self, rel_path: str, spec_version: str) -> ParsedInstruction | None:
+        """Return the cached parse of rel_path, or None when it is missing or stale."""
+        record = self._files.get(rel_path)
+        stat = _stat(self.root / rel_path)
+        if (
+            not isinstance(record, dict)
+            or stat is None
+            or record.get("stat") != stat
+            or record.get("spec") != spec_version
+            or record.get("v") != PARSER_VERSION
+            or not self._trusted(stat)
+            or not self._deps_valid(record.get("deps", {}))
+        ):
+            self.misses += 1
+            return None
+        values = record.get("parsed")
+        if not isinstance(values, list) or len(values) != len(_FIELDS):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _decode(values)
+
+    def _deps_valid(self, deps: dict[str, Any]) -> bool:
+        for rel, recorded in deps.items():
+            stat = _stat(self.root / rel)
+            if stat != recorded or not self._trusted(stat):
+                return False
+        return True
+
+    def put(self, rel_path: str, spec_version: str, parsed: ParsedInstruction) -> None:
+        """Store a parse; Gemini imports make every referenced path a dependency."""
+        stat = _stat(self.root / rel_path)
+        if stat is None:
+            return
+        record: dict[str, Any] = {
+            "stat": stat,
+            "spec": spec_version,
+            "v": PARSER_VERSION,
+            "parsed": _encode(parsed),
+        }
+        if parsed.imports:
+            record["deps"] = {rel: _stat(self.root / rel) for rel in parsed.referenced_files}
+        self._files[rel_path] = record
+        self._dirty = True
+
+    def prune(self, existing: set[str]) -> None:
+        """Drop records for files that are no longer detected."""
+        stale = [rel for rel in self._files if rel not in existing]
+        for rel in stale:
+            del self._files[rel]
+        if stale:
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back to disk if anything changed."""
+        if not self._dirty:
+            return
+        saved_ns = time.time_ns()
+        save_json(
+            self.path, {"format": PARSE_CACHE_FORMAT, "saved_ns": saved_ns, "files": self._files}
+        )
+        # Trust the stored stats as a reload would (the cache may be reused in-process)
+        self._saved_ns = saved_ns
+        self._dirty = False
@@ -2,5 +2,6 @@
 
 from cokodo_agent.parser.hybrid import HybridParser
 from cokodo_agent.parser.models import DetectedFile, ParsedInstruction
+from cokodo_agent.parser.snapshot import DirectorySnapshot
 
-__all__ = ["HybridParser", "ParsedInstruction", "DetectedFile"]
+__all__ = ["HybridParser", "ParsedInstruction", "DetectedFile", "DirectorySnapshot"]
@@ -5,9 +5,10 @@ from __future__ import annotations
 import re
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
-from cokodo_agent.parser.models import DetectedFile, ParsedInstruction
+from cokodo_agent.parser.models import DetectedFile, ParsedInstruction, SectionMap, SpanSequence
+from cokodo_agent.parser.snapshot import DirectorySnapshot
 
 
 def _parse_simple_frontmatter(block: str) -> dict[str, Any]:
@@ -32,75 +33,143 @@ def _parse_simple_frontmatter(block: str) -> dict[str, Any]:
     return result
 
 
+_FRONTMATTER_START = re.compile(r"\s*---")
+AGENT_REFERENCE_PATTERN = re.compile(r"\.agent/[\w/.-]+")
+# Sections whose bullets are rules, in the order they are collected
+RULE_SECTIONS = ("Key Rules", "Rules", "Standards", "Coding Standards")
+_LINE_BREAKS = "\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"  # str.splitlines() boundaries
+
+
+class MarkdownScan(NamedTuple):
+    """Everything the parsers extract from an instruction file."""
+
+    frontmatter: dict[str, Any]
+    body: str
+    project_name: str | None
+    sections: SectionMap
+    rules: SpanSequence
+    references: SpanSequence
+    imports: list[str]
+
+
 def extract_frontmatter(content: str) -> tuple[dict[str, Any], str]:
     """Split content into frontmatter dict and body. Returns (frontmatter, body)."""
-    if not content.strip().startswith("---"):
+    if not _FRONTMATTER_START.match(content):
         return {}, content
-    parts = content.split("---", 2)
-    if len(parts) < 3:
+    start = content.find("---") + 3
+    end = content.find("---", start)
+    if end < 0:
         return {}, content
-    frontmatter = _parse_simple_frontmatter(parts[1])
-    body = parts[2].lstrip("\n")
+    frontmatter = _parse_simple_frontmatter(content[start:end])
+    body = content[end + 3 :].lstrip("\n")
     return frontmatter, body
 
 
+def _without_line_break(line: str) -> str:
+    if line.endswith("\r\n"):
+        return line[:-2]
+    if line and line[-1] in _LINE_BREAKS:
+        return line[:-1]
+    return line
+
+
+def scan_markdown(content: str, frontmatter: bool = True) -> MarkdownScan:
+    """
+    Extract frontmatter, H1, ## sections, rule bullets, .agent/ references and @imports
+    in one pass over the lines of content.
+
+    With frontmatter=False the whole content is the body. References are collected from
+    the whole content, everything else from the body. Sections, rules and references
+    are views into content (offsets, no copies).
+    """
+    meta: dict[str, Any] = {}
+    body = content
+    if frontmatter:
+        meta, body = extract_frontmatter(content)
+    body_start = len(content) - len(body)  # the body is always a suffix of content
+
+    project_name: str | None = None
+    sections: dict[str, tuple[int, int]] = {}
+    bullets: dict[str, list[tuple[int, int]]] = {}
+    references: dict[str, tuple[int, int]] = {}  # first occurrence of each reference
+    imports: list[str] = []
+    heading: str | None = None
+    heading_start = 0
+    heading_bullets: list[tuple[int, int]] = []
+
+    offset = 0
+    for raw in content.splitlines(keepends=True):
+        line_start = offset
+        offset += len(raw)
+        if ".agent/" in raw:
+            for match in AGENT_REFERENCE_PATTERN.finditer(raw):
+                ref = match.group()
+                if ref not in references:
+                    references[ref] = (line_start + match.start(), line_start + match.end())
+        if offset <= body_start:
+            continue
+        line = _without_line_break(raw)
+        if line_start < body_start:  # the body starts mid-line after the closing ---
+            line = line[body_start - line_start :]
+            line_start = body_start
+
+        if line.startswith("## "):
+            if heading is not None:
+                sections[heading] = (heading_start, line_start)
+                bullets[heading] = heading_bullets
+            heading = line[3:].strip()
+            heading_start = offset
+            heading_bullets = []
+            continue
+        s = line.strip()
+        if heading is not None and s.startswith("- ") and len(s) > 2:
+            item = s[2:]
+            rule_start = line_start + len(line) - len(line.lstrip()) + 2
+            rule_start += len(item) - len(item.lstrip())
+            heading_bullets.append((rule_start, rule_start + len(item.strip())))
+        if project_name is None and s.startswith("# ") and len(s) > 2:
+            project_name = s[2:].strip()
+        elif s.startswith("@") and len(s) > 1:
+            imports.append(s)
+    if heading is not None:
+        sections[heading] = (heading_start, len(content))
+        bullets[heading] = heading_bullets
+
+    rules = [span for name in RULE_SECTIONS for span in bullets.get(name, [])]
+    return MarkdownScan(
+        meta,
+        body,
+        project_name,
+        SectionMap(content, sections),
+        SpanSequence(content, rules),
+        SpanSequence(content, list(references.values())),
+        imports,
+    )
+
+
 def extract_agent_references(content: str) -> list[str]:
     """Extract all .agent/ path references from text."""
-    pattern = r"\.agent/[\w/.-]+"
-    found = re.findall(pattern, content)
-    return list(dict.fromkeys(found))  # preserve order, dedupe
+    return list(dict.fromkeys(AGENT_REFERENCE_PATTERN.findall(content)))  # ordered, deduped
 
 
 def extract_sections(content: str) -> dict[str, str]:
     """Split Markdown by ## headings; return {heading: body}."""
-    sections: dict[str, str] = {}
-    current_heading: str | None = None
-    current_body: list[str] = []
-    for line in content.splitlines():
-        if line.startswith("## "):
-            if current_heading is not None:
-                sections[current_heading] = "\n".join(current_body).strip()
-            current_heading = line[3:].strip()
-            current_body = []
-        elif current_heading is not None:
-            current_body.append(line)
-    if current_heading is not None:
-        sections[current_heading] = "\n".join(current_body).strip()
-    return sections
+    return dict(scan_markdown(content, frontmatter=False).sections)
 
 
 def extract_rules(content: str) -> list[str]:
     """Extract bullet rule items from Key Rules / Rules / Standards sections."""
-    sections = extract_sections(content)
-    rules: list[str] = []
-    for name in ("Key Rules", "Rules", "Standards", "Coding Standards"):
-        body = sections.get(name, "")
-        if not body:
-            continue
-        for line in body.splitlines():
-            line = line.strip()
-            if line.startswith("- ") and len(line) > 2:
-                rules.append(line[2:].strip())
-    return rules
+    return list(scan_markdown(content, frontmatter=False).rules)
 
 
 def extract_project_name(content: str) -> str | None:
     """Extract project name from first # heading."""
-    for line in content.splitlines():
-        s = line.strip()
-        if s.startswith("# ") and len(s) > 2:
-            return s[2:].strip()
-    return None
+    return scan_markdown(content, frontmatter=False).project_name
 
 
 def extract_imports(content: str) -> list[str]:
     """Extract @path lines (Gemini import syntax)."""
-    imports: list[str] = []
-    for line in content.splitlines():
-        s = line.strip()
-        if s.startswith("@") and len(s) > 1:
-            imports.append(s)
-    return imports
+    return scan_markdown(content, frontmatter=False).imports
 
 
 def get_ide_spec_version(tool_name: str) -> str:
@@ -122,8 +191,15 @@ class BaseParser(ABC):
         return get_ide_spec_version(self.tool_name)
 
     @abstractmethod
-    def detect(self, project_root: Path) -> list[DetectedFile]:
-        """Return list of detected instruction files for this IDE."""
+    def detect(
+        self, project_root: Path, snapshot: DirectorySnapshot | None = None
+    ) -> list[DetectedFile]:
+        """
+        Return list of detected instruction files for this IDE.
+
+        snapshot: directory listings shared with the other parsers (one is
+        created for project_root when omitted).
+        """
         ...
 
     @abstractmethod
@@ -131,6 +207,9 @@ class BaseParser(ABC):
         """Parse a single file and return ParsedInstruction."""
         ...
 
+    def _scan(self, content: str, frontmatter: bool = True) -> MarkdownScan:
+        return scan_markdown(content, frontmatter)
+
     def _extract_frontmatter(self, content: str) -> tuple[dict[str, Any], str]:
         return extract_frontmatter(content)
 
@@ -4,6 +4,7 @@ from pathlib import Path
 
 from cokodo_agent.parser.base import BaseParser
 from cokodo_agent.parser.models import DetectedFile, ParsedInstruction
+from cokodo_agent.parser.snapshot import DirectorySnapshot
 
 
 class ClaudeParser(BaseParser):
@@ -11,10 +12,12 @@ class ClaudeParser(BaseParser):
 
     tool_name = "claude"
 
-    def detect(self, project_root: Path) -> list[DetectedFile]:
+    def detect(
+        self, project_root: Path, snapshot: DirectorySnapshot | None = None
+    ) -> list[DetectedFile]:
+        snapshot = snapshot or DirectorySnapshot(project_root)
         detected: list[DetectedFile] = []
-        claude_md = project_root / "CLAUDE.md"
-        if claude_md.exists():
+        if snapshot.exists("CLAUDE.md"):
             detected.append(
                 DetectedFile(
                     tool_name=self.tool_name,
@@ -22,23 +25,16 @@ class ClaudeParser(BaseParser):
                     format_version="current",
                 )
             )
-        rules_dir = project_root / ".claude" / "rules"
-        if rules_dir.exists():
-            for p in sorted(rules_dir.rglob("*.md")):
-                try:
-                    rel = p.relative_to(project_root)
-                except ValueError:
-                    continue
-                detected.append(
-                    DetectedFile(
-                        tool_name=self.tool_name,
-                        path=str(rel).replace("\\", "/"),
-                        format_version="current",
-                    )
+        for rel in snapshot.rglob(".claude/rules", "*.md"):
+            detected.append(
+                DetectedFile(
+                    tool_name=self.tool_name,
+                    path=rel,
+                    format_version="current",
                 )
+            )
         if not detected:
-            legacy = project_root / ".claude" / "instructions.md"
-            if legacy.exists():
+            if snapshot.exists(".claude/instructions.md"):
                 detected.append(
                     DetectedFile(
                         tool_name=self.tool_name,
@@ -58,7 +54,7 @@ class ClaudeParser(BaseParser):
         except ValueError:
             rel_path = str(file_path)
 
-        frontmatter, body = self._extract_frontmatter(content)
+        scan = self._scan(content)
         format_version = "legacy" if ".claude/instructions.md" in rel_path else "current"
 
         return ParsedInstruction(
@@ -67,10 +63,10 @@ class ClaudeParser(BaseParser):
             ide_spec_version=self._get_spec_version(),
             source_path=rel_path,
             raw_content=content,
-            frontmatter=frontmatter,
-            project_name=self._extract_project_name(body),
-            referenced_files=self._extract_agent_references(content),
+            frontmatter=scan.frontmatter,
+            project_name=scan.project_name,
+            referenced_files=scan.references,
             imports=[],
-            rules=self._extract_rules(body),
-            sections=self._extract_sections(body),
+            rules=scan.rules,
+            sections=scan.sections,
         )
@@ -4,6 +4,7 @@ from pathlib import Path
 
 from cokodo_agent.parser.base import BaseParser
 from cokodo_agent.parser.models import DetectedFile, ParsedInstruction
+from cokodo_agent.parser.snapshot import DirectorySnapshot
 
 
 class CopilotParser(BaseParser):
@@ -11,10 +12,12 @@ class CopilotParser(BaseParser):
 
     tool_name = "copilot"
 
-    def detect(self, project_root: Path) -> list[DetectedFile]:
+    def detect(
+        self, project_root: Path, snapshot: DirectorySnapshot | None = None
+    ) -> list[DetectedFile]:
+        snapshot = snapshot or DirectorySnapshot(project_root)
         detected: list[DetectedFile] = []
-        agents_md = project_root / "AGENTS.md"
-        if agents_md.exists():
+        if snapshot.exists("AGENTS.md"):
             detected.append(
                 DetectedFile(
                     tool_name=self.tool_name,
@@ -23,8 +26,7 @@ class CopilotParser(BaseParser):
                 )
             )
         if not detected:
-            repo_inst = project_root / ".github" / "copilot-instructions.md"
-            if repo_inst.exists():
+            if snapshot.exists(".github/copilot-instructions.md"):
                 detected.append(
                     DetectedFile(
                         tool_name=self.tool_name,
@@ -33,20 +35,14 @@ class CopilotParser(BaseParser):
                     )
                 )
         if not detected:
-            inst_dir = project_root / ".github" / "instructions"
-            if inst_dir.exists():
-                for p in sorted(inst_dir.glob("*.instructions.md")):
-                    try:
-                        rel = p.relative_to(project_root)
-                    except ValueError:
-                        continue
-                    detected.append(
-                        DetectedFile(
-                            tool_name=self.tool_name,
-                            path=str(rel).replace("\\", "/"),
-                            format_version="current",
-                        )
+            for rel in snapshot.glob(".github/instructions", "*.instructions.md"):
+                detected.append(
+                    DetectedFile(
+                        tool_name=self.tool_name,
+                        path=rel,
+                        format_version="current",
                     )
+                )
         return detected
 
     def parse_file(
@@ -59,7 +55,7 @@ class CopilotParser(BaseParser):
         except ValueError:
             rel_path = str(file_path)
 
-        frontmatter, body = self._extract_frontmatter(content)
+        scan = self._scan(content)
         format_version = (
             "legacy"
             if ".github/copilot-instructions.md" in rel_path
@@ -72,10 +68,10 @@ class CopilotParser(BaseParser):
             ide_spec_version=self._get_spec_version(),
             source_path=rel_path,
             raw_content=content,
-            frontmatter=frontmatter,
-            project_name=self._extract_project_name(body),
-            referenced_files=self._extract_agent_references(content),
+            frontmatter=scan.frontmatter,
+            project_name=scan.project_name,
+            referenced_files=scan.references,
             imports=[],
-            rules=self._extract_rules(body),
-            sections=self._extract_sections(body),
+            rules=scan.rules,
+            sections=scan.sections,
         )
@@ -4,6 +4,7 @@ from pathlib import Path
 
 from cokodo_agent.parser.base import BaseParser
 from cokodo_agent.parser.models import DetectedFile, ParsedInstruction
+from cokodo_agent.parser.snapshot import DirectorySnapshot
 
 
 class CursorParser(BaseParser):
@@ -11,21 +12,21 @@ class CursorParser(BaseParser):
 
     tool_name = "cursor"
 
-    def detect(self, project_root: Path) -> list[DetectedFile]:
+    def detect(
+        self, project_root: Path, snapshot: DirectorySnapshot | None = None
+    ) -> list[DetectedFile]:
+        snapshot = snapshot or DirectorySnapshot(project_root)
         detected: list[DetectedFile] = []
-        rules_dir = project_root / ".cursor" / "rules"
-        if rules_dir.exists():
-            for p in rules_dir.glob("*.mdc"):
-                detected.append(
-                    DetectedFile(
-                        tool_name=self.tool_name,
-                        path=str(p.relative_to(project_root)),
-                        format_version="current",
-                    )
+        for rel in snapshot.glob(".cursor/rules", "*.mdc"):
+            detected.append(
+                DetectedFile(
+                    tool_name=self.tool_name,
+                    path=rel,
+                    format_version="current",
                 )
+            )
         if not detected:
-            legacy = project_root / ".cursorrules"
-            if legacy.exists():
+            if snapshot.exists(".cursorrules"):
                 detected.append(
                     DetectedFile(
                         tool_name=self.tool_name,
@@ -45,13 +46,9 @@ class CursorParser(BaseParser):
         except ValueError:
             rel_path = str(file_path)
 
-        if file_path.suffix == ".mdc":
-            format_version = "current"
-            frontmatter, body = self._extract_frontmatter(content)
-        else:
-            format_version = "legacy"
-            frontmatter = {}
-            body = content
+        # Legacy .cursorrules has no frontmatter
+        format_version = "current" if file_path.suffix == ".mdc" else "legacy"
+        scan = self._scan(content, frontmatter=format_version == "current")
 
         return ParsedInstruction(
             tool_name=self.tool_name,
@@ -59,10 +56,10 @@ class CursorParser(BaseParser):
             ide_spec_version=self._get_spec_version(),
             source_path=rel_path,
             raw_content=content,
-            frontmatter=frontmatter,
-            project_name=self._extract_project_name(body),
-            referenced_files=self._extract_agent_references(content),
+            frontmatter=scan.frontmatter,
+            project_name=scan.project_name,
+            referenced_files=scan.references,
             imports=[],
-            rules=self._extract_rules(body),
-            sections=self._extract_sections(body),
+            rules=scan.rules,
+            sections=scan.sections,
         )
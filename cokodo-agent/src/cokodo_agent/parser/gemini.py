@@ -1,22 +1,99 @@
 """Parser for Gemini Code Assist instruction files (GEMINI.md and .agent/rules/)."""
 
+import stat
 from pathlib import Path
 
 from cokodo_agent.parser.base import BaseParser
 from cokodo_agent.parser.models import DetectedFile, ParsedInstruction
+from cokodo_agent.parser.snapshot import DirectorySnapshot
 
 MAX_IMPORT_DEPTH = 5
 
 
+def _import_paths(content: str) -> list[str]:
+    """Paths of the @path lines of content."""
+    paths: list[str] = []
+    for line in content.splitlines():
+        s = line.strip()
+        if s.startswith("@") and len(s) > 1:
+            paths.append(s[1:].strip())
+    return paths
+
+
+class ImportGraph:
+    """
+    Direct @imports of each file, read once per file version (size, mtime_ns).
+
+    Shared by all GEMINI.md parses of a parser, so a file imported from many
+    places is read once. Without a lock: concurrent parses may at worst read
+    the same file twice.
+    """
+
+    def __init__(self) -> None:
+        self._edges: dict[Path, tuple[tuple[int, int], list[str]]] = {}
+        self.reads = 0
+
+    def direct_imports(self, path: Path) -> list[str]:
+        """@imports of path; empty for missing, non-regular or undecodable files."""
+        try:
+            st = path.stat()
+        except OSError:
+            return []
+        if not stat.S_ISREG(st.st_mode):
+            return []
+        version = (st.st_size, st.st_mtime_ns)
+        cached = self._edges.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        try:
+            imports = _import_paths(path.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError):
+            imports = []
+        self.reads += 1
+        self._edges[path] = (version, imports)
+        return imports
+
+    def closure(
+        self, project_root: Path, imports: list[str], max_depth: int = MAX_IMPORT_DEPTH
+    ) -> list[str]:
+        """
+        Import paths reachable from imports, depth-first, each listed once.
+
+        Paths resolve against project_root. A path already visited is not
+        followed again, which also ends cycles; files max_depth levels down
+        are listed but not read.
+        """
+        refs: list[str] = []
+        seen: set[str] = set()
+
+        def visit(paths: list[str], depth: int) -> None:
+            for path_str in paths:
+                if path_str in seen:
+                    continue
+                seen.add(path_str)
+                refs.append(path_str)
+                if depth + 1 < max_depth:
+                    visit(self.direct_imports(project_root / path_str), depth + 1)
+
+        if max_depth > 0:
+            visit(imports, 0)
+        return refs
+
+
 class GeminiParser(BaseParser):
     """Parse Gemini: GEMINI.md (current) or .agent/rules/*.md (legacy Antigravity)."""
 
     tool_name = "gemini"
 
-    def detect(self, project_root: Path) -> list[DetectedFile]:
+    def __init__(self) -> None:
+        self.import_graph = ImportGraph()
+
+    def detect(
+        self, project_root: Path, snapshot: DirectorySnapshot | None = None
+    ) -> list[DetectedFile]:
+        snapshot = snapshot or DirectorySnapshot(project_root)
         detected: list[DetectedFile] = []
-        gemini_md = project_root / "GEMINI.md"
-        if gemini_md.exists():
+        if snapshot.exists("GEMINI.md"):
             detected.append(
                 DetectedFile(
                     tool_name=self.tool_name,
@@ -25,22 +102,16 @@ class GeminiParser(BaseParser):
                 )
             )
         if not detected:
-            rules_dir = project_root / ".agent" / "rules"
-            if rules_dir.exists():
-                for p in sorted(rules_dir.glob("*.md")):
-                    if p.name.upper() == "README.MD":
-                        continue
-                    try:
-                        rel = p.relative_to(project_root)
-                    except ValueError:
-                        continue
-                    detected.append(
-                        DetectedFile(
-                            tool_name=self.tool_name,
-                            path=str(rel).replace("\\", "/"),
-                            format_version="legacy",
-                        )
+            for rel in snapshot.glob(".agent/rules", "*.md"):
+                if rel.rpartition("/")[2].upper() == "README.MD":
+                    continue
+                detected.append(
+                    DetectedFile(
+                        tool_name=self.tool_name,
+                        path=rel,
+                        format_version="legacy",
                     )
+                )
         return detected
 
     def parse_file(
@@ -59,15 +130,16 @@ class GeminiParser(BaseParser):
             else "current"
         )
 
-        imports = self._extract_imports(content)
-        referenced = list(self._extract_agent_references(content))
+        scan = self._scan(content, frontmatter=False)
+        imports = scan.imports
+        referenced = list(scan.references)
         for imp in imports:
             path_str = imp[1:].strip()  # drop @
             if path_str not in referenced:
                 referenced.append(path_str)
 
         if format_version == "current" and imports and root:
-            expanded_refs = self._resolve_imports(root, content, seen={})
+            expanded_refs = self.import_graph.closure(root, [imp[1:].strip() for imp in imports])
             for r in expanded_refs:
                 if r not in referenced:
                     referenced.append(r)
@@ -79,40 +151,9 @@ class GeminiParser(BaseParser):
             source_path=rel_path,
             raw_content=content,
             frontmatter={},
-            project_name=self._extract_project_name(content),
+            project_name=scan.project_name,
             referenced_files=referenced,
             imports=imports,
-            rules=self._extract_rules(content),
-            sections=self._extract_sections(content),
+            rules=scan.rules,
+            sections=scan.sections,
         )
-
-    def _resolve_imports(
-        self,
-        project_root: Path,
-        content: str,
-        depth: int = 0,
-        seen: set[str] | None = None,
-    ) -> list[str]:
-        if depth >= MAX_IMPORT_DEPTH:
-            return []
-        seen = seen or set()
-        refs: list[str] = []
-        for line in content.splitlines():
-            s = line.strip()
-            if not s.startswith("@") or len(s) <= 1:
-                continue
-            path_str = s[1:].strip()
-            if path_str in seen:
-                continue
-            seen.add(path_str)
-            refs.append(path_str)
-            target = project_root / path_str
-            if target.exists() and target.is_file():
-                try:
-                    sub = target.read_text(encoding="utf-8")
-                except (OSError, UnicodeDecodeError):
-                    continue
-                refs.extend(
-                    self._resolve_imports(project_root, sub, depth + 1, seen)
-                )
-        return refs
@@ -1,18 +1,50 @@
 """Aggregate parser for all supported IDE instruction formats."""
 
+import functools
+from collections.abc import Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from cokodo_agent.parser.base import BaseParser
 from cokodo_agent.parser.claude import ClaudeParser
 from cokodo_agent.parser.copilot import CopilotParser
 from cokodo_agent.parser.cursor import CursorParser
 from cokodo_agent.parser.gemini import GeminiParser
 from cokodo_agent.parser.models import DetectedFile, ParsedInstruction
+from cokodo_agent.parser.snapshot import DirectorySnapshot
+from cokodo_agent.timing import span, traced
+
+if TYPE_CHECKING:
+    from cokodo_agent.parsecache import ParseCache
+
+
+# Entries whose presence in a directory makes it worth running detection there
+DETECT_MARKERS = frozenset(
+    "CLAUDE.md AGENTS.md GEMINI.md .cursorrules .cursor .claude .github .agent".split()
+)
+
+
+def _parse_one(
+    project_root: Path, item: tuple[int, BaseParser, DetectedFile]
+) -> ParsedInstruction:
+    """Parse one detected file (module level so process pools can pickle it)."""
+    _, parser, det = item
+    return parser.parse_file(project_root / det.path, project_root)
 
 
 class HybridParser:
     """Detect and parse instruction files from Cursor, Claude, Copilot, and Gemini."""
 
-    def __init__(self) -> None:
+    def __init__(self, use_cache: bool = False, jobs: int = 1) -> None:
+        """
+        use_cache: reuse parses of unchanged files from the user cache (see parsecache).
+        jobs: parser threads when no executor is passed (0 = one per CPU).
+        """
+        from cokodo_agent.linter import resolve_jobs
+
+        self.use_cache = use_cache
+        self.jobs = resolve_jobs(jobs)
         self._parsers = [
             CursorParser(),
             ClaudeParser(),
@@ -20,40 +52,129 @@ class HybridParser:
             GeminiParser(),
         ]
 
-    def detect_all(self, project_root: Path) -> dict[str, list[DetectedFile]]:
+    @traced("detect")
+    def detect_all(
+        self, project_root: Path, snapshot: DirectorySnapshot | None = None
+    ) -> dict[str, list[DetectedFile]]:
         """Return {tool_name: [detected_files]} for all tools that have files."""
+        snapshot = snapshot or DirectorySnapshot(project_root)
         result: dict[str, list[DetectedFile]] = {}
         for parser in self._parsers:
-            files = parser.detect(project_root)
+            files = parser.detect(project_root, snapshot)
             if files:
                 result[parser.tool_name] = files
         return result
 
-    def parse_all(self, project_root: Path) -> list[ParsedInstruction]:
-        """Parse all detected IDE instruction files in the project."""
-        result: list[ParsedInstruction] = []
-        for tool_name, files in self.detect_all(project_root).items():
-            parser = self._parser_for(tool_name)
-            for det in files:
-                path = project_root / det.path
-                if path.exists():
-                    result.append(parser.parse_file(path, project_root))
+    def detect_recursive(
+        self, root: Path, max_depth: int | None = None
+    ) -> Iterator[tuple[str, dict[str, list[DetectedFile]]]]:
+        """
+        Yield (relative project dir, detect_all result) for root and nested projects.
+
+        Directories come from a gitignore-aware walk that skips PRUNED_DIRS
+        (node_modules, .git, build output) and the IDE directories themselves,
+        and results are yielded as they are found. Detected paths are relative
+        to their project dir; max_depth limits the walk (root is 0).
+        """
+        from cokodo_agent.walker import PRUNED_DIRS, walk_dirs
+
+        prune = PRUNED_DIRS | DETECT_MARKERS
+        for rel_dir, dir_path, listing in walk_dirs(root, max_depth, prune):
+            if DETECT_MARKERS.isdisjoint(listing):
+                continue
+            detected = self.detect_all(dir_path, DirectorySnapshot(dir_path, {"": listing}))
+            if detected:
+                yield rel_dir, detected
+
+    def parse_all(
+        self,
+        project_root: Path,
+        snapshot: DirectorySnapshot | None = None,
+        executor: Executor | None = None,
+    ) -> list[ParsedInstruction]:
+        """
+        Parse all detected IDE instruction files in the project.
+
+        Files are parsed on executor when given, otherwise on a thread pool of
+        self.jobs workers; results are in detection order either way.
+        """
+        snapshot = snapshot or DirectorySnapshot(project_root)
+        cache = self._open_cache(project_root)
+        detected = self.detect_all(project_root, snapshot)
+        items = [(self._parser_for(tool), det) for tool, files in detected.items() for det in files]
+        result = self._parse_detected(project_root, items, cache, executor)
+        if cache is not None:
+            cache.prune({det.path for _, det in items})
+            cache.save()
         return result
 
     def parse_tool(
-        self, project_root: Path, tool: str
+        self,
+        project_root: Path,
+        tool: str,
+        snapshot: DirectorySnapshot | None = None,
+        executor: Executor | None = None,
     ) -> list[ParsedInstruction]:
-        """Parse only the given tool's instruction files."""
+        """Parse only the given tool's instruction files (see parse_all for executor)."""
         parser = self._parser_for(tool)
-        detected = parser.detect(project_root)
-        result: list[ParsedInstruction] = []
-        for det in detected:
-            path = project_root / det.path
-            if path.exists():
-                result.append(parser.parse_file(path, project_root))
+        items = [(parser, det) for det in parser.detect(project_root, snapshot)]
+        cache = self._open_cache(project_root)
+        result = self._parse_detected(project_root, items, cache, executor)
+        if cache is not None:
+            cache.save()
         return result
 
-    def _parser_for(self, tool: str):
+    def _open_cache(self, project_root: Path) -> "ParseCache | None":
+        if not self.use_cache:
+            return None
+        from cokodo_agent.cache import shared
+        from cokodo_agent.parsecache import ParseCache
+
+        # One cache per root for all commands of a cache_session() (`co batch`)
+        return shared(("parse", project_root.resolve()), lambda: ParseCache(project_root))
+
+    def _parse_detected(
+        self,
+        project_root: Path,
+        items: list[tuple[BaseParser, DetectedFile]],
+        cache: "ParseCache | None" = None,
+        executor: Executor | None = None,
+    ) -> list[ParsedInstruction]:
+        with span("parse") as current:
+            # The cache is consulted and filled here; only cache misses go to the workers
+            result: list[ParsedInstruction | None] = []
+            misses: list[tuple[int, BaseParser, DetectedFile]] = []
+            for parser, det in items:
+                parsed = None
+                if cache is not None:
+                    parsed = cache.get(det.path, parser._get_spec_version())
+                if parsed is None:
+                    misses.append((len(result), parser, det))
+                result.append(parsed)
+
+            parse = functools.partial(_parse_one, project_root)
+            workers = min(self.jobs, len(misses))
+            if executor is not None and misses:
+                parsed_misses = list(executor.map(parse, misses))
+            elif workers > 1:
+                with ThreadPoolExecutor(workers) as pool:
+                    parsed_misses = list(pool.map(parse, misses))
+            else:
+                parsed_misses = [parse(miss) for miss in misses]
+
+            for (index, parser, det), parsed in zip(misses, parsed_misses, strict=True):
+                result[index] = parsed
+                if cache is not None:
+                    cache.put(det.path, parser._get_spec_version(), parsed)
+            # Only cache misses were read (plus their Gemini imports); size in characters
+            current.add(
+                bytes_read=sum(len(p.raw_content) for p in parsed_misses),
+                files=sum(1 + len(p.imports) for p in parsed_misses),
+                cache_hits=len(items) - len(misses),
+            )
+        return [parsed for parsed in result if parsed is not None]
+
+    def _parser_for(self, tool: str) -> BaseParser:
         for p in self._parsers:
             if p.tool_name == tool:
                 return p
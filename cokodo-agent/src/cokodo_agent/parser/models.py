@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator, Mapping, Sequence
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, overload
 
 
 @dataclass
@@ -15,9 +16,79 @@ class DetectedFile:
     format_version: str  # "current" | "legacy"
 
 
-@dataclass
+class SpanSequence(Sequence[str]):
+    """Substrings of a source text, stored as (start, end) offsets and sliced on access."""
+
+    __slots__ = ("source", "spans")
+
+    def __init__(self, source: str, spans: list[tuple[int, int]]) -> None:
+        self.source = source
+        self.spans = spans
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self.source[start:end] for start, end in self.spans[index]]
+        start, end = self.spans[index]
+        return self.source[start:end]
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class SectionMap(Mapping[str, str]):
+    """
+    {heading: body} with each body stored as (start, end) offsets into the source.
+
+    A body is materialized on access as its lines joined with "\\n" and stripped.
+    """
+
+    __slots__ = ("source", "spans")
+
+    def __init__(self, source: str, spans: dict[str, tuple[int, int]]) -> None:
+        self.source = source
+        self.spans = spans
+
+    def __getitem__(self, heading: str) -> str:
+        start, end = self.spans[heading]
+        return "\n".join(self.source[start:end].splitlines()).strip()
+
+    def __contains__(self, heading: object) -> bool:
+        return heading in self.spans
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.spans)
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+@dataclass(slots=True)
 class ParsedInstruction:
-    """Unified result of parsing one IDE instruction file."""
+    """
+    Unified result of parsing one IDE instruction file.
+
+    The parsers store rules, sections and references as views into raw_content
+    (SpanSequence, SectionMap), so a parsed file holds about one copy of its text.
+    """
 
     tool_name: str  # "cursor" | "claude" | "copilot" | "gemini"
     format_version: str  # "current" | "legacy"
@@ -26,7 +97,7 @@ class ParsedInstruction:
     raw_content: str  # full raw text
     frontmatter: dict[str, Any]  # YAML frontmatter (empty if none)
     project_name: str | None  # extracted from H1 or frontmatter
-    referenced_files: list[str]  # all .agent/ path references
+    referenced_files: Sequence[str]  # all .agent/ path references
     imports: list[str]  # @import lines (Gemini only)
-    rules: list[str]  # extracted rule bullet items
-    sections: dict[str, str]  # {heading: body_text}
+    rules: Sequence[str]  # extracted rule bullet items
+    sections: Mapping[str, str]  # {heading: body_text}
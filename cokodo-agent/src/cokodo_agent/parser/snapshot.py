@@ -0,0 +1,92 @@
+"""Directory listings shared by the parsers' detect() calls."""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+from pathlib import Path
+
+
+class DirectorySnapshot:
+    """
+    Listings of directories under a project root, each read with one os.scandir.
+
+    Directories are listed on first use and never re-read, so the parsers can
+    probe the same candidate locations without repeating filesystem calls.
+    Paths are relative to the root and use forward slashes. Names are matched
+    exactly, or regardless of case where the filesystem does so (one stat
+    call confirms it when only a differently cased entry is listed).
+    """
+
+    def __init__(
+        self,
+        project_root: Path,
+        listings: dict[str, dict[str, tuple[bool, bool]]] | None = None,
+    ) -> None:
+        """listings: directories already read by the caller (e.g. a walker), by rel_dir."""
+        self.root = project_root
+        # rel_dir -> {name: (is_dir, is_symlink)}; empty when missing or unreadable
+        self._listings: dict[str, dict[str, tuple[bool, bool]]] = dict(listings or {})
+
+    def listing(self, rel_dir: str = "") -> dict[str, tuple[bool, bool]]:
+        """Entries of rel_dir as {name: (is_dir, is_symlink)}."""
+        cached = self._listings.get(rel_dir)
+        if cached is not None:
+            return cached
+        entries: dict[str, tuple[bool, bool]] = {}
+        # A directory the parent listing does not know of is not scanned at all
+        if not rel_dir or self.is_dir(rel_dir):
+            try:
+                with os.scandir(self.root / rel_dir) as it:
+                    for entry in it:
+                        try:
+                            entries[entry.name] = (entry.is_dir(), entry.is_symlink())
+                        except OSError:
+                            entries[entry.name] = (False, False)
+            except OSError:
+                pass
+        self._listings[rel_dir] = entries
+        return entries
+
+    def _entry(self, rel_path: str) -> tuple[bool, bool] | None:
+        """(is_dir, is_symlink) of rel_path, or None when it does not exist."""
+        parent, _, name = rel_path.rpartition("/")
+        entries = self.listing(parent)
+        entry = entries.get(name)
+        if entry is not None:
+            return entry
+        folded = name.casefold()
+        for other, other_entry in entries.items():
+            if other.casefold() == folded:
+                # Same name in another case: found only on case-insensitive filesystems
+                return other_entry if (self.root / rel_path).exists() else None
+        return None
+
+    def exists(self, rel_path: str) -> bool:
+        return self._entry(rel_path) is not None
+
+    def is_dir(self, rel_path: str) -> bool:
+        entry = self._entry(rel_path)
+        return entry is not None and entry[0]
+
+    def glob(self, rel_dir: str, pattern: str) -> list[str]:
+        """Sorted paths of the entries of rel_dir whose name matches pattern."""
+        return sorted(
+            f"{rel_dir}/{name}"
+            for name in self.listing(rel_dir)
+            if fnmatch.fnmatchcase(name, pattern)
+        )
+
+    def rglob(self, rel_dir: str, pattern: str) -> list[str]:
+        """Like glob() but through all subdirectories (symlinked ones are not followed)."""
+        found: list[str] = []
+        pending = [rel_dir]
+        while pending:
+            current = pending.pop()
+            for name, (is_dir, is_symlink) in self.listing(current).items():
+                path = f"{current}/{name}"
+                if fnmatch.fnmatchcase(name, pattern):
+                    found.append(path)
+                if is_dir and not is_symlink:
+                    pending.append(path)
+        return sorted(found, key=lambda p: p.split("/"))
@@ -0,0 +1,66 @@
+"""Lint rule registry.
+
+The linter registers its built-in rules here; other packages add rules
+through the ``cokodo_agent.lint_rules`` entry point group. Each entry point
+resolves to a LintRule or a list of them:
+
+    [project.entry-points."cokodo_agent.lint_rules"]
+    my-rules = "my_package.lint:RULES"
+
+A per-file rule is called as ``check(linter, entry)`` for every indexed file
+ending with ``suffix`` that is in the --changed scope, on worker threads
+when --jobs is set. A cross-file rule is called once as ``check(linter)``
+and selects the files it needs from ``linter.index``.
+"""
+
+import functools
+from collections.abc import Callable, Iterable
+from importlib.metadata import EntryPoint, entry_points
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+if TYPE_CHECKING:
+    from cokodo_agent.linter import LintResult
+
+ENTRY_POINT_GROUP = "cokodo_agent.lint_rules"
+
+
+class LintRule(NamedTuple):
+    """A named lint check."""
+
+    name: str
+    check: Callable[..., Iterable["LintResult"]]
+    per_file: bool = False  # check(linter, entry) per file instead of check(linter)
+    suffix: str = ""  # per-file rules: only files ending with this
+
+
+def _as_rules(loaded: Any) -> list[LintRule]:
+    items = [loaded] if isinstance(loaded, LintRule) else loaded
+    if not isinstance(items, (list, tuple)):
+        items = [items]
+    for item in items:
+        if not isinstance(item, LintRule):
+            raise TypeError(f"expected LintRule, got {type(item).__name__}")
+    return list(items)
+
+
+def _load_error(ep: EntryPoint, error: Exception) -> LintRule:
+    """A rule reporting why a plugin could not be loaded."""
+
+    def check(linter: Any) -> list["LintResult"]:
+        from cokodo_agent.linter import LintResult
+
+        return [LintResult(ep.name, False, f"Failed to load rule plugin {ep.value}: {error}")]
+
+    return LintRule(ep.name, check)
+
+
+@functools.cache
+def load_plugin_rules() -> tuple[LintRule, ...]:
+    """Load rules from installed entry points (once per process)."""
+    rules: list[LintRule] = []
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            rules.extend(_as_rules(ep.load()))
+        except Exception as e:  # a broken plugin must not break lint
+            rules.append(_load_error(ep, e))
+    return tuple(rules)
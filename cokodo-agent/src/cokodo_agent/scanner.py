@@ -0,0 +1,163 @@
+"""Single-pass multi-pattern scanner for lint rules.
+
+A table of (pattern, label) pairs is compiled once into one alternation with
+a named group per pattern, so a file is scanned in a single pass and each
+match reports which pattern hit. Custom rules can build their own scanner
+from the same kind of table.
+
+Patterns may use their own capture groups, but not numbered backreferences
+(group numbers shift once the patterns are combined).
+
+scan() reports non-overlapping matches of the combined pattern. Rules that
+must report every match of every pattern, as separate re.finditer() calls
+would, use scan_each(): it runs the single pass first and only re-scans
+pattern by pattern when something matched.
+
+Each table is also compiled as a bytes regex, so UTF-8 files (including
+memory-mapped ones) can be scanned without decoding them; only matched spans
+are decoded. Bytes regexes have ASCII-only character classes, so in the
+bytes form ``\\w`` also accepts any non-ASCII character (as in
+``/home/josé/``) and ``.`` matches whole characters.
+"""
+
+import mmap
+import re
+from collections.abc import Iterator, Sequence
+from typing import NamedTuple
+
+# Bytes-regex replacements so a non-ASCII character (a UTF-8 lead byte plus
+# continuation bytes) behaves like a single word character
+_WORD = r"\w\x80-\xff"
+_REPLACEMENTS = {
+    r"\w": f"[{_WORD}]",
+    r"\W": f"[^{_WORD}]",
+    ".": r"(?:[^\n\x80-\xff]|[\xc0-\xff][\x80-\xbf]*)",
+}
+
+
+def bytes_pattern(pattern: str) -> bytes:
+    """
+    Translate a str regex to a bytes regex with the same matches on UTF-8 input.
+
+    Raises ValueError for constructs with no byte-level equivalent (non-ASCII
+    characters or \\W inside a character class).
+    """
+    out = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        token = pattern[i : i + 2] if c == "\\" else c
+        i += len(token)
+        if in_class:
+            if token == "]":
+                in_class = False
+            elif token == r"\w":
+                token = _WORD
+            elif token == r"\W" or not token.isascii():
+                raise ValueError(f"no bytes equivalent for {token!r} in a character class")
+        elif token == "[":
+            in_class = True
+            # A leading "]" (after an optional "^") is a literal class member
+            for literal in ("^", "]"):
+                if pattern.startswith(literal, i):
+                    token += literal
+                    i += 1
+        elif not token.isascii():
+            token = f"(?:{token})"  # quantifiers apply to the whole encoded character
+        else:
+            token = _REPLACEMENTS.get(token, token)
+        out.append(token)
+    return "".join(out).encode("utf-8")
+
+
+class ScanMatch(NamedTuple):
+    """One pattern hit."""
+
+    pattern_index: int  # position of the pattern in the table
+    label: str
+    start: int
+    end: int
+    text: str
+
+
+class PatternScanner:
+    """Scan text for any of several regex patterns in one pass."""
+
+    def __init__(self, patterns: Sequence[tuple[str, str]], flags: int = 0):
+        self.patterns = list(patterns)
+        self.labels = [label for _, label in self.patterns]
+        # Validate each pattern on its own so errors point at the culprit
+        self.regexes = [re.compile(pattern, flags) for pattern, _ in self.patterns]
+        combined = "|".join(f"(?P<_p{i}>{pattern})" for i, (pattern, _) in enumerate(self.patterns))
+        self.regex = re.compile(combined or r"(?!)", flags)
+        try:
+            self.bytes_regex: re.Pattern[bytes] | None = re.compile(
+                bytes_pattern(combined or r"(?!)"), flags
+            )
+        except ValueError:
+            self.bytes_regex = None  # bytes input is decoded and scanned as text
+        self.bytes_regexes: list[re.Pattern[bytes]] | None = None
+        if self.bytes_regex is not None:
+            self.bytes_regexes = [
+                re.compile(bytes_pattern(pattern), flags) for pattern, _ in self.patterns
+            ]
+
+    def scan(self, text: str | bytes | mmap.mmap) -> Iterator[ScanMatch]:
+        """
+        Yield non-overlapping matches in text order.
+
+        Where several patterns match at the same position, the earliest one in
+        the table wins. For bytes-like input (e.g. an mmap), start and end are
+        byte offsets and only the matched text is decoded.
+        """
+        if isinstance(text, str):
+            for match in self.regex.finditer(text):
+                index = int(match.lastgroup[2:])  # type: ignore[index]
+                yield ScanMatch(
+                    index, self.labels[index], match.start(), match.end(), match.group()
+                )
+        elif self.bytes_regex is None:
+            yield from self.scan(text[:].decode("utf-8", errors="replace"))
+        else:
+            for bytes_match in self.bytes_regex.finditer(text):
+                index = int(bytes_match.lastgroup[2:])  # type: ignore[index]
+                yield ScanMatch(
+                    index,
+                    self.labels[index],
+                    bytes_match.start(),
+                    bytes_match.end(),
+                    bytes_match.group().decode("utf-8", errors="replace"),
+                )
+
+    def scan_each(self, text: str | bytes | mmap.mmap) -> Iterator[ScanMatch]:
+        """
+        Yield every match of each pattern, pattern by pattern in table order.
+
+        Matches of different patterns may overlap (unlike scan()). Text
+        without any match is scanned only once.
+        """
+        if next(self.scan(text), None) is None:
+            return
+        if isinstance(text, str):
+            for pattern_index, regex in enumerate(self.regexes):
+                for match in regex.finditer(text):
+                    yield ScanMatch(
+                        pattern_index,
+                        self.labels[pattern_index],
+                        match.start(),
+                        match.end(),
+                        match.group(),
+                    )
+        elif self.bytes_regexes is None:
+            yield from self.scan_each(text[:].decode("utf-8", errors="replace"))
+        else:
+            for pattern_index, bytes_regex in enumerate(self.bytes_regexes):
+                for bytes_match in bytes_regex.finditer(text):
+                    yield ScanMatch(
+                        pattern_index,
+                        self.labels[pattern_index],
+                        bytes_match.start(),
+                        bytes_match.end(),
+                        bytes_match.group().decode("utf-8", errors="replace"),
+                    )
@@ -0,0 +1,354 @@
+"""Minimal Language Server Protocol server for protocol lint diagnostics.
+
+`co serve --stdio` keeps the .agent file index, manifest checksums and link
+graph warm in memory. Open documents are tracked from didOpen/didChange
+(full or incremental sync). Each edit re-lints only the edited file and the
+files linking to it, then publishes ProtocolLinter findings as diagnostics.
+"""
+
+import json
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, BinaryIO
+from urllib.parse import unquote, urlparse
+
+from cokodo_agent.fsindex import FileIndex
+from cokodo_agent.linter import LintResult, ProtocolLinter
+
+# LSP constants
+SEVERITY_ERROR = 1
+MESSAGE_TYPE_ERROR = 1
+SYNC_INCREMENTAL = 2
+PARSE_ERROR = -32700
+METHOD_NOT_FOUND = -32601
+INVALID_REQUEST = -32600
+INTERNAL_ERROR = -32603
+SERVER_NOT_INITIALIZED = -32002
+
+
+def uri_to_path(uri: str) -> Path:
+    """Convert a file:// URI to a local path."""
+    parsed = urlparse(uri)
+    path = unquote(parsed.path)
+    if len(path) > 2 and path[0] == "/" and path[2] == ":":
+        path = path[1:]  # /C:/... on Windows
+    return Path(path)
+
+
+def _to_offset(text: str, line: int, character: int, utf16: bool) -> int:
+    """Convert an LSP position to a string offset."""
+    start = 0
+    for _ in range(line):
+        newline = text.find("\n", start)
+        if newline == -1:
+            return len(text)
+        start = newline + 1
+    end = text.find("\n", start)
+    end = len(text) if end == -1 else end
+    if not utf16:
+        return min(start + character, end)
+    units = 0
+    offset = start
+    while offset < end and units < character:
+        units += 2 if ord(text[offset]) > 0xFFFF else 1
+        offset += 1
+    return offset
+
+
+def _to_character(line_text: str, column: int, utf16: bool) -> int:
+    """Convert a 0-based code point column to an LSP character offset."""
+    if not utf16:
+        return column
+    return len(line_text[:column].encode("utf-16-le")) // 2
+
+
+class LintSession:
+    """Warm lint state for one .agent directory."""
+
+    def __init__(self, agent_dir: Path):
+        self.agent_dir = agent_dir.resolve()
+        self.index = FileIndex(self.agent_dir)
+        self.linter = ProtocolLinter(self.agent_dir, index=self.index)
+        # Seeds link_deps (the reverse link graph), anchors and hashes
+        self.initial_results = list(self.linter.iter_results())
+
+    def relative(self, path: Path) -> str | None:
+        """Return path relative to agent_dir (POSIX), or None when outside it."""
+        try:
+            rel = path.resolve().relative_to(self.agent_dir)
+        except ValueError:
+            return None
+        return rel.as_posix() if rel.parts else None
+
+    def update(self, rel_path: str, text: str | None) -> list[str]:
+        """
+        Apply new contents (None = reload from disk) and return the files to re-lint.
+
+        Those are the file itself plus every file linking to it (every locked
+        file when the manifest changes).
+        """
+        if text is None:
+            self.index.refresh(rel_path)
+        else:
+            self.index.set_contents(rel_path, text.encode("utf-8"))
+        self.linter.invalidate(rel_path)
+        if rel_path == "manifest.json":
+            return [rel_path, *self.linter.get_all_locked_files()]
+        return [rel_path, *self.linter.linked_from(rel_path)]
+
+    def lint(self, rel_path: str) -> list[LintResult]:
+        return self.linter.lint_file(rel_path)
+
+
+class LanguageServer:
+    """JSON-RPC over stdio (Content-Length framing) implementing the lint subset of LSP."""
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO, root: Path | None = None):
+        self.reader = reader
+        self.writer = writer
+        self.root = root
+        self.session: LintSession | None = None
+        self.documents: dict[str, str] = {}  # open documents: rel path -> text
+        self.utf16 = True
+        self.shutdown_requested = False
+        self._requests: dict[str, Callable[[dict[str, Any]], Any]] = {
+            "initialize": self._initialize,
+            "shutdown": self._shutdown,
+        }
+        self._notifications: dict[str, Callable[[dict[str, Any]], None]] = {
+            "initialized": self._initialized,
+            "textDocument/didOpen": self._did_open,
+            "textDocument/didChange": self._did_change,
+            "textDocument/didSave": self._did_save,
+            "textDocument/didClose": self._did_close,
+        }
+
+    # -- transport -----------------------------------------------------------
+
+    def _read_message(self) -> dict[str, Any] | None:
+        """
+        Read one framed message (None at end of input, {} for a frame without a body).
+
+        Raises ValueError when the body is not UTF-8 JSON; the frame has been
+        consumed by then, so the next message can still be read.
+        """
+        length = None
+        while True:
+            line = self.reader.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode("ascii", errors="replace").partition(":")
+            if name.lower() == "content-length":
+                try:
+                    length = int(value.strip())
+                except ValueError:
+                    length = None
+        if length is None:
+            return {}
+        message = json.loads(self.reader.read(length).decode("utf-8"))
+        return message if isinstance(message, dict) else {}
+
+    def _send(self, payload: dict[str, Any]) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **payload}, ensure_ascii=False).encode("utf-8")
+        self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+        self.writer.flush()
+
+    def _notify(self, method: str, params: dict[str, Any]) -> None:
+        self._send({"method": method, "params": params})
+
+    def _log_error(self, message: str) -> None:
+        self._notify("window/logMessage", {"type": MESSAGE_TYPE_ERROR, "message": message})
+
+    # -- main loop -----------------------------------------------------------
+
+    def serve(self) -> int:
+        """Handle messages until `exit`; return the process exit code."""
+        while True:
+            try:
+                message = self._read_message()
+            except ValueError as e:
+                self._log_error(f"Dropped malformed message: {e}")
+                self._send({"id": None, "error": {"code": PARSE_ERROR, "message": str(e)}})
+                continue
+            if message is None:
+                return 1
+            method = message.get("method")
+            msg_id = message.get("id")
+            if method is None:
+                continue  # responses to server requests (none are sent) or garbage
+            if method == "exit":
+                return 0 if self.shutdown_requested else 1
+
+            if msg_id is None:
+                # Notification: never answered, so a failing one is logged and dropped
+                notification = self._notifications.get(str(method))
+                if notification is not None and self.session is not None:
+                    try:
+                        notification(message.get("params") or {})
+                    except Exception as e:
+                        self._log_error(f"{method} failed: {e!r}")
+                continue
+
+            handler = self._requests.get(str(method))
+            if handler is None:
+                self._send(
+                    {"id": msg_id, "error": {"code": METHOD_NOT_FOUND, "message": str(method)}}
+                )
+            elif self.session is None and method != "initialize":
+                self._send(
+                    {
+                        "id": msg_id,
+                        "error": {"code": SERVER_NOT_INITIALIZED, "message": "not initialized"},
+                    }
+                )
+            else:
+                try:
+                    result = handler(message.get("params") or {})
+                except (FileNotFoundError, ValueError) as e:
+                    self._send(
+                        {"id": msg_id, "error": {"code": INVALID_REQUEST, "message": str(e)}}
+                    )
+                except Exception as e:
+                    self._log_error(f"{method} failed: {e!r}")
+                    self._send(
+                        {"id": msg_id, "error": {"code": INTERNAL_ERROR, "message": repr(e)}}
+                    )
+                else:
+                    self._send({"id": msg_id, "result": result})
+
+    # -- requests ------------------------------------------------------------
+
+    def _initialize(self, params: dict[str, Any]) -> dict[str, Any]:
+        root = self.root
+        if root is None:
+            if params.get("rootUri"):
+                root = uri_to_path(params["rootUri"])
+            elif params.get("rootPath"):
+                root = Path(params["rootPath"])
+            else:
+                root = Path.cwd()
+        agent_dir = root if root.name == ".agent" else root / ".agent"
+        if not agent_dir.is_dir():
+            raise FileNotFoundError(f".agent directory not found at {root}")
+        self.session = LintSession(agent_dir)
+
+        encodings = params.get("capabilities", {}).get("general", {}).get("positionEncodings", [])
+        self.utf16 = "utf-32" not in encodings
+        return {
+            "capabilities": {
+                "positionEncoding": "utf-16" if self.utf16 else "utf-32",
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": SYNC_INCREMENTAL,
+                    "save": True,
+                },
+            },
+            "serverInfo": {"name": "cokodo-agent"},
+        }
+
+    def _shutdown(self, params: dict[str, Any]) -> None:
+        self.shutdown_requested = True
+        return None
+
+    # -- notifications -------------------------------------------------------
+
+    def _initialized(self, params: dict[str, Any]) -> None:
+        assert self.session is not None
+        by_file: dict[str, list[LintResult]] = {}
+        for r in self.session.initial_results:
+            if r.file and not r.passed and self.session.index.is_file(r.file):
+                by_file.setdefault(r.file, []).append(r)
+        for rel_path, results in by_file.items():
+            self._publish(rel_path, results)
+        self.session.initial_results = []
+
+    def _did_open(self, params: dict[str, Any]) -> None:
+        doc = params["textDocument"]
+        self._apply(doc["uri"], doc["text"])
+
+    def _did_change(self, params: dict[str, Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        rel_path = self._relative(uri)
+        if rel_path is None:
+            return
+        text = self.documents.get(rel_path)
+        if text is None:
+            # Not opened with didOpen: edits apply to the on-disk contents
+            assert self.session is not None
+            entry = self.session.index.get(rel_path)
+            data = entry.read_bytes() if entry is not None else b""
+            text = data.decode("utf-8", errors="replace")
+        for change in params.get("contentChanges", []):
+            if "range" not in change:
+                text = change["text"]
+                continue
+            start, end = change["range"]["start"], change["range"]["end"]
+            begin = _to_offset(text, start["line"], start["character"], self.utf16)
+            stop = _to_offset(text, end["line"], end["character"], self.utf16)
+            text = text[:begin] + change["text"] + text[stop:]
+        self._apply(uri, text)
+
+    def _did_save(self, params: dict[str, Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        rel_path = self._relative(uri)
+        if rel_path is not None:
+            # Saved manifest checksums are re-read from disk by the update
+            self._apply(uri, self.documents.get(rel_path))
+
+    def _did_close(self, params: dict[str, Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        rel_path = self._relative(uri)
+        if rel_path is not None and self.documents.pop(rel_path, None) is not None:
+            self._apply(uri, None)  # back to the on-disk contents
+
+    # -- helpers -------------------------------------------------------------
+
+    def _relative(self, uri: str) -> str | None:
+        assert self.session is not None
+        return self.session.relative(uri_to_path(uri))
+
+    def _apply(self, uri: str, text: str | None) -> None:
+        """Update one document and publish diagnostics for every affected file."""
+        assert self.session is not None
+        rel_path = self._relative(uri)
+        if rel_path is None:
+            return
+        if text is not None:
+            self.documents[rel_path] = text
+        for affected in self.session.update(rel_path, text):
+            self._publish(affected, self.session.lint(affected))
+
+    def _publish(self, rel_path: str, results: list[LintResult]) -> None:
+        assert self.session is not None
+        entry = self.session.index.get(rel_path)
+        diagnostics = []
+        for r in results:
+            if r.passed:
+                continue
+            line = character = 0
+            if r.line and entry is not None:
+                line = r.line - 1
+                column = (r.column or 1) - 1
+                line_text = entry.line_text(r.line)[:column]
+                character = _to_character(line_text, column, self.utf16)
+            position = {"line": line, "character": character}
+            diagnostics.append(
+                {
+                    "range": {"start": position, "end": position},
+                    "severity": SEVERITY_ERROR,
+                    "source": "cokodo",
+                    "code": r.rule,
+                    "message": r.message,
+                }
+            )
+        uri = (self.session.agent_dir / rel_path).as_uri()
+        self._notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": diagnostics})
+
+
+def serve_stdio(root: Path | None = None) -> int:
+    """Run the language server on stdin/stdout."""
+    return LanguageServer(sys.stdin.buffer, sys.stdout.buffer, root).serve()
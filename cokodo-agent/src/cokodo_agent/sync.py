@@ -1,12 +1,19 @@
 """Protocol sync and diff utilities."""
 
+import base64
+import hashlib
 import json
+import os
+import re
 import shutil
+import time
 from pathlib import Path
-from typing import NamedTuple
+from typing import Any, NamedTuple
 
+from cokodo_agent.cache import RACY_WINDOW_NS, cache_path, load_json, save_json
 from cokodo_agent.fetcher import get_protocol
 from cokodo_agent.linter import ProtocolLinter
+from cokodo_agent.timing import span, traced
 
 
 class DiffResult(NamedTuple):
@@ -26,6 +33,10 @@ class SyncResult(NamedTuple):
     errors: list[str]
 
 
+# Serialized sync plan format version (bump on incompatible changes)
+SYNC_PLAN_FORMAT = 1
+
+
 def get_protocol_version(agent_dir: Path) -> str | None:
     """Get current protocol version from manifest.json."""
     manifest_path = agent_dir / "manifest.json"
@@ -40,10 +51,132 @@ def get_protocol_version(agent_dir: Path) -> str | None:
         return None
 
 
+def tree_digest(checksums: dict[str, str]) -> str:
+    """Return a single digest over a {path: sha256} mapping."""
+    sha256 = hashlib.sha256()
+    for rel_path, file_hash in sorted(checksums.items()):
+        sha256.update(f"{rel_path}\0{file_hash}\n".encode())
+    return sha256.hexdigest()
+
+
+def protocol_checksums(protocol_path: Path, version: str) -> dict[str, str]:
+    """
+    Return locked-file checksums for a resolved protocol source.
+
+    Fetched and bundled protocols do not change for a given version, so the
+    result is cached per (path, version, manifest stat).
+    """
+    with span("checksums") as current:
+        try:
+            st = (protocol_path / "manifest.json").stat()
+            key_path: Path | None = cache_path(
+                "protocols", protocol_path.resolve(), version, st.st_size, st.st_mtime_ns
+            )
+        except OSError:
+            key_path = None
+
+        if key_path is not None:
+            cached = load_json(key_path)
+            if isinstance(cached, dict):
+                current.add(cache_hits=1)
+                return cached
+
+        checksums = ProtocolLinter(protocol_path).generate_checksums()
+        if key_path is not None:
+            save_json(key_path, checksums)
+        return checksums
+
+
+def _state_path(agent_dir: Path) -> Path:
+    return cache_path("state", agent_dir.resolve())
+
+
+def _locked_dir_paths(agent_dir: Path) -> list[str]:
+    """Relative paths of every directory whose entries can affect locked files."""
+    roots = [agent_dir / d for d in ProtocolLinter.LOCKED_DIRS]
+    roots += [agent_dir / "skills" / s for s in ProtocolLinter.LOCKED_SKILLS]
+    dirs = [".", "skills"]
+    for root in roots:
+        if not root.is_dir():
+            continue
+        for dir_path, _, _ in os.walk(root):
+            dirs.append(Path(dir_path).relative_to(agent_dir).as_posix())
+    return dirs
+
+
+def _stat_signature(path: Path) -> list[int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def record_sync_state(agent_dir: Path, version: str, checksums: dict[str, str]) -> None:
+    """
+    Remember that agent_dir matches protocol `version` with these checksums.
+
+    Stores the tree digest together with a stat snapshot of every locked file
+    and directory, so is_up_to_date() can later confirm nothing changed
+    without hashing.
+    """
+    state = {
+        "version": version,
+        "digest": tree_digest(checksums),
+        "recorded_ns": time.time_ns(),
+        "manifest": _stat_signature(agent_dir / "manifest.json"),
+        "files": {p: _stat_signature(agent_dir / p) for p in checksums},
+        "dirs": {d: _stat_signature(agent_dir / d) for d in _locked_dir_paths(agent_dir)},
+    }
+    save_json(_state_path(agent_dir), state)
+
+
+def is_up_to_date(agent_dir: Path, remote_version: str, remote_checksums: dict[str, str]) -> bool:
+    """
+    Fast check that agent_dir still matches the resolved protocol.
+
+    Compares the manifest version and the stored tree digest with the
+    protocol's, then sweeps the stat snapshot taken when the digest was
+    recorded. Any doubt (no state, racy timestamps, changed stats) returns
+    False so the caller falls back to a full comparison.
+    """
+    state = load_json(_state_path(agent_dir))
+    if not isinstance(state, dict):
+        return False
+    if state.get("version") != remote_version:
+        return False
+    if get_protocol_version(agent_dir) != remote_version:
+        return False
+    if state.get("digest") != tree_digest(remote_checksums):
+        return False
+
+    horizon = int(state.get("recorded_ns", 0)) - RACY_WINDOW_NS
+    if _stat_signature(agent_dir / "manifest.json") != state.get("manifest"):
+        return False
+
+    for group in ("files", "dirs"):
+        entries = state.get(group)
+        if not isinstance(entries, dict):
+            return False
+        for rel_path, signature in entries.items():
+            current = _stat_signature(agent_dir / rel_path)
+            if current != signature:
+                return False
+            if current is not None and current[1] >= horizon:
+                return False
+
+    return True
+
+
+@traced("diff")
 def diff_protocol(agent_dir: Path, offline: bool = False) -> tuple[list[DiffResult], str, str]:
     """
     Compare local .agent with latest protocol.
 
+    When a previous comparison recorded that the tree matched this protocol
+    version and no locked file changed since, the full hash comparison is
+    skipped (see is_up_to_date()).
+
     Returns:
         Tuple of (diff_results, local_version, remote_version)
     """
@@ -54,8 +187,15 @@ def diff_protocol(agent_dir: Path, offline: bool = False) -> tuple[list[DiffResu
     local_version = get_protocol_version(agent_dir) or "unknown"
 
     # Build checksums for remote protocol
-    remote_linter = ProtocolLinter(protocol_path)
-    remote_checksums = remote_linter.generate_checksums()
+    remote_checksums = protocol_checksums(protocol_path, remote_version)
+
+    # Fast path: nothing changed since the last matching comparison
+    if is_up_to_date(agent_dir, remote_version, remote_checksums):
+        unchanged = [
+            DiffResult(path=p, status="unchanged", local_hash=h, remote_hash=h)
+            for p, h in sorted(remote_checksums.items())
+        ]
+        return unchanged, local_version, remote_version
 
     # Build checksums for local protocol
     local_linter = ProtocolLinter(agent_dir)
@@ -87,9 +227,13 @@ def diff_protocol(agent_dir: Path, offline: bool = False) -> tuple[list[DiffResu
             )
         )
 
+    if local_version == remote_version and local_checksums == remote_checksums:
+        record_sync_state(agent_dir, remote_version, local_checksums)
+
     return results, local_version, remote_version
 
 
+@traced("sync")
 def sync_protocol(
     agent_dir: Path,
     offline: bool = False,
@@ -159,12 +303,216 @@ def sync_protocol(
                 manifest_path.write_text(
                     json.dumps(manifest, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
                 )
+
+                if manifest["checksums"] == protocol_checksums(protocol_path, remote_version):
+                    record_sync_state(agent_dir, remote_version, manifest["checksums"])
             except Exception as e:
                 errors.append(f"manifest.json: {e}")
 
     return SyncResult(updated, skipped, errors), local_version, remote_version
 
 
+@traced("sync.plan")
+def build_sync_plan(agent_dir: Path, offline: bool = False) -> dict[str, Any]:
+    """
+    Compute the sync change set once and return it as a serializable plan.
+
+    The plan records the source version, and for every locked file that would
+    change: the operation, the expected local hash (precondition), the new
+    hash and the new content. It can be applied later, or on another machine,
+    with apply_sync_plan() without fetching or diffing again.
+    """
+    diff_results, local_version, remote_version = diff_protocol(agent_dir, offline=offline)
+    protocol_path, _ = get_protocol(offline=offline)
+
+    operations: list[dict[str, Any]] = []
+    skipped: list[str] = []
+
+    for diff in diff_results:
+        if diff.status == "unchanged":
+            continue
+
+        if diff.path.startswith("project/"):
+            skipped.append(f"{diff.path} (user-managed)")
+            continue
+
+        operation: dict[str, Any] = {
+            "path": diff.path,
+            "op": diff.status,
+            "local_hash": diff.local_hash,
+            "remote_hash": diff.remote_hash,
+        }
+        if diff.status in ("added", "modified"):
+            data = (protocol_path / diff.path).read_bytes()
+            try:
+                operation["content"] = data.decode("utf-8")
+                operation["encoding"] = "utf-8"
+            except UnicodeDecodeError:
+                operation["content"] = base64.b64encode(data).decode("ascii")
+                operation["encoding"] = "base64"
+        operations.append(operation)
+
+    return {
+        "format": SYNC_PLAN_FORMAT,
+        "source_version": remote_version,
+        "local_version": local_version,
+        "operations": operations,
+        "skipped": skipped,
+    }
+
+
+def write_sync_plan(plan: dict[str, Any], plan_path: Path) -> None:
+    """Write a sync plan to a JSON file."""
+    plan_path.parent.mkdir(parents=True, exist_ok=True)
+    plan_path.write_text(json.dumps(plan, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def load_sync_plan(plan_path: Path) -> dict[str, Any]:
+    """
+    Load and validate a sync plan written by write_sync_plan().
+
+    Raises:
+        ValueError: If the file is not a valid sync plan
+    """
+    try:
+        plan = json.loads(plan_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid sync plan {plan_path}: {e}") from e
+
+    if not isinstance(plan, dict) or plan.get("format") != SYNC_PLAN_FORMAT:
+        raise ValueError(f"Unsupported sync plan format in {plan_path}")
+    if not isinstance(plan.get("operations"), list) or "source_version" not in plan:
+        raise ValueError(f"Malformed sync plan {plan_path}")
+    if not isinstance(plan.get("skipped", []), list):
+        raise ValueError(f"Malformed sync plan {plan_path}")
+
+    for op in plan["operations"]:
+        if not isinstance(op, dict) or op.get("op") not in ("added", "modified", "removed"):
+            raise ValueError(f"Malformed operation in sync plan {plan_path}: {op!r}")
+        rel_path = str(op.get("path", ""))
+        if not rel_path or rel_path.startswith("/") or ".." in Path(rel_path).parts:
+            raise ValueError(f"Unsafe path in sync plan {plan_path}: {rel_path!r}")
+        # Everything apply_sync_plan() reads is checked here, before any file is written
+        local_hash = op.get("local_hash")
+        if local_hash is not None and not _is_sha256(local_hash):
+            raise ValueError(f"Malformed local hash for {rel_path} in sync plan {plan_path}")
+        if op["op"] == "removed":
+            continue
+        if not _is_sha256(op.get("remote_hash")):
+            raise ValueError(f"Malformed remote hash for {rel_path} in sync plan {plan_path}")
+        try:
+            data = _plan_content(op)
+        except ValueError as e:
+            raise ValueError(f"Invalid content for {rel_path} in sync plan {plan_path}: {e}") from e
+        if hashlib.sha256(data).hexdigest() != op["remote_hash"]:
+            raise ValueError(f"Content of {rel_path} does not match its hash in {plan_path}")
+
+    return plan
+
+
+def _is_sha256(value: object) -> bool:
+    return isinstance(value, str) and re.fullmatch(r"[0-9a-f]{64}", value) is not None
+
+
+def _plan_content(op: dict[str, Any]) -> bytes:
+    """
+    Decode the new file content carried by a plan operation.
+
+    Raises:
+        ValueError: If the content is missing or not valid for its encoding
+    """
+    content, encoding = op.get("content"), op.get("encoding", "utf-8")
+    if not isinstance(content, str):
+        raise ValueError("missing content")
+    if encoding == "base64":
+        return base64.b64decode(content, validate=True)  # binascii.Error is a ValueError
+    if encoding != "utf-8":
+        raise ValueError(f"unknown encoding {encoding!r}")
+    return content.encode("utf-8")
+
+
+@traced("sync.apply")
+def apply_sync_plan(
+    agent_dir: Path,
+    plan: dict[str, Any],
+    dry_run: bool = False,
+) -> SyncResult:
+    """
+    Apply a sync plan to a local .agent directory.
+
+    Only the files touched by the plan are checked: each must still have the
+    local hash recorded when the plan was built (or still be absent for added
+    files). If any precondition fails, nothing is written.
+    """
+    updated: list[str] = []
+    skipped = list(plan.get("skipped", []))
+    errors: list[str] = []
+
+    payloads: dict[str, bytes] = {}
+    for op in plan["operations"]:
+        rel_path = op["path"]
+        target_file = agent_dir / rel_path
+
+        expected = op.get("local_hash")
+        if expected is None:
+            if target_file.exists():
+                errors.append(f"{rel_path}: exists locally but plan expects it to be absent")
+        elif not target_file.is_file():
+            errors.append(f"{rel_path}: missing locally (plan expects hash {expected[:12]})")
+        elif ProtocolLinter.compute_sha256(target_file) != expected:
+            errors.append(f"{rel_path}: local file changed since the plan was created")
+
+        if op["op"] in ("added", "modified"):
+            data = _plan_content(op)
+            if hashlib.sha256(data).hexdigest() != op.get("remote_hash"):
+                errors.append(f"{rel_path}: plan content does not match recorded hash")
+            payloads[rel_path] = data
+
+    if errors:
+        return SyncResult(updated, skipped, errors)
+
+    for op in plan["operations"]:
+        rel_path = op["path"]
+        target_file = agent_dir / rel_path
+        try:
+            if op["op"] == "removed":
+                if not dry_run and target_file.exists():
+                    target_file.unlink()
+            elif not dry_run:
+                target_file.parent.mkdir(parents=True, exist_ok=True)
+                target_file.write_bytes(payloads[rel_path])
+            updated.append(f"{rel_path} ({op['op']})")
+        except Exception as e:
+            errors.append(f"{rel_path}: {e}")
+
+    # Update manifest version and the checksums of touched files only
+    if not dry_run and not errors:
+        manifest_path = agent_dir / "manifest.json"
+        if manifest_path.exists():
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+                manifest["version"] = plan["source_version"]
+
+                checksums = manifest.get("checksums")
+                if not isinstance(checksums, dict):
+                    checksums = {}
+                for op in plan["operations"]:
+                    if op["op"] == "removed":
+                        checksums.pop(op["path"], None)
+                    else:
+                        checksums[op["path"]] = op["remote_hash"]
+                manifest["checksums"] = dict(sorted(checksums.items()))
+
+                manifest_path.write_text(
+                    json.dumps(manifest, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+                )
+            except Exception as e:
+                errors.append(f"manifest.json: {e}")
+
+    return SyncResult(updated, skipped, errors)
+
+
+@traced("context")
 def get_context_files(
     agent_dir: Path,
     stack: str | None = None,
@@ -246,6 +594,7 @@ def get_context_files(
     return unique_files
 
 
+@traced("context.build")
 def build_context_content(
     agent_dir: Path,
     file_list: list[str],
@@ -0,0 +1,217 @@
+"""Lightweight timing spans for `co --timings`, `co --profile` and COKODO_TRACE.
+
+Engines wrap their phases in span("phase"). Without an active Recorder a
+span costs one global lookup. While recording(), each span measures wall
+time plus the bytes read and files touched through FileIndex (see
+fsindex.record_reads), and the phase can add its own counters (files it
+read directly, cache hits). The recorder aggregates spans by name for the
+--timings table and keeps every span as a Chrome trace event.
+
+Spans nest and may run on worker threads; counters of an outer span
+include those of its inner spans (and, with --jobs, of concurrent work).
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, ParamSpec, TypeVar
+
+from cokodo_agent.fsindex import ReadStats, record_reads
+
+T = TypeVar("T")
+P = ParamSpec("P")
+
+# Environment variable naming a file to write Chrome-trace-format spans to
+TRACE_ENV = "COKODO_TRACE"
+
+
+class PhaseStats:
+    """Totals of every span recorded under one name."""
+
+    __slots__ = ("name", "calls", "wall", "bytes_read", "files", "cache_hits")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0  # seconds
+        self.bytes_read = 0
+        self.files = 0
+        self.cache_hits = 0
+
+
+class Span:
+    """An open span; add() attaches counters for work not seen by FileIndex."""
+
+    __slots__ = ("name", "args", "bytes_read", "files", "cache_hits")
+
+    def __init__(self, name: str, args: dict[str, Any]):
+        self.name = name
+        self.args = args
+        self.bytes_read = 0
+        self.files = 0
+        self.cache_hits = 0
+
+    def add(self, bytes_read: int = 0, files: int = 0, cache_hits: int = 0) -> None:
+        self.bytes_read += bytes_read
+        self.files += files
+        self.cache_hits += cache_hits
+
+
+class Recorder:
+    """Collects spans: per-name totals and one trace event per span."""
+
+    def __init__(self) -> None:
+        self.phases: dict[str, PhaseStats] = {}
+        self.events: list[dict[str, Any]] = []
+        self.reads = ReadStats()
+        self._origin_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def record(self, span: Span, start_ns: int, duration_ns: int) -> None:
+        with self._lock:
+            phase = self.phases.get(span.name)
+            if phase is None:
+                phase = self.phases[span.name] = PhaseStats(span.name)
+            phase.calls += 1
+            phase.wall += duration_ns / 1e9
+            phase.bytes_read += span.bytes_read
+            phase.files += span.files
+            phase.cache_hits += span.cache_hits
+            self.events.append(
+                {
+                    "name": span.name,
+                    "cat": "cokodo",
+                    "ph": "X",
+                    "ts": (start_ns - self._origin_ns) / 1000,
+                    "dur": duration_ns / 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": {
+                        **span.args,
+                        "bytes_read": span.bytes_read,
+                        "files": span.files,
+                        "cache_hits": span.cache_hits,
+                    },
+                }
+            )
+
+    def write_trace(self, path: Path) -> None:
+        """Write the spans as a Chrome trace (chrome://tracing, Perfetto)."""
+        trace = {"traceEvents": self.events, "displayTimeUnit": "ms"}
+        path.write_text(json.dumps(trace, default=str) + "\n", encoding="utf-8")
+
+
+_recorder: Recorder | None = None
+
+
+def current() -> Recorder | None:
+    """Return the active Recorder, if any."""
+    return _recorder
+
+
+@contextmanager
+def recording() -> Iterator[Recorder]:
+    """Record every span (and FileIndex read) until the block exits."""
+    global _recorder
+    previous, _recorder = _recorder, Recorder()
+    try:
+        with record_reads(_recorder.reads):
+            yield _recorder
+    finally:
+        _recorder = previous
+
+
+class _NullSpan(Span):
+    """Span handed out when nothing is recorded; counters are discarded."""
+
+    __slots__ = ()
+
+    def add(self, bytes_read: int = 0, files: int = 0, cache_hits: int = 0) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan("", {})
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[Span]:
+    """Time a phase; args are attached to its trace event."""
+    recorder = _recorder
+    if recorder is None:
+        yield _NULL_SPAN
+        return
+    current_span = Span(name, args)
+    reads = recorder.reads
+    bytes_before, files_before = reads.bytes_read, len(reads.files)
+    start = time.perf_counter_ns()
+    try:
+        yield current_span
+    finally:
+        duration = time.perf_counter_ns() - start
+        current_span.add(reads.bytes_read - bytes_before, len(reads.files) - files_before)
+        recorder.record(current_span, start, duration)
+
+
+def traced(name: str) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    """Decorator running every call of a function in span(name)."""
+
+    def decorator(function: Callable[P, T]) -> Callable[P, T]:
+        @wraps(function)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            with span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_iter(name: str, items: Iterable[T], **args: Any) -> Iterator[T]:
+    """
+    Yield from items as one span that counts only the producer's work.
+
+    Time spent by the consumer between items (e.g. printing results) is
+    excluded, so lazy engines can be timed while they stream.
+    """
+    recorder = _recorder
+    if recorder is None:
+        yield from items
+        return
+    current_span = Span(name, args)
+    reads = recorder.reads
+    bytes_before, files_before = reads.bytes_read, len(reads.files)
+    first = time.perf_counter_ns()
+    elapsed = 0
+    try:
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter_ns()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter_ns() - start
+                return
+            elapsed += time.perf_counter_ns() - start
+            yield item
+    finally:
+        current_span.add(reads.bytes_read - bytes_before, len(reads.files) - files_before)
+        recorder.record(current_span, first, elapsed)
+
+
+@contextmanager
+def profiling(path: Path) -> Iterator[None]:
+    """Run the block under cProfile and dump the stats to path (pstats format)."""
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(path))
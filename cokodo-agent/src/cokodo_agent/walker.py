@@ -0,0 +1,170 @@
+"""Discovery of .agent directories and other project files under a root (monorepos).
+
+The walk uses os.scandir, never follows directory symlinks, skips .git, and
+prunes directories ignored by .gitignore files along the way, so large
+ignored trees (node_modules, build output, virtualenvs) are never entered.
+"""
+
+import os
+import re
+from collections.abc import Iterator
+from pathlib import Path
+
+AGENT_DIR_NAME = ".agent"
+
+# Dependency, VCS and build output directories that recursive detection never enters
+PRUNED_DIRS = frozenset(
+    ".git .hg .svn node_modules __pycache__ .venv venv .tox dist build target .next".split()
+)
+
+
+def _translate(glob: str) -> str:
+    """Translate a gitignore glob (without leading/trailing slashes) to a regex."""
+    out = []
+    i = 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("/**", i) and i + 3 == len(glob):
+            out.append("/.*")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = glob.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = glob[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+        elif c == "\\" and i + 1 < len(glob):
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """Patterns from one .gitignore file, relative to the directory containing it."""
+
+    def __init__(self, base: str, lines: list[str]):
+        self.base = base  # POSIX path of the .gitignore's directory relative to the walk root
+        self.rules: list[tuple[re.Pattern[str], bool, bool]] = []  # (regex, negated, dir_only)
+        for raw in lines:
+            line = raw.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            line = line.lstrip("/")
+            prefix = "" if anchored else "(?:.*/)?"
+            self.rules.append((re.compile(f"^{prefix}{_translate(line)}$"), negated, dir_only))
+
+    @classmethod
+    def load(cls, base: str, path: Path) -> "IgnoreRules | None":
+        try:
+            lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError:
+            return None
+        rules = cls(base, lines)
+        return rules if rules.rules else None
+
+    def match(self, rel_path: str, is_dir: bool) -> bool | None:
+        """Return True (ignored), False (re-included) or None (no rule matched)."""
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return None
+            rel_path = rel_path[len(self.base) + 1 :]
+        result = None
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negated
+        return result
+
+
+def _is_ignored(stack: list[IgnoreRules], rel_path: str, is_dir: bool) -> bool:
+    ignored = False
+    for rules in stack:
+        result = rules.match(rel_path, is_dir)
+        if result is not None:
+            ignored = result
+    return ignored
+
+
+def walk_dirs(
+    root: Path,
+    max_depth: int | None = None,
+    prune: frozenset[str] = frozenset({".git"}),
+) -> Iterator[tuple[str, Path, dict[str, tuple[bool, bool]]]]:
+    """
+    Yield (relative dir, path, listing) for root and the directories below it.
+
+    A listing maps each entry name to (is_dir, is_symlink), with is_dir
+    following symlinks. Directories are visited depth-first in name order, as
+    they are read. Symlinked directories, names in prune and gitignored
+    directories are not entered; max_depth limits the depth (root is 0).
+    """
+    # (relative dir, absolute dir, depth, .gitignore rules in effect)
+    stack: list[tuple[str, Path, int, list[IgnoreRules]]] = [("", root, 0, [])]
+    while stack:
+        rel_dir, dir_path, depth, ignores = stack.pop()
+        listing: dict[str, tuple[bool, bool]] = {}
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        listing[entry.name] = (entry.is_dir(), entry.is_symlink())
+                    except OSError:
+                        listing[entry.name] = (False, False)
+        except OSError:
+            continue
+        yield rel_dir, dir_path, listing
+
+        if max_depth is not None and depth >= max_depth:
+            continue
+        if ".gitignore" in listing:
+            rules = IgnoreRules.load(rel_dir, dir_path / ".gitignore")
+            if rules is not None:
+                ignores = [*ignores, rules]
+        subdirs = []
+        for name in sorted(listing, reverse=True):  # popped in name order
+            is_dir, is_symlink = listing[name]
+            if not is_dir or is_symlink or name in prune:
+                continue
+            rel = f"{rel_dir}/{name}" if rel_dir else name
+            if not _is_ignored(ignores, rel, is_dir=True):
+                subdirs.append((rel, dir_path / name, depth + 1, ignores))
+        stack.extend(subdirs)
+
+
+def find_agent_dirs(root: Path) -> list[Path]:
+    """Return every .agent directory under root (including root/.agent), sorted by path."""
+    found: list[Path] = []
+    for _, dir_path, listing in walk_dirs(root, prune=frozenset({".git", AGENT_DIR_NAME})):
+        is_dir, is_symlink = listing.get(AGENT_DIR_NAME, (False, False))
+        if is_dir and not is_symlink:
+            found.append(dir_path / AGENT_DIR_NAME)
+    return sorted(found)
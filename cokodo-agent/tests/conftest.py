@@ -0,0 +1,12 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Point the user cache at a per-test directory so tests never share state."""
+    cache_dir = tmp_path / "cokodo-cache"
+    monkeypatch.setattr("cokodo_agent.config.DEFAULT_CACHE_DIR", cache_dir)
+    monkeypatch.delenv("COKODO_NO_CACHE", raising=False)
+    return cache_dir
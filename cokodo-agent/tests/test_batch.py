@@ -0,0 +1,151 @@
+"""Tests for batch mode and in-process cache sessions."""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import typer
+
+from cokodo_agent.batch import parse_batch, run_batch
+from cokodo_agent.cache import cache_session, shared
+from cokodo_agent.fetcher import get_protocol
+from cokodo_agent.linter import ProtocolLinter
+
+
+@pytest.fixture
+def agent_dir():
+    """Create a minimal .agent directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        agent_dir = Path(tmpdir) / ".agent"
+        agent_dir.mkdir()
+        (agent_dir / "start-here.md").write_text("# Start\n", encoding="utf-8")
+        (agent_dir / "manifest.json").write_text(json.dumps({"version": "3.0.0"}))
+        yield agent_dir
+
+
+def fake_cli(args: list[str]) -> None:
+    """Stand-in for the CLI entry point: echo, then exit like click does."""
+    if args[0] == "fail":
+        print("failing", file=sys.stderr)
+        raise SystemExit(3)
+    if args[0] == "crash":
+        raise RuntimeError("boom")
+    print(" ".join(args))
+    raise SystemExit(0)
+
+
+class TestParseBatch:
+    """Test parse_batch."""
+
+    def test_lines(self):
+        """Test command lines are shell-split, with comments, blanks and program names dropped."""
+        text = "# setup\nco lint a --format json\n\ncontext 'my project' -o paths  # paths\n"
+
+        assert parse_batch(text) == [
+            ["lint", "a", "--format", "json"],
+            ["context", "my project", "-o", "paths"],
+        ]
+
+    def test_json_array(self):
+        """Test a JSON array mixes argument lists and command lines."""
+        text = '[["lint", "a b"], "cokodo adapt all b", []]'
+
+        assert parse_batch(text) == [["lint", "a b"], ["adapt", "all", "b"]]
+
+    @pytest.mark.parametrize(
+        "text, message",
+        [
+            ("[1, 2", "invalid JSON"),
+            ('[["lint", 1]]', "entry 1"),
+            ("lint\ncontext 'unclosed", "entry 2"),
+        ],
+    )
+    def test_malformed(self, text, message):
+        """Test malformed input is reported with the offending entry."""
+        with pytest.raises(ValueError, match=message):
+            parse_batch(text)
+
+
+class TestRunBatch:
+    """Test run_batch."""
+
+    def test_captures_each_command(self):
+        """Test output and exit codes are captured per command, in order."""
+        results = list(run_batch(fake_cli, [["echo", "1"], ["fail"], ["crash"], ["serve"]]))
+
+        assert [r.position for r in results] == [0, 1, 2, 3]
+        assert results[0].stdout == "echo 1\n"
+        assert results[0].exit_code == 0
+        assert results[1].exit_code == 3
+        assert results[1].stderr == "failing\n"
+        assert results[2].exit_code == 1
+        assert "RuntimeError: boom" in results[2].stderr
+        assert results[3].exit_code == 2
+        assert "cannot run inside a batch" in results[3].stderr
+
+    def test_fail_fast(self):
+        """Test fail_fast stops after the first failing command."""
+        results = list(run_batch(fake_cli, [["fail"], ["echo"]], fail_fast=True))
+
+        assert [r.args for r in results] == [["fail"]]
+
+    def test_commands_share_the_resolved_protocol(self):
+        """Test the protocol is resolved once for the whole batch."""
+
+        def resolve(args: list[str]) -> None:
+            print(get_protocol(offline=True)[1])
+
+        with patch(
+            "cokodo_agent.fetcher.resolver._resolve_protocol", return_value=(Path("p"), "9.9.9")
+        ) as resolver:
+            results = list(run_batch(resolve, [["a"], ["b"]]))
+
+        assert [r.stdout for r in results] == ["9.9.9\n", "9.9.9\n"]
+        assert resolver.call_count == 1
+
+    def test_real_cli_commands(self, agent_dir):
+        """Test CLI commands run in-process through the typer entry point."""
+        from cokodo_agent.cli import app
+
+        command = typer.main.get_command(app)
+        commands = [["context", str(agent_dir.parent), "-o", "paths"], ["nosuch"]]
+        results = list(run_batch(lambda a: command.main(args=a, prog_name="co"), commands))
+
+        assert results[0].exit_code == 0
+        assert results[1].exit_code == 2
+        assert "No such command" in results[1].stderr
+
+
+class TestCacheSession:
+    """Test cache_session and shared."""
+
+    def test_shared_outside_session_creates(self):
+        """Test shared() creates a new object every time without a session."""
+        assert shared(("k",), list) is not shared(("k",), list)
+
+    def test_shared_inside_session_reuses(self):
+        """Test shared() memoizes by key inside a session and calls reuse on hits."""
+        reused = []
+        with cache_session():
+            first = shared(("k",), list, reused.append)
+            second = shared(("k",), list, reused.append)
+            other = shared(("other",), list)
+
+        assert first is second
+        assert other is not first
+        assert reused == [first]
+        assert shared(("k",), list) is not first
+
+    def test_linters_share_the_file_index(self, agent_dir):
+        """Test linters of the same .agent reuse one file index within a session."""
+        with cache_session():
+            first = ProtocolLinter(agent_dir).index
+            (agent_dir / "new.md").write_text("# New\n", encoding="utf-8")
+            second = ProtocolLinter(agent_dir).index
+
+        assert first is second
+        assert second.is_file("new.md")
+        assert ProtocolLinter(agent_dir).index is not first
@@ -0,0 +1,124 @@
+"""Tests for the benchmark suite."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from cokodo_agent.bench import (
+    SCENARIOS,
+    BenchResult,
+    TreeSpec,
+    compare,
+    generate_tree,
+    load_baseline,
+    run_scenarios,
+    save_baseline,
+    to_baseline,
+)
+from cokodo_agent.cli import app
+from cokodo_agent.linter import ProtocolLinter
+
+runner = CliRunner()
+
+TINY = TreeSpec(files=10, file_size=600, link_density=3, skills=2, ide_files=1)
+
+
+@pytest.fixture
+def project():
+    """Generate a tiny synthetic project."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        generate_tree(root, TINY)
+        yield root
+
+
+class TestGenerateTree:
+    """Test the synthetic tree generator."""
+
+    def test_generated_documents_are_valid(self, project):
+        """Test generated links, anchors and checksums all pass lint."""
+        results = ProtocolLinter(project / ".agent").lint_all()
+        generated = [
+            r
+            for r in results
+            if r.file
+            and r.file.startswith(("core/generated/", "project/notes/", "skills/_project/"))
+        ]
+
+        assert any(r.rule == "internal-links" and "#section-" in r.message for r in generated)
+        assert all(r.passed for r in generated)
+        assert (project / "GEMINI.md").exists()
+        assert len(list((project / ".cursor" / "rules").glob("*.mdc"))) == 1
+
+    def test_deterministic(self, project):
+        """Test the same spec generates the same documents."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            generate_tree(Path(tmpdir), TINY)
+            for rel in ["core/generated/doc-00000.md", "project/notes/note-00003.md"]:
+                assert (Path(tmpdir) / ".agent" / rel).read_text(encoding="utf-8") == (
+                    project / ".agent" / rel
+                ).read_text(encoding="utf-8")
+
+
+class TestScenarios:
+    """Test scenario runs and baselines."""
+
+    def test_run_scenarios(self, project, isolated_cache_dir):
+        """Test every scenario runs and caches stay out of the user cache."""
+        results = run_scenarios(project, repeat=2)
+
+        assert [r.name for r in results] == [s.name for s in SCENARIOS]
+        assert all(len(r.runs) == 2 and r.min <= r.median for r in results)
+        assert not isolated_cache_dir.exists()
+
+    def test_compare_flags_regressions(self, tmp_path):
+        """Test medians slower than the threshold are flagged."""
+        before = to_baseline(TINY, [BenchResult("lint", [1.0, 1.0]), BenchResult("diff", [1.0])])
+        after = to_baseline(TINY, [BenchResult("lint", [1.5]), BenchResult("diff", [1.1])])
+        save_baseline(tmp_path / "before.json", before)
+
+        comparisons = compare(load_baseline(tmp_path / "before.json"), after, threshold=0.2)
+
+        assert [(c.name, c.regressed) for c in comparisons] == [("lint", True), ("diff", False)]
+        assert comparisons[0].ratio == pytest.approx(1.5)
+
+    def test_load_baseline_rejects_other_json(self, tmp_path):
+        """Test files that are not baselines are rejected."""
+        (tmp_path / "x.json").write_text(json.dumps({"results": {}}))
+
+        with pytest.raises(ValueError):
+            load_baseline(tmp_path / "x.json")
+
+
+class TestBenchCommands:
+    """Test co bench and co bench-compare."""
+
+    def test_bench_and_compare(self, tmp_path):
+        """Test a run saves a baseline and comparing against a faster one fails."""
+        output = tmp_path / "run.json"
+        args = ["bench", "--scale", "small", "--files", "5", "-n", "1", "-s", "parse"]
+
+        result = runner.invoke(app, [*args, "-o", str(output)])
+        assert result.exit_code == 0
+        assert list(load_baseline(output)["results"]) == ["parse"]
+
+        fast = json.loads(output.read_text())
+        fast["results"]["parse"]["median"] /= 10
+        (tmp_path / "fast.json").write_text(json.dumps(fast))
+
+        result = runner.invoke(app, ["bench-compare", str(tmp_path / "fast.json"), str(output)])
+        assert result.exit_code == 1
+        assert "Regression in: parse" in result.output
+
+        result = runner.invoke(app, ["bench-compare", str(output), str(output)])
+        assert result.exit_code == 0
+
+    def test_unknown_scenario(self):
+        """Test unknown scenario names are rejected before generating a tree."""
+        result = runner.invoke(app, ["bench", "-s", "nope"])
+
+        assert result.exit_code == 1
+        assert "Unknown scenario" in result.output
@@ -0,0 +1,79 @@
+"""Tests for changed-file discovery."""
+
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from cokodo_agent.changes import agent_relative, git_changed_files
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo():
+    """Create a git repository with one commit."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        git(root, "init", "-q")
+        (root / ".agent" / "core").mkdir(parents=True)
+        (root / ".agent" / "core" / "a.md").write_text("# A\n", encoding="utf-8")
+        (root / ".agent" / "core" / "b.md").write_text("# B\n", encoding="utf-8")
+        (root / "README.md").write_text("# Readme\n", encoding="utf-8")
+        git(root, "add", "-A")
+        git(root, "commit", "-q", "-m", "init")
+        yield root
+
+
+class TestGitChangedFiles:
+    """Test git_changed_files."""
+
+    def test_work_tree_changes(self, repo):
+        """Test modified, deleted and untracked files are reported."""
+        (repo / ".agent" / "core" / "a.md").write_text("# A2\n", encoding="utf-8")
+        (repo / ".agent" / "core" / "b.md").unlink()
+        (repo / ".agent" / "core" / "new.md").write_text("# New\n", encoding="utf-8")
+
+        changed = git_changed_files(repo / ".agent")
+
+        assert set(changed) == {
+            repo / ".agent" / "core" / "a.md",
+            repo / ".agent" / "core" / "b.md",
+            repo / ".agent" / "core" / "new.md",
+        }
+
+    def test_staged_only(self, repo):
+        """Test staged mode ignores unstaged edits."""
+        (repo / ".agent" / "core" / "a.md").write_text("# A2\n", encoding="utf-8")
+        git(repo, "add", ".agent/core/a.md")
+        (repo / ".agent" / "core" / "b.md").write_text("# B2\n", encoding="utf-8")
+
+        assert git_changed_files(repo, staged=True) == [repo / ".agent" / "core" / "a.md"]
+
+    def test_not_a_repository(self):
+        """Test a directory outside git raises RuntimeError."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(RuntimeError):
+                git_changed_files(Path(tmpdir))
+
+
+class TestAgentRelative:
+    """Test agent_relative."""
+
+    def test_maps_and_filters(self, repo):
+        """Test paths are made relative to .agent and outside paths are dropped."""
+        agent_dir = repo / ".agent"
+        paths = [agent_dir / "core" / "a.md", repo / "README.md", agent_dir]
+
+        assert agent_relative(agent_dir, paths) == {"core/a.md"}
@@ -1,6 +1,8 @@
 """Tests for CLI module."""
 
 import json
+import subprocess
+import sys
 import tempfile
 from pathlib import Path
 from unittest.mock import patch
@@ -12,6 +14,9 @@ from cokodo_agent.cli import app, find_agent_dir
 
 runner = CliRunner()
 
+# Cumulative import time of cokodo_agent.cli, in microseconds (generous for slow CI)
+STARTUP_BUDGET_US = 600_000
+
 
 class TestFindAgentDir:
     """Test find_agent_dir function."""
@@ -54,6 +59,35 @@ class TestVersionCommand:
         assert "Built-in:" in result.output
 
 
+class TestGlobalOptions:
+    """Test --timings, --profile and COKODO_TRACE."""
+
+    def test_timings_and_trace(self, monkeypatch):
+        """Test phases are reported on stderr and written as a Chrome trace."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            runner.invoke(app, ["init", tmpdir, "--yes", "--offline"])
+            trace_path = Path(tmpdir) / "trace.json"
+            monkeypatch.setenv("COKODO_TRACE", str(trace_path))
+
+            result = runner.invoke(app, ["--timings", "diff", tmpdir, "--offline"])
+
+            assert result.exit_code == 0
+            assert "Timings" in result.stderr
+            assert "hash" in result.stderr
+            names = {e["name"] for e in json.loads(trace_path.read_text())["traceEvents"]}
+            assert {"diff", "fetch", "checksums", "hash", "walk"} <= names
+
+    def test_profile(self):
+        """Test --profile writes cProfile data."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            profile_path = Path(tmpdir) / "out.prof"
+
+            result = runner.invoke(app, ["--profile", str(profile_path), "version"])
+
+            assert result.exit_code == 0
+            assert profile_path.stat().st_size > 0
+
+
 class TestInitCommand:
     """Test init command."""
 
@@ -174,6 +208,93 @@ class TestLintCommand:
             except json.JSONDecodeError:
                 pytest.fail("Output is not valid JSON")
 
+    def test_lint_cache_summary(self):
+        """Test text output reports cache hits and misses unless --no-cache."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            agent_dir = Path(tmpdir) / ".agent"
+            agent_dir.mkdir()
+            (agent_dir / "start-here.md").write_text("# Start", encoding="utf-8")
+            (agent_dir / "manifest.json").write_text(json.dumps({"version": "3.0.0"}))
+
+            result = runner.invoke(app, ["lint", str(tmpdir)])
+            assert "Cache:" in result.output
+
+            result = runner.invoke(app, ["lint", str(tmpdir), "--no-cache"])
+            assert "Cache:" not in result.output
+
+    def test_lint_only_failures_max_errors(self):
+        """Test --only-failures hides passing checks and --max-errors stops early."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            agent_dir = Path(tmpdir) / ".agent"
+            agent_dir.mkdir()
+            (agent_dir / "start-here.md").write_text("# Start", encoding="utf-8")
+            (agent_dir / "manifest.json").write_text(json.dumps({"version": "3.0.0"}))
+
+            result = runner.invoke(
+                app, ["lint", str(tmpdir), "-f", "json", "--only-failures", "--max-errors", "2"]
+            )
+
+            parsed = json.loads(result.output)
+            assert len(parsed) == 2
+            assert not any(r["passed"] for r in parsed)
+
+            result = runner.invoke(app, ["lint", str(tmpdir), "--max-errors", "1"])
+            assert result.exit_code == 1
+            assert "Stopped after 1 error(s)" in result.output
+
+    def test_lint_file_scope(self):
+        """Test --file limits per-file checks to the given file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            agent_dir = Path(tmpdir) / ".agent"
+            (agent_dir / "core").mkdir(parents=True)
+            (agent_dir / "start-here.md").write_text("# Start", encoding="utf-8")
+            (agent_dir / "manifest.json").write_text(json.dumps({"version": "3.0.0"}))
+            (agent_dir / "core" / "Bad_Name.md").write_text("# Bad", encoding="utf-8")
+            (agent_dir / "core" / "ok.md").write_text("# OK", encoding="utf-8")
+
+            result = runner.invoke(
+                app,
+                ["lint", str(tmpdir), "-f", "json", "--file", str(agent_dir / "core" / "ok.md")],
+            )
+
+            parsed = json.loads(result.output)
+            naming = {r["file"] for r in parsed if r["rule"] == "naming-convention"}
+            assert naming == {"core/ok.md"}
+
+    def test_lint_recursive(self):
+        """Test --recursive lints every .agent tree into one report."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ["one", "two"]:
+                agent_dir = Path(tmpdir) / name / ".agent"
+                agent_dir.mkdir(parents=True)
+                (agent_dir / "start-here.md").write_text("# Start", encoding="utf-8")
+                (agent_dir / "manifest.json").write_text(json.dumps({"version": "3.0.0"}))
+
+            result = runner.invoke(app, ["lint", str(tmpdir), "--recursive", "-f", "json"])
+            parsed = json.loads(result.output)
+            assert {r["file"].split("/")[0] for r in parsed} == {"one", "two"}
+
+            result = runner.invoke(app, ["lint", str(tmpdir), "-R", "-j", "2"])
+            assert "Projects: 2 .agent tree(s)" in result.output
+
+            result = runner.invoke(app, ["lint", str(tmpdir), "-R", "--changed"])
+            assert result.exit_code == 1
+            assert "cannot be combined" in result.output
+
+    def test_lint_profile(self):
+        """Test --profile prints a per-rule table without disturbing JSON output."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            agent_dir = Path(tmpdir) / ".agent"
+            agent_dir.mkdir()
+            (agent_dir / "start-here.md").write_text("# Start", encoding="utf-8")
+
+            result = runner.invoke(app, ["lint", str(tmpdir), "--profile"])
+            assert "Lint profile" in result.output
+            assert "start-here-spec" in result.output
+
+            result = runner.invoke(app, ["lint", str(tmpdir), "--profile", "-f", "json"])
+            assert json.loads(result.stdout)
+
     def test_lint_specific_rule(self):
         """Test lint command with specific rule."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -255,6 +376,26 @@ class TestDiffCommand:
             assert result.exit_code == 0
             assert "up to date" in result.output
 
+    @patch("cokodo_agent.sync.diff_protocol")
+    def test_diff_exit_code(self, mock_diff):
+        """Test --exit-code distinguishes pending changes from up to date."""
+        from cokodo_agent.sync import DiffResult
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / ".agent").mkdir()
+
+            mock_diff.return_value = ([], "3.0.0", "3.0.0")
+            result = runner.invoke(app, ["diff", str(tmpdir), "--exit-code"])
+            assert result.exit_code == 0
+
+            mock_diff.return_value = (
+                [DiffResult("core/a.md", "modified", "x", "y")],
+                "3.0.0",
+                "3.1.0",
+            )
+            result = runner.invoke(app, ["diff", str(tmpdir), "--exit-code"])
+            assert result.exit_code == 2
+
 
 class TestSyncCommand:
     """Test sync command."""
@@ -356,6 +497,73 @@ class TestContextCommand:
             assert "start-here.md" in result.output
 
 
+class TestDetectCommand:
+    """Test detect command."""
+
+    def test_detect_recursive(self):
+        """Test detect --recursive lists nested projects."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "packages" / "api").mkdir(parents=True)
+            (root / "packages" / "api" / "CLAUDE.md").write_text("# Api\n", encoding="utf-8")
+
+            flat = runner.invoke(app, ["detect", str(tmpdir)])
+            nested = runner.invoke(app, ["detect", str(tmpdir), "--recursive"])
+            limited = runner.invoke(app, ["detect", str(tmpdir), "-R", "--max-depth", "1"])
+
+            assert "No IDE instruction files detected" in flat.output
+            assert nested.exit_code == 0
+            assert "packages/api" in nested.output
+            assert "CLAUDE.md (current)" in nested.output
+            assert "No IDE instruction files detected" in limited.output
+
+
+class TestBatchCommand:
+    """Test batch command."""
+
+    def test_batch_ndjson(self):
+        """Test batch runs each line and prints one JSON record per command."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / ".agent").mkdir()
+            commands = f"co context {tmpdir} -o paths\nlint {tmpdir}/missing\n"
+
+            result = runner.invoke(app, ["batch"], input=commands)
+
+            records = [json.loads(line) for line in result.output.splitlines()]
+            assert result.exit_code == 1
+            assert [r["args"][0] for r in records] == ["context", "lint"]
+            assert [r["exit_code"] for r in records] == [0, 1]
+            assert ".agent directory not found" in records[1]["stdout"]
+
+    def test_batch_invalid_input(self):
+        """Test malformed batch input fails before running anything."""
+        result = runner.invoke(app, ["batch"], input="[1,")
+
+        assert result.exit_code == 1
+        assert "invalid JSON" in result.output
+
+
+class TestImportCommand:
+    """Test import command."""
+
+    def test_import_dry_run_with_jobs(self):
+        """Test import parses every detected file on a thread pool."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / ".agent").mkdir()
+            rules_dir = root / ".claude" / "rules"
+            rules_dir.mkdir(parents=True)
+            for i in range(6):
+                (rules_dir / f"r{i}.md").write_text(f"## Rules\n- Rule {i}\n", encoding="utf-8")
+            (root / "CLAUDE.md").write_text("# MyApp\n", encoding="utf-8")
+
+            result = runner.invoke(app, ["import", str(tmpdir), "--dry-run", "-j", "4"])
+
+            assert result.exit_code == 0
+            assert "Project name: MyApp" in result.output
+            assert "Rules extracted: 6" in result.output
+
+
 class TestJournalCommand:
     """Test journal command."""
 
@@ -464,3 +672,35 @@ class TestHelpCommand:
         assert "Protocol Management" in result.output
         assert "Development" in result.output
         assert "Information" in result.output
+
+
+class TestStartup:
+    """Tests for CLI startup cost."""
+
+    @staticmethod
+    def _import_cli(code: str) -> subprocess.CompletedProcess[str]:
+        return subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import cokodo_agent.cli; {code}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+    def test_heavy_modules_loaded_lazily(self):
+        """Parsers, prompts and rich tables are imported by the commands using them."""
+        lazy = ["questionary", "prompt_toolkit", "cokodo_agent.parser", "rich.table"]
+        result = self._import_cli(f"import sys; print([m for m in {lazy!r} if m in sys.modules])")
+
+        assert result.stdout.strip() == "[]"
+
+    def test_import_time_within_budget(self):
+        """python -X importtime reports cokodo_agent.cli under STARTUP_BUDGET_US."""
+        result = self._import_cli("pass")
+        # Lines look like "import time:   self [us] | cumulative | module"
+        cumulative = min(
+            int(line.split("|")[1])
+            for line in result.stderr.splitlines()
+            if line.split("|")[-1].strip() == "cokodo_agent.cli"
+        )
+
+        assert cumulative < STARTUP_BUDGET_US
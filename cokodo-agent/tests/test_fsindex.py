@@ -0,0 +1,169 @@
+"""Tests for the single-pass file index."""
+
+import mmap
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from cokodo_agent import fsindex
+from cokodo_agent.fsindex import FileIndex, is_binary
+
+
+@pytest.fixture
+def tree():
+    """Create a small directory tree."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "core" / "sub").mkdir(parents=True)
+        (root / "core" / "a.md").write_text("# A", encoding="utf-8")
+        (root / "core" / "sub" / "b.md").write_text("# B", encoding="utf-8")
+        (root / "core" / "c.txt").write_text("C", encoding="utf-8")
+        (root / "start-here.md").write_text("# Start", encoding="utf-8")
+        yield root
+
+
+class TestFileIndex:
+    """Test FileIndex."""
+
+    def test_indexes_files_and_dirs(self, tree):
+        """Test files and directories are recorded with POSIX relative paths."""
+        index = FileIndex(tree)
+
+        assert list(index.files) == sorted(index.files)
+        assert index.is_file("core/sub/b.md")
+        assert index.is_dir("core/sub")
+        assert index.exists("start-here.md")
+        assert not index.exists("missing.md")
+        assert index.get("core/a.md").size == 3
+
+    def test_iter_files_prefix_and_suffix(self, tree):
+        """Test filtering by directory prefix and suffix."""
+        index = FileIndex(tree)
+
+        assert [f.rel_path for f in index.iter_files("core", ".md")] == [
+            "core/a.md",
+            "core/sub/b.md",
+        ]
+        assert len(index.iter_files(suffix=".md")) == 3
+
+    def test_list_dir(self, tree):
+        """Test direct children listing."""
+        index = FileIndex(tree)
+
+        assert index.list_dir("core") == ["a.md", "c.txt", "sub"]
+        assert index.list_dir("nope") == []
+
+    def test_contents_read_once(self, tree):
+        """Test contents are cached after the first read."""
+        index = FileIndex(tree)
+        entry = index.get("core/a.md")
+
+        with patch.object(Path, "read_bytes", wraps=entry.path.read_bytes) as mock_read:
+            assert entry.read_text() == "# A"
+            assert entry.read_bytes() == b"# A"
+            assert mock_read.call_count == 1
+
+    def test_position(self, tree):
+        """Test byte offsets map to 1-based (line, column) via the line table."""
+        (tree / "lines.md").write_text("ab\ncd\n\nxyz é!", encoding="utf-8")
+        entry = FileIndex(tree).get("lines.md")
+
+        assert entry.line_starts() == [0, 3, 6, 7]
+        assert entry.position(0) == (1, 1)
+        assert entry.position(1) == (1, 2)
+        assert entry.position(3) == (2, 1)
+        assert entry.position(6) == (3, 1)
+        assert entry.position(9) == (4, 3)
+        assert entry.position(13) == (4, 6)  # after the two-byte é
+
+    def test_byte_position(self, tree):
+        """Test byte offsets map to character columns."""
+        (tree / "lines.md").write_text("ab\nçé-x\n", encoding="utf-8")
+        entry = FileIndex(tree).get("lines.md")
+        data = entry.read_bytes()
+
+        assert entry.byte_position(data, data.index(b"x")) == (2, 4)
+        assert entry.byte_position(data, 1) == (1, 2)
+
+    def test_line_text(self, tree):
+        """Test single lines are decoded on their own, replacing invalid UTF-8."""
+        (tree / "lines.md").write_bytes(b"ab\n\xe9t\xe9\nlast")
+        entry = FileIndex(tree).get("lines.md")
+
+        assert entry.line_text(1) == "ab"
+        assert entry.line_text(2) == "\ufffdt\ufffd"
+        assert entry.line_text(3) == "last"
+        assert entry.line_text(4) == ""
+
+    def test_mapped_large_file(self, tree):
+        """Test large files are memory-mapped without caching their contents."""
+        (tree / "big.md").write_bytes(b"x" * 100 + b"\n")
+        entry = FileIndex(tree).get("big.md")
+
+        with patch.object(fsindex, "MMAP_THRESHOLD", 64):
+            with entry.mapped() as data:
+                assert isinstance(data, mmap.mmap)
+                assert data[:3] == b"xxx"
+                assert not is_binary(data)
+        assert entry._data is None
+
+        with entry.mapped() as data:
+            assert data == b"x" * 100 + b"\n"  # small: read and cached
+        assert entry._data is not None
+
+    def test_is_binary(self):
+        """Test NUL bytes near the start mark a file as binary."""
+        assert is_binary(b"PK\x03\x04\x00")
+        assert not is_binary("héllo".encode())
+        assert not is_binary(b"x" * 9000 + b"\x00")
+
+    def test_missing_root(self):
+        """Test indexing a missing directory yields an empty index."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            index = FileIndex(Path(tmpdir) / "missing")
+            assert index.files == {}
+            assert not index.is_dir("")
+
+    def test_set_contents_and_refresh(self, tree):
+        """Test in-memory contents override disk until refreshed, and new files are indexed."""
+        index = FileIndex(tree)
+
+        index.set_contents("core/a.md", b"# Edited")
+        index.set_contents("core/new/d.md", b"# D")
+
+        assert index.get("core/a.md").read_text() == "# Edited"
+        assert index.is_file("core/new/d.md")
+        assert index.is_dir("core/new")
+        assert list(index.files) == sorted(index.files)
+
+        assert index.refresh("core/a.md").read_text() == "# A"
+        assert index.refresh("core/new/d.md") is None
+        assert not index.exists("core/new/d.md")
+
+    def test_rescan_keeps_unchanged_contents(self, tree):
+        """Test rescan picks up added, removed and edited files and keeps unchanged entries."""
+        index = FileIndex(tree)
+        unchanged = index.get("core/sub/b.md")
+        unchanged.read_bytes()
+        index.scanned_ns += fsindex.RACY_WINDOW_NS * 2  # walked well after the last edit
+
+        (tree / "core" / "a.md").write_text("# Edited", encoding="utf-8")
+        (tree / "core" / "c.txt").unlink()
+        (tree / "core" / "d.md").write_text("# D", encoding="utf-8")
+        index.rescan()
+
+        assert index.get("core/sub/b.md") is unchanged
+        assert index.get("core/a.md").read_text() == "# Edited"
+        assert not index.exists("core/c.txt")
+        assert index.list_dir("core") == ["a.md", "d.md", "sub"]
+
+    def test_rescan_rereads_racy_files(self, tree):
+        """Test files modified close to the previous walk are not trusted by stat."""
+        index = FileIndex(tree)
+        entry = index.get("core/a.md")
+
+        index.rescan()
+
+        assert index.get("core/a.md") is not entry
@@ -0,0 +1,54 @@
+"""Tests for markdown heading anchors."""
+
+from cokodo_agent.links import github_slug, heading_anchors, normalize_anchor
+
+
+class TestGithubSlug:
+    """Test github_slug."""
+
+    def test_basic(self):
+        """Test lowercasing, punctuation removal and hyphenation."""
+        assert github_slug("1. UTF-8 Explicit Encoding") == "1-utf-8-explicit-encoding"
+        assert github_slug("What's `new`?") == "whats-new"
+
+    def test_unicode_and_links(self):
+        """Test non-ASCII letters are kept and inline links use their text."""
+        assert github_slug("测试 [Data](x.md) Isolation") == "测试-data-isolation"
+
+
+class TestHeadingAnchors:
+    """Test heading_anchors."""
+
+    def test_collects_headings(self):
+        """Test ATX, setext and HTML anchors, with duplicate suffixes."""
+        content = (
+            "# Title\n"
+            "## Setup ##\n"
+            "## Setup\n"
+            "Overview\n"
+            "--------\n"
+            '<a name="Custom-Anchor"></a>\n'
+        )
+        assert heading_anchors(content) == {
+            "title",
+            "setup",
+            "setup-1",
+            "overview",
+            "custom-anchor",
+        }
+
+    def test_ignores_fenced_code(self):
+        """Test comment lines inside code fences are not headings."""
+        content = "# Real\n```bash\n# not a heading\n```\n~~~\n# nor this\n~~~\n"
+        assert heading_anchors(content) == {"real"}
+
+    def test_bytes_input(self):
+        """Test UTF-8 bytes give the same anchors and other encodings do not fail."""
+        content = "# Café Menu\n```\n# Code\n```\nÜber\n===\n<a id='Naïve'></a>\n"
+        assert heading_anchors(content.encode()) == heading_anchors(content)
+        assert heading_anchors(content.encode()) == {"café-menu", "über", "naïve"}
+        assert heading_anchors("# Café\n".encode("latin-1")) == {"caf"}
+
+    def test_normalize_anchor(self):
+        """Test fragments are URL-decoded and lowercased."""
+        assert normalize_anchor("Caf%C3%A9-Menu") == "café-menu"
@@ -1,12 +1,16 @@
 """Tests for linter module."""
 
 import json
+import os
 import tempfile
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
-from cokodo_agent.linter import LintResult, ProtocolLinter, update_checksums
+from cokodo_agent.lintcache import LintCache
+from cokodo_agent.linter import LintResult, ProtocolLinter, resolve_jobs, update_checksums
 
 
 class TestLintResult:
@@ -32,6 +36,7 @@ class TestLintResult:
         result = LintResult(rule="test", passed=True, message="msg")
         assert result.file is None
         assert result.line is None
+        assert result.column is None
 
 
 class TestProtocolLinter:
@@ -202,6 +207,188 @@ class TestProtocolLinter:
 
         assert len(results) == 0
 
+    def test_lint_all_reads_each_file_once(self, temp_agent_dir):
+        """Test all rules share one read per file via the file index."""
+        (temp_agent_dir / "core" / "rules.md").write_text(
+            "# Rules\n\nSee [start](../start-here.md)\n", encoding="utf-8"
+        )
+        checksums = ProtocolLinter(temp_agent_dir).generate_checksums()
+        (temp_agent_dir / "manifest.json").write_text(
+            json.dumps({"version": "3.0.0", "checksums": checksums}), encoding="utf-8"
+        )
+
+        reads: list[Path] = []
+        original = Path.read_bytes
+
+        def counting_read(self: Path) -> bytes:
+            reads.append(self)
+            return original(self)
+
+        linter = ProtocolLinter(temp_agent_dir)
+        with patch.object(Path, "read_bytes", counting_read):
+            linter.lint_all()
+
+        assert reads
+        assert len(reads) == len(set(reads))
+
+    def test_findings_report_line_and_column(self, temp_agent_dir):
+        """Test per-file findings carry 1-based line and column positions."""
+        (temp_agent_dir / "core" / "paths.md").write_text(
+            "# Paths\n\nServer at localhost:8080 and [x](missing.md)\n", encoding="utf-8"
+        )
+        results = ProtocolLinter(temp_agent_dir).lint_all()
+
+        failures = {r.message: (r.line, r.column) for r in results if not r.passed}
+        assert failures["Found Hardcoded localhost: localhost:8080"] == (3, 11)
+        assert failures["Broken link: missing.md"] == (3, 30)
+
+    def test_large_and_binary_files(self, temp_agent_dir):
+        """Test memory-mapped files report the same positions and binary files are skipped."""
+        (temp_agent_dir / "core" / "big.md").write_text(
+            "# Big\n" + "filler ß\n" * 50 + "Docs über [x](nope.md) at /Users/zoë/ref\n",
+            encoding="utf-8",
+        )
+        (temp_agent_dir / "core" / "blob.md").write_bytes(b"\x89PNG\x00\xff localhost:1")
+
+        expected = ProtocolLinter(temp_agent_dir).lint_all()
+        with patch("cokodo_agent.fsindex.MMAP_THRESHOLD", 64):
+            results = ProtocolLinter(temp_agent_dir).lint_all()
+
+        assert results == expected
+        failures = {r.message: (r.line, r.column) for r in results if not r.passed}
+        assert failures["Found macOS user path: /Users/zoë/"] == (52, 27)
+        assert failures["Broken link: nope.md"] == (52, 11)
+        blob = [
+            r.message
+            for r in results
+            if r.file == "core/blob.md" and r.rule in ("engine-pollution", "internal-links")
+        ]
+        assert blob == ["Binary file skipped", "Binary file skipped"]
+
+    def test_overlapping_pollution_findings(self, temp_agent_dir):
+        """Test every pollution pattern reports its matches, even where they overlap."""
+        (temp_agent_dir / "core" / "paths.md").write_text(
+            "# Paths\n\nSee C:/Users/bob/notes\n", encoding="utf-8"
+        )
+
+        results = ProtocolLinter(temp_agent_dir).lint_rule("engine-pollution")
+
+        failures = {r.message: (r.line, r.column) for r in results if not r.passed}
+        assert failures["Found Windows path: C:/"] == (3, 5)
+        assert failures["Found macOS user path: /Users/bob/"] == (3, 7)
+
+    def test_anchor_links_in_non_utf8_file(self, temp_agent_dir):
+        """Test anchors of a non-UTF-8 file are checked instead of aborting the run."""
+        (temp_agent_dir / "core" / "latin1.md").write_bytes(
+            b"# T\n\xe9t\xe9 [a](#t) [b](#nope)\n"
+        )
+        (temp_agent_dir / "core" / "link.md").write_text("[c](latin1.md#t)\n", encoding="utf-8")
+
+        # Anchors and positions come from the byte buffer; no file is decoded whole
+        with patch("cokodo_agent.fsindex.IndexedFile.read_text", side_effect=AssertionError):
+            results = ProtocolLinter(temp_agent_dir).lint_rule("internal-links")
+
+        messages = {(r.file, r.message): r.passed for r in results}
+        assert messages[("core/latin1.md", "Link valid: #t")]
+        assert not messages[("core/latin1.md", "Broken anchor: #nope")]
+        assert messages[("core/link.md", "Link valid: latin1.md#t")]
+
+    def test_internal_links_anchors(self, temp_agent_dir):
+        """Test #anchors are validated against heading slugs."""
+        (temp_agent_dir / "core" / "guide.md").write_text(
+            "# Guide\n\n## Getting Started\n\n"
+            "[ok](#getting-started) [bad](#missing) "
+            "[other](../start-here.md#start-here) [nope](../start-here.md#nope)\n",
+            encoding="utf-8",
+        )
+        linter = ProtocolLinter(temp_agent_dir)
+        results = {r.message: r.passed for r in linter.lint_rule("internal-links")}
+
+        assert results["Link valid: #getting-started"]
+        assert not results["Broken anchor: #missing"]
+        assert results["Link valid: ../start-here.md#start-here"]
+        assert not results["Broken anchor: ../start-here.md#nope"]
+
+    def test_parallel_matches_serial(self, temp_agent_dir):
+        """Test a parallel run reports the same results in the same order."""
+        for i in range(8):
+            (temp_agent_dir / "core" / f"doc{i}.md").write_text(
+                f"# Doc {i}\n\nSee [next](doc{i + 1}.md) on localhost:{8000 + i}\n",
+                encoding="utf-8",
+            )
+
+        serial = ProtocolLinter(temp_agent_dir).lint_all()
+        parallel = ProtocolLinter(temp_agent_dir, jobs=4).lint_all()
+
+        assert parallel == serial
+        assert ProtocolLinter(temp_agent_dir, jobs=4).lint_rule("internal-links") == [
+            r for r in serial if r.rule == "internal-links"
+        ]
+
+    def test_only_failures(self, temp_agent_dir):
+        """Test only_failures skips passing results."""
+        results = ProtocolLinter(temp_agent_dir, only_failures=True).lint_all()
+        all_results = ProtocolLinter(temp_agent_dir).lint_all()
+
+        assert results
+        assert results == [r for r in all_results if not r.passed]
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_max_errors_stops_early(self, temp_agent_dir, jobs):
+        """Test the run stops once max_errors failures have been yielded."""
+        for i in range(5):
+            (temp_agent_dir / "core" / f"Bad_{i}.md").write_text("# Bad\n", encoding="utf-8")
+
+        linter = ProtocolLinter(temp_agent_dir, jobs=jobs, max_errors=2)
+        results = list(linter.iter_results())
+
+        assert sum(1 for r in results if not r.passed) == 2
+        assert not results[-1].passed
+        assert linter.stopped_early
+        assert linter.results == []
+
+    def test_iter_results_is_lazy(self, temp_agent_dir):
+        """Test per-file rules only scan files as results are consumed."""
+        for i in range(5):
+            (temp_agent_dir / "core" / f"doc{i}.md").write_text("# Doc\n", encoding="utf-8")
+
+        linter = ProtocolLinter(temp_agent_dir)
+        with patch.object(
+            ProtocolLinter,
+            "_scan_links",
+            autospec=True,
+            side_effect=lambda self, e: ([(True, "ok", None, None)], {}),
+        ) as scan:
+            stream = linter.iter_results(["internal-links"])
+            assert scan.call_count == 0
+            next(stream)
+            assert scan.call_count == 1
+            stream.close()
+
+    def test_profile(self, temp_agent_dir):
+        """Test a profiled run records time, files touched and bytes read per rule."""
+        (temp_agent_dir / "core" / "doc.md").write_text("See [x](x.md)\n", encoding="utf-8")
+
+        linter = ProtocolLinter(temp_agent_dir, jobs=4, profile=True)
+        results = linter.lint_all()
+        profiles = {p.rule: p for p in linter.profiles}
+
+        assert list(profiles) == list(linter.rules)
+        assert sum(p.results for p in profiles.values()) == len(results)
+        assert profiles["start-here-spec"].files == 1
+        assert profiles["start-here-spec"].bytes_read == len("# Start Here\n")
+        # start-here.md and core/doc.md were already read by earlier rules
+        project_bytes = sum(p.stat().st_size for p in (temp_agent_dir / "project").iterdir())
+        assert profiles["internal-links"].files == 7
+        assert profiles["internal-links"].bytes_read == project_bytes
+        assert profiles["directory-structure"].files == 0
+
+    def test_resolve_jobs(self):
+        """Test --jobs normalization."""
+        assert resolve_jobs(3) == 3
+        assert resolve_jobs(0) == (os.cpu_count() or 1)
+        assert resolve_jobs(-1) == (os.cpu_count() or 1)
+
     def test_get_all_locked_files(self, temp_agent_dir):
         """Test getting all locked files."""
         # Create some files in locked directories
@@ -345,3 +532,119 @@ class TestIntegrityCheck:
             failed = [r for r in linter.results if not r.passed]
             assert len(failed) == 1
             assert "No checksums found" in failed[0].message
+
+
+class TestLintCache:
+    """Test incremental lint cache."""
+
+    @pytest.fixture
+    def agent_dir(self):
+        """Create a .agent tree with a few scanned files and aged mtimes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            agent_dir = Path(tmpdir) / ".agent"
+            (agent_dir / "core").mkdir(parents=True)
+            (agent_dir / "start-here.md").write_text("# Start Here\n", encoding="utf-8")
+            (agent_dir / "core" / "a.md").write_text(
+                "See [b](b.md) and [c](c.md)\n", encoding="utf-8"
+            )
+            (agent_dir / "core" / "b.md").write_text("Run on localhost:8080\n", encoding="utf-8")
+            (agent_dir / "manifest.json").write_text(json.dumps({"version": "3.0.0"}))
+            self.age(agent_dir)
+            yield agent_dir
+
+    @staticmethod
+    def age(agent_dir: Path) -> None:
+        """Backdate mtimes so cached stat data is trusted."""
+        old = time.time() - 60
+        for path in agent_dir.rglob("*"):
+            os.utime(path, (old, old))
+
+    @staticmethod
+    def lint(agent_dir: Path) -> tuple[list[LintResult], LintCache]:
+        cache = LintCache(agent_dir)
+        results = ProtocolLinter(agent_dir, cache=cache).lint_all()
+        return results, cache
+
+    def test_second_run_replays_without_reading(self, agent_dir):
+        """Test unchanged files are served from cache without being read."""
+        first, cache = self.lint(agent_dir)
+        assert cache.hits == 0
+        assert cache.misses > 0
+
+        with patch.object(Path, "read_bytes", side_effect=AssertionError("file read")):
+            second, cache = self.lint(agent_dir)
+
+        assert cache.misses == 0
+        assert cache.hits > 0
+        assert second == first
+
+    def test_changed_file_is_rescanned(self, agent_dir):
+        """Test only the modified file misses the cache."""
+        self.lint(agent_dir)
+
+        (agent_dir / "core" / "b.md").write_text("Clean now, longer text\n", encoding="utf-8")
+        results, cache = self.lint(agent_dir)
+
+        assert cache.misses == 2  # engine-pollution and internal-links for core/b.md
+        pollution = [r for r in results if r.rule == "engine-pollution" and r.file == "core/b.md"]
+        assert all(r.passed for r in pollution)
+
+    def test_link_dependency_invalidates(self, agent_dir):
+        """Test creating a link target invalidates the cached link results."""
+        results, _ = self.lint(agent_dir)
+        assert any(r.message == "Broken link: c.md" for r in results)
+
+        (agent_dir / "core" / "c.md").write_text("# C\n", encoding="utf-8")
+        results, _ = self.lint(agent_dir)
+
+        assert not any(r.message == "Broken link: c.md" for r in results)
+        assert any(r.message == "Link valid: c.md" for r in results)
+
+    def test_rule_version_bump_invalidates(self, agent_dir):
+        """Test bumping a rule version discards its cached results."""
+        self.lint(agent_dir)
+
+        versions = dict(ProtocolLinter.RULE_VERSIONS, **{"engine-pollution": 99})
+        with patch.object(ProtocolLinter, "RULE_VERSIONS", versions):
+            _, cache = self.lint(agent_dir)
+
+        assert cache.misses == 2  # core/a.md and core/b.md
+
+    def test_changed_scope_uses_reverse_link_edges(self, agent_dir):
+        """Test a scoped run checks changed files plus files linking to them."""
+        self.lint(agent_dir)
+
+        (agent_dir / "core" / "c.md").write_text("# C\n", encoding="utf-8")
+        cache = LintCache(agent_dir)
+        results = ProtocolLinter(agent_dir, cache=cache, changed={"core/c.md"}).lint_all()
+
+        assert {r.file for r in results if r.rule == "internal-links"} == {"core/a.md"}
+        assert {r.file for r in results if r.rule == "naming-convention"} == {"core/c.md"}
+        assert {r.file for r in results if r.rule == "engine-pollution"} == {"core/c.md"}
+        assert any(r.message == "Link valid: c.md" for r in results)
+
+    def test_changed_scope_without_cache_checks_all_links(self, agent_dir):
+        """Test files without cached link targets are conservatively re-checked."""
+        results = ProtocolLinter(agent_dir, changed={"core/b.md"}).lint_all()
+
+        assert {r.file for r in results if r.rule == "internal-links"} == {"core/a.md"}
+        assert {r.file for r in results if r.rule == "engine-pollution"} == {"core/b.md"}
+        assert not any(r.rule == "start-here-spec" for r in results)
+        assert {r.file for r in results if r.rule == "directory-structure"} == {"core"}
+
+    def test_anchor_dependency_invalidates(self, agent_dir):
+        """Test renaming a linked heading invalidates cached anchor results."""
+        (agent_dir / "core" / "a.md").write_text(
+            "# A\n\nSee [b](b.md#setup) and [top](#a)\n", encoding="utf-8"
+        )
+        (agent_dir / "core" / "b.md").write_text("# B\n\n## Setup\n", encoding="utf-8")
+        self.age(agent_dir)
+
+        results, _ = self.lint(agent_dir)
+        assert any(r.message == "Link valid: b.md#setup" for r in results)
+        assert any(r.message == "Link valid: #a" for r in results)
+
+        (agent_dir / "core" / "b.md").write_text("# B\n\n## Installation\n", encoding="utf-8")
+        results, _ = self.lint(agent_dir)
+
+        assert any(r.message == "Broken anchor: b.md#setup" for r in results)
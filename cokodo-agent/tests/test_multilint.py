@@ -0,0 +1,93 @@
+"""Tests for multi-tree linting."""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from cokodo_agent.cache import cache_dir
+from cokodo_agent.lintcache import CONTENT_CACHE_MAX_AGE_NS, ContentCache
+from cokodo_agent.multilint import aggregate_results, lint_trees
+
+
+def make_tree(agent_dir: Path) -> None:
+    (agent_dir / "core").mkdir(parents=True)
+    (agent_dir / "start-here.md").write_text("# Start Here\n", encoding="utf-8")
+    (agent_dir / "core" / "a.md").write_text("Run on localhost:8080\n", encoding="utf-8")
+    (agent_dir / "manifest.json").write_text(json.dumps({"version": "3.0.0"}))
+
+
+@pytest.fixture
+def monorepo():
+    """Create a root with two identical sub-project trees."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        make_tree(root / "one" / ".agent")
+        make_tree(root / "two" / ".agent")
+        yield root
+
+
+class TestLintTrees:
+    """Test lint_trees and aggregate_results."""
+
+    def test_identical_content_is_shared(self, monorepo):
+        """Test content-only rule results are reused across identical trees."""
+        first, second = lint_trees([monorepo / "one" / ".agent", monorepo / "two" / ".agent"])
+
+        assert first.misses > 0
+        assert second.hits == 2  # start-here-spec and engine-pollution
+        assert [r.message for r in second.results] == [r.message for r in first.results]
+
+    def test_process_pool_matches_serial(self, monorepo):
+        """Test a multi-process run returns the same reports in tree order."""
+        agent_dirs = [monorepo / "one" / ".agent", monorepo / "two" / ".agent"]
+
+        serial = lint_trees(agent_dirs, use_cache=False)
+        parallel = lint_trees(agent_dirs, jobs=2, use_cache=False)
+
+        assert [r.results for r in parallel] == [r.results for r in serial]
+
+    def test_aggregate_prefixes_paths(self, monorepo):
+        """Test aggregated results carry paths relative to the root."""
+        reports = lint_trees([monorepo / "one" / ".agent", monorepo / "two" / ".agent"])
+        results = aggregate_results(monorepo, reports)
+
+        files = {r.file for r in results if r.rule == "engine-pollution"}
+        assert files == {"one/.agent/core/a.md", "two/.agent/core/a.md"}
+
+    def test_corrupt_manifest_is_reported_per_tree(self, monorepo):
+        """Test a tree with an unreadable manifest does not stop the other trees."""
+        (monorepo / "one" / ".agent" / "manifest.json").write_text("{not json", encoding="utf-8")
+
+        broken, ok = lint_trees([monorepo / "one" / ".agent", monorepo / "two" / ".agent"])
+
+        assert broken.error is not None
+        assert broken.results == []
+        assert ok.error is None
+        assert ok.results
+        errors = [r for r in aggregate_results(monorepo, [broken, ok]) if r.rule == "lint-error"]
+        assert [r.file for r in errors] == ["one/.agent"]
+
+
+class TestContentCache:
+    """Test the shared content cache."""
+
+    def test_prune_keeps_recently_used_entries(self):
+        """Test entries unused for the maximum age are deleted, read ones are kept."""
+        writer = ContentCache()
+        writer.put("engine-pollution", 1, "used", [(True, "ok", None, None)])
+        writer.put("engine-pollution", 1, "stale", [(True, "ok", None, None)])
+        old = time.time() - CONTENT_CACHE_MAX_AGE_NS / 1e9 - 60
+        for path in cache_dir("lint-content").iterdir():
+            os.utime(path, (old, old))
+
+        reader = ContentCache()
+        assert reader.get("engine-pollution", 1, "used") == [(True, "ok", None, None)]
+        reader.prune()
+
+        assert len(list(cache_dir("lint-content").iterdir())) == 1
+        assert ContentCache().get("engine-pollution", 1, "used") is not None
+        assert ContentCache().get("engine-pollution", 1, "stale") is None
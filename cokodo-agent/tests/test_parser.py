@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import os
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from cokodo_agent.config import IDE_SPEC_VERSIONS
-from cokodo_agent.parser import HybridParser, ParsedInstruction
+from cokodo_agent.parsecache import ParseCache
+from cokodo_agent.parser import DirectorySnapshot, HybridParser, ParsedInstruction
 from cokodo_agent.parser.base import (
     extract_agent_references,
     extract_frontmatter,
@@ -16,13 +21,13 @@ from cokodo_agent.parser.base import (
     extract_project_name,
     extract_rules,
     extract_sections,
+    scan_markdown,
 )
 from cokodo_agent.parser.claude import ClaudeParser
 from cokodo_agent.parser.copilot import CopilotParser
 from cokodo_agent.parser.cursor import CursorParser
 from cokodo_agent.parser.gemini import GeminiParser
 
-
 # ---------------------------------------------------------------------------
 # Fixtures
 # ---------------------------------------------------------------------------
@@ -104,6 +109,87 @@ class TestExtractImports:
         assert "@.agent/project/context.md" in imports
 
 
+
+class TestScanMarkdown:
+    CONTENT = (
+        "---\ndescription: Uses .agent/start-here.md\n---\n\n"
+        "# MyProject\n\n"
+        "@.agent/project/context.md\n"
+        "## Standards\n- Tests first\n\n"
+        "## Key Rules\n- UTF-8 only\n  - Forward slash\n-\n"
+        "See .agent/core/core-rules.md and .agent/start-here.md\n"
+        "## Notes\n# Not the name\n"
+    )
+
+    def test_single_pass_matches_helpers(self) -> None:
+        scan = scan_markdown(self.CONTENT)
+        fm, body = extract_frontmatter(self.CONTENT)
+        assert scan.frontmatter == fm == {"description": "Uses .agent/start-here.md"}
+        assert scan.body == body
+        assert scan.project_name == extract_project_name(body) == "MyProject"
+        assert scan.sections == extract_sections(body)
+        assert list(scan.sections) == ["Standards", "Key Rules", "Notes"]
+        # Rules follow the section name order, not the document order
+        assert scan.rules == ["UTF-8 only", "Forward slash", "Tests first"]
+        assert scan.imports == ["@.agent/project/context.md"]
+
+    def test_references_include_frontmatter(self) -> None:
+        scan = scan_markdown(self.CONTENT)
+        assert scan.references == extract_agent_references(self.CONTENT)
+        assert scan.references == [
+            ".agent/start-here.md",
+            ".agent/project/context.md",
+            ".agent/core/core-rules.md",
+        ]
+
+    def test_without_frontmatter(self) -> None:
+        content = "---\n# Title\n---\n"
+        scan = scan_markdown(content, frontmatter=False)
+        assert scan.frontmatter == {}
+        assert scan.body == content
+        assert scan.project_name == "Title"
+
+    def test_body_starting_mid_line(self) -> None:
+        scan = scan_markdown("---\nkey: v\n---# Inline\r\n## A\r\n- one\r\n")
+        assert scan.project_name == "Inline"
+        assert scan.sections == {"A": "- one"}
+
+    def test_duplicate_heading_keeps_last_body(self) -> None:
+        scan = scan_markdown("## Rules\n- a\n## Rules\n- b\n", frontmatter=False)
+        assert scan.sections == {"Rules": "- b"}
+        assert scan.rules == ["b"]
+
+
+
+class TestParsedInstructionViews:
+    CONTENT = "# App\r\n\r\n## Rules\r\n- One\r\n-  Two \r\n\r\n## Notes\r\nSee .agent/start-here.md\r\n"
+
+    def test_views_share_the_source(self, project_with_agent: Path) -> None:
+        path = project_with_agent / "CLAUDE.md"
+        path.write_bytes(self.CONTENT.encode("utf-8"))
+        parsed = ClaudeParser().parse_file(path, project_with_agent)
+        assert not hasattr(parsed, "__dict__")
+        for view in (parsed.sections, parsed.rules, parsed.referenced_files):
+            assert view.source is parsed.raw_content
+        assert parsed.sections == {"Rules": "- One\n-  Two", "Notes": "See .agent/start-here.md"}
+        assert parsed.rules == ["One", "Two"]
+        assert parsed.rules[-1:] == ["Two"]
+        assert parsed.referenced_files == [".agent/start-here.md"]
+
+    def test_parse_cache_round_trip(self, project_with_agent: Path) -> None:
+        path = project_with_agent / "CLAUDE.md"
+        path.write_bytes(self.CONTENT.encode("utf-8"))
+        parsed = ClaudeParser().parse_file(path, project_with_agent)
+        os.utime(path, (time.time() - 60,) * 2)
+        cache = ParseCache(project_with_agent)
+        cache.put("CLAUDE.md", "v", parsed)
+        cache.save()
+        cached = ParseCache(project_with_agent).get("CLAUDE.md", "v")
+        assert cached == parsed
+        assert cached.sections.source is cached.raw_content
+        assert cached.rules.source is cached.raw_content
+
+
 # ---------------------------------------------------------------------------
 # CursorParser
 # ---------------------------------------------------------------------------
@@ -204,6 +290,44 @@ class TestGeminiParser:
         assert any("start-here" in i for i in parsed.imports)
 
 
+    def test_import_cycle_and_nested_imports(self, project_with_agent: Path) -> None:
+        project = project_with_agent / ".agent" / "project"
+        (project / "a.md").write_text("@.agent/project/b.md\n", encoding="utf-8")
+        (project / "b.md").write_text("@.agent/project/a.md\n@.agent/project/c.md\n", encoding="utf-8")
+        gemini = project_with_agent / "GEMINI.md"
+        gemini.write_text("@.agent/project/a.md\n", encoding="utf-8")
+        parsed = GeminiParser().parse_file(gemini, project_with_agent)
+        assert parsed.referenced_files == [
+            ".agent/project/a.md",
+            ".agent/project/b.md",
+            ".agent/project/c.md",
+        ]
+
+    def test_import_graph_reads_shared_imports_once(self, project_with_agent: Path) -> None:
+        start = project_with_agent / ".agent" / "start-here.md"
+        start.write_text("@.agent/project/context.md\n", encoding="utf-8")
+        parser = GeminiParser()
+        for name in ("one", "two", "three"):
+            path = project_with_agent / name / "GEMINI.md"
+            path.parent.mkdir()
+            path.write_text("@.agent/start-here.md\n", encoding="utf-8")
+            parsed = parser.parse_file(path, project_with_agent)
+            assert ".agent/project/context.md" in parsed.referenced_files
+        assert parser.import_graph.reads == 2  # start-here.md and context.md
+        start.write_text("@.agent/project/other.md\n", encoding="utf-8")
+        os.utime(start, ns=(0, 0))  # a new stat even on coarse timestamps
+        parsed = parser.parse_file(project_with_agent / "one" / "GEMINI.md", project_with_agent)
+        assert parsed.referenced_files[-1] == ".agent/project/other.md"
+        assert parser.import_graph.reads == 3
+
+    def test_import_depth_limit(self, project_with_agent: Path) -> None:
+        for i in range(7):
+            (project_with_agent / f"d{i}.md").write_text(f"@d{i + 1}.md\n", encoding="utf-8")
+        graph = GeminiParser().import_graph
+        assert graph.closure(project_with_agent, ["d0.md"]) == [f"d{i}.md" for i in range(5)]
+        assert graph.reads == 4
+
+
 # ---------------------------------------------------------------------------
 # HybridParser
 # ---------------------------------------------------------------------------
@@ -226,3 +350,177 @@ class TestHybridParser:
     def test_parse_tool_unknown(self, project_with_agent: Path) -> None:
         with pytest.raises(ValueError, match="Unknown tool"):
             HybridParser().parse_tool(project_with_agent, "unknown")
+
+    def test_detect_all_scans_each_directory_once(self, project_with_agent: Path) -> None:
+        from cokodo_agent.generator import generate_adapters_for_tools
+        agent_dir = project_with_agent / ".agent"
+        generate_adapters_for_tools(project_with_agent, agent_dir, ["cursor", "claude", "copilot", "gemini"])
+        scanned: list[str] = []
+        real_scandir = os.scandir
+
+        def counting_scandir(path):
+            scanned.append(str(path))
+            return real_scandir(path)
+
+        with patch("cokodo_agent.parser.snapshot.os.scandir", counting_scandir):
+            parsed = HybridParser().parse_all(project_with_agent)
+        assert len(parsed) >= 4
+        assert len(scanned) == len(set(scanned))
+        # Directories absent from their parent listing are never scanned
+        assert not any(".github" in p for p in scanned)
+
+
+
+    def test_parse_all_parallel_keeps_order(self, project_with_agent: Path) -> None:
+        rules_dir = project_with_agent / ".claude" / "rules"
+        rules_dir.mkdir(parents=True)
+        for i in range(20):
+            (rules_dir / f"rule-{i:02d}.md").write_text(f"# Rule {i}\n", encoding="utf-8")
+        (project_with_agent / "AGENTS.md").write_text("# Agents\n", encoding="utf-8")
+        serial = HybridParser().parse_all(project_with_agent)
+        threaded = HybridParser(jobs=4).parse_all(project_with_agent)
+        with ThreadPoolExecutor(3) as pool:
+            pooled = HybridParser().parse_all(project_with_agent, executor=pool)
+        assert [p.source_path for p in serial][:2] == [
+            ".claude/rules/rule-00.md",
+            ".claude/rules/rule-01.md",
+        ]
+        assert threaded == serial
+        assert pooled == serial
+
+
+    def test_detect_recursive(self, project_with_agent: Path) -> None:
+        root = project_with_agent
+        (root / "CLAUDE.md").write_text("# Root\n", encoding="utf-8")
+        for rel in ("packages/a/CLAUDE.md", "packages/b/AGENTS.md", "packages/b/deep/x/GEMINI.md"):
+            (root / rel).parent.mkdir(parents=True, exist_ok=True)
+            (root / rel).write_text("# Pkg\n", encoding="utf-8")
+        (root / "packages" / "a" / ".cursor" / "rules").mkdir(parents=True)
+        (root / "packages" / "a" / ".cursor" / "rules" / "r.mdc").write_text("x", encoding="utf-8")
+        (root / "node_modules" / "dep").mkdir(parents=True)
+        (root / "node_modules" / "dep" / "CLAUDE.md").write_text("# Dep\n", encoding="utf-8")
+        (root / "ignored").mkdir()
+        (root / "ignored" / "AGENTS.md").write_text("# Ignored\n", encoding="utf-8")
+        (root / ".gitignore").write_text("ignored/\n", encoding="utf-8")
+
+        found = dict(HybridParser().detect_recursive(root))
+        assert list(found) == ["", "packages/a", "packages/b", "packages/b/deep/x"]
+        assert [f.path for f in found["packages/a"]["cursor"]] == [".cursor/rules/r.mdc"]
+        assert list(found["packages/b"]) == ["copilot"]
+
+        shallow = [rel for rel, _ in HybridParser().detect_recursive(root, max_depth=2)]
+        assert shallow == ["", "packages/a", "packages/b"]
+
+
+# ---------------------------------------------------------------------------
+# ParseCache
+# ---------------------------------------------------------------------------
+
+class TestParseCache:
+    @staticmethod
+    def age(*paths: Path) -> None:
+        """Backdate mtimes so cached stat data is trusted."""
+        old = time.time() - 60
+        for path in paths:
+            os.utime(path, (old, old))
+
+    @staticmethod
+    def parse(root: Path) -> tuple[list[ParsedInstruction], int]:
+        parser = HybridParser(use_cache=True)
+        with patch.object(ParseCache, "save", autospec=True, side_effect=ParseCache.save) as save:
+            parsed = parser.parse_all(root)
+        return parsed, save.call_args[0][0].hits
+
+    @pytest.fixture()
+    def root(self, project_with_agent: Path) -> Path:
+        (project_with_agent / "CLAUDE.md").write_text(
+            "# App\n\n## Rules\n- One\n", encoding="utf-8"
+        )
+        (project_with_agent / "GEMINI.md").write_text(
+            "# App\n\n@.agent/project/context.md\n", encoding="utf-8"
+        )
+        self.age(*project_with_agent.rglob("*"))
+        return project_with_agent
+
+    def test_unchanged_files_are_not_reparsed(self, root: Path) -> None:
+        first, hits = self.parse(root)
+        assert hits == 0
+        with patch.object(ClaudeParser, "parse_file", side_effect=AssertionError):
+            with patch.object(GeminiParser, "parse_file", side_effect=AssertionError):
+                second, hits = self.parse(root)
+        assert hits == 2
+        assert second == first
+
+    def test_changed_file_is_reparsed(self, root: Path) -> None:
+        self.parse(root)
+        (root / "CLAUDE.md").write_text("# Renamed\n", encoding="utf-8")
+        self.age(root / "CLAUDE.md")
+        parsed, hits = self.parse(root)
+        assert hits == 1
+        assert {p.project_name for p in parsed if p.tool_name == "claude"} == {"Renamed"}
+
+    def test_spec_version_change_invalidates(self, root: Path) -> None:
+        self.parse(root)
+        changed = {**IDE_SPEC_VERSIONS["claude"], "spec_version": "2099-01"}
+        with patch.dict(IDE_SPEC_VERSIONS, {"claude": changed}):
+            parsed, hits = self.parse(root)
+        assert hits == 1
+        assert {p.ide_spec_version for p in parsed if p.tool_name == "claude"} == {"2099-01"}
+
+    def test_gemini_import_change_invalidates(self, root: Path) -> None:
+        self.parse(root)
+        context = root / ".agent" / "project" / "context.md"
+        context.write_text("@.agent/project/extra.md\n", encoding="utf-8")
+        self.age(context)
+        parsed, hits = self.parse(root)
+        assert hits == 1
+        gemini = next(p for p in parsed if p.tool_name == "gemini")
+        assert ".agent/project/extra.md" in gemini.referenced_files
+
+
+# ---------------------------------------------------------------------------
+# DirectorySnapshot
+# ---------------------------------------------------------------------------
+
+class TestDirectorySnapshot:
+    def test_exists_glob_rglob(self, project_with_agent: Path) -> None:
+        rules = project_with_agent / ".claude" / "rules"
+        (rules / "sub").mkdir(parents=True)
+        (rules / "b.md").write_text("b", encoding="utf-8")
+        (rules / "sub" / "a.md").write_text("a", encoding="utf-8")
+        (rules / "notes.txt").write_text("n", encoding="utf-8")
+        snapshot = DirectorySnapshot(project_with_agent)
+        assert snapshot.exists(".claude/rules/b.md")
+        assert not snapshot.exists(".claude/rules/missing.md")
+        assert snapshot.is_dir(".claude/rules/sub")
+        assert snapshot.glob(".claude/rules", "*.md") == [".claude/rules/b.md"]
+        assert snapshot.rglob(".claude/rules", "*.md") == [
+            ".claude/rules/b.md",
+            ".claude/rules/sub/a.md",
+        ]
+        assert snapshot.glob(".cursor/rules", "*.mdc") == []
+
+    def test_listings_are_not_reread(self, project_with_agent: Path) -> None:
+        snapshot = DirectorySnapshot(project_with_agent)
+        assert not snapshot.exists("CLAUDE.md")
+        (project_with_agent / "CLAUDE.md").write_text("# X", encoding="utf-8")
+        assert not snapshot.exists("CLAUDE.md")
+        assert DirectorySnapshot(project_with_agent).exists("CLAUDE.md")
+
+    def test_case_insensitive_filesystem(self, project_with_agent: Path) -> None:
+        (project_with_agent / "claude.md").write_text("# X", encoding="utf-8")
+        (project_with_agent / ".Cursor").mkdir()
+
+        # Case-sensitive filesystem (this one): differently cased names are not found
+        snapshot = DirectorySnapshot(project_with_agent)
+        assert not snapshot.exists("CLAUDE.md")
+        assert not snapshot.is_dir(".cursor")
+
+        def exists_ignoring_case(path: Path) -> bool:
+            return any(p.name.casefold() == path.name.casefold() for p in path.parent.iterdir())
+
+        with patch.object(Path, "exists", exists_ignoring_case):
+            snapshot = DirectorySnapshot(project_with_agent)
+            assert snapshot.exists("CLAUDE.md")
+            assert snapshot.is_dir(".cursor")
+            assert not snapshot.exists("GEMINI.md")
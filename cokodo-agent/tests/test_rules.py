@@ -0,0 +1,113 @@
+"""Tests for the lint rule registry."""
+
+import json
+import tempfile
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from cokodo_agent import rules
+from cokodo_agent.linter import BUILTIN_RULES, LintResult, ProtocolLinter
+from cokodo_agent.rules import LintRule, load_plugin_rules
+
+
+def no_todo(linter, entry):
+    if "TODO" in entry.read_text():
+        yield LintResult("no-todo", False, "Unresolved TODO", entry.rel_path)
+
+
+def file_count(linter):
+    return [LintResult("file-count", True, f"{len(linter.index.files)} files")]
+
+
+RULES = [LintRule("no-todo", no_todo, per_file=True, suffix=".md")]
+COUNT_RULE = LintRule("file-count", file_count)
+
+
+@pytest.fixture
+def agent_dir():
+    """Create a minimal .agent tree with one TODO."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        agent_dir = Path(tmpdir) / ".agent"
+        (agent_dir / "core").mkdir(parents=True)
+        (agent_dir / "start-here.md").write_text("# Start Here\n", encoding="utf-8")
+        (agent_dir / "core" / "a.md").write_text("TODO: write\n", encoding="utf-8")
+        (agent_dir / "core" / "b.md").write_text("Done\n", encoding="utf-8")
+        (agent_dir / "core" / "c.txt").write_text("TODO\n", encoding="utf-8")
+        (agent_dir / "manifest.json").write_text(json.dumps({"version": "3.0.0"}))
+        yield agent_dir
+
+
+@pytest.fixture
+def plugins():
+    """Install fake entry points for the duration of a test."""
+
+    def install(*values):
+        eps = [
+            EntryPoint(f"plugin-{i}", value, rules.ENTRY_POINT_GROUP)
+            for i, value in enumerate(values)
+        ]
+        load_plugin_rules.cache_clear()
+        return patch.object(rules, "entry_points", return_value=eps)
+
+    yield install
+    load_plugin_rules.cache_clear()
+
+
+class TestRegistry:
+    """Test rule registration and dispatch."""
+
+    def test_per_file_rule(self, agent_dir):
+        """Test a per-file rule runs on files with its suffix, serially and on a pool."""
+        for jobs in [1, 4]:
+            linter = ProtocolLinter(agent_dir, rules=[*BUILTIN_RULES, *RULES], jobs=jobs)
+            results = [r for r in linter.lint_all() if r.rule == "no-todo"]
+
+            assert [r.file for r in results] == ["core/a.md"]
+
+    def test_per_file_rule_honours_changed_scope(self, agent_dir):
+        """Test a per-file rule only sees files in the changed set."""
+        linter = ProtocolLinter(agent_dir, rules=RULES, changed={"core/b.md"})
+
+        assert linter.lint_all() == []
+
+    def test_cross_file_rule_and_order(self, agent_dir):
+        """Test rules report in registration order; duplicate names keep the first."""
+        shadow = LintRule("file-count", lambda linter: [])
+        linter = ProtocolLinter(agent_dir, rules=[COUNT_RULE, *RULES, shadow])
+
+        assert [r.rule for r in linter.lint_all()] == ["file-count", "no-todo"]
+        assert linter.lint_rule("file-count")[-1].message == "5 files"
+
+    def test_lint_file_runs_per_file_rules(self, agent_dir):
+        """Test lint_file applies per-file rules to the one file."""
+        linter = ProtocolLinter(agent_dir, rules=[*BUILTIN_RULES, *RULES])
+
+        assert [r.rule for r in linter.lint_file("core/a.md") if r.rule == "no-todo"] == ["no-todo"]
+        assert linter.lint_file("core/c.txt") == []
+
+
+class TestPlugins:
+    """Test entry point loading."""
+
+    def test_plugins_are_appended(self, agent_dir, plugins):
+        """Test entry point rules (single or lists) run after the built-ins."""
+        with plugins("tests.test_rules:RULES", "tests.test_rules:COUNT_RULE"):
+            names = list(ProtocolLinter(agent_dir).rules)
+
+        assert names[: len(BUILTIN_RULES)] == [r.name for r in BUILTIN_RULES]
+        assert names[len(BUILTIN_RULES) :] == ["no-todo", "file-count"]
+
+    def test_broken_plugin_is_reported(self, agent_dir, plugins):
+        """Test a plugin that fails to load becomes a failing result."""
+        with plugins("tests.missing_module:RULES", "tests.test_rules:no_todo"):
+            linter = ProtocolLinter(agent_dir)
+            results = [r for r in linter.lint_all() if r.rule.startswith("plugin-")]
+
+        assert [(r.rule, r.passed) for r in results] == [
+            ("plugin-0", False),
+            ("plugin-1", False),
+        ]
+        assert "expected LintRule" in results[1].message
@@ -0,0 +1,97 @@
+"""Tests for the multi-pattern scanner."""
+
+import re
+
+import pytest
+
+from cokodo_agent.scanner import PatternScanner, ScanMatch, bytes_pattern
+
+
+class TestPatternScanner:
+    """Test PatternScanner."""
+
+    def test_reports_which_pattern_hit(self):
+        """Test each match carries the index and label of its pattern."""
+        scanner = PatternScanner([(r"foo\d", "foo"), (r"bar", "bar")])
+
+        matches = list(scanner.scan("bar foo1 x foo2"))
+
+        assert matches == [
+            ScanMatch(1, "bar", 0, 3, "bar"),
+            ScanMatch(0, "foo", 4, 8, "foo1"),
+            ScanMatch(0, "foo", 11, 15, "foo2"),
+        ]
+
+    def test_flags_and_inner_groups(self):
+        """Test flags apply to every pattern and inner groups do not confuse matching."""
+        scanner = PatternScanner(
+            [(r"^#\s+(\w+)$", "title"), (r"local(host):\d+", "host")],
+            re.MULTILINE | re.IGNORECASE,
+        )
+
+        matches = list(scanner.scan("# Name\nLOCALHOST:80\n"))
+
+        assert [(m.label, m.text) for m in matches] == [
+            ("title", "# Name"),
+            ("host", "LOCALHOST:80"),
+        ]
+
+    def test_earliest_pattern_wins_at_same_position(self):
+        """Test table order breaks ties between patterns matching at one position."""
+        scanner = PatternScanner([(r"ab", "first"), (r"abc", "second")])
+        assert [m.label for m in scanner.scan("abc")] == ["first"]
+
+    def test_scan_each_reports_overlapping_matches(self):
+        """Test scan_each reports every match of each pattern, even where they overlap."""
+        scanner = PatternScanner([(r"[A-Z]:/", "windows"), (r"/Users/\w+/", "macos")])
+        text = "C:/Users/bob/ and /Users/amy/"
+
+        assert [m.text for m in scanner.scan(text)] == ["C:/", "/Users/amy/"]
+        assert list(scanner.scan_each(text)) == [
+            ScanMatch(0, "windows", 0, 3, "C:/"),
+            ScanMatch(1, "macos", 2, 13, "/Users/bob/"),
+            ScanMatch(1, "macos", 18, 29, "/Users/amy/"),
+        ]
+        assert list(scanner.scan_each(text.encode())) == list(scanner.scan_each(text))
+        assert list(scanner.scan_each("nothing here")) == []
+
+    def test_empty_table(self):
+        """Test a scanner without patterns never matches."""
+        assert list(PatternScanner([]).scan("anything")) == []
+
+    def test_bytes_input(self):
+        """Test bytes are scanned with byte offsets and decoded match text."""
+        scanner = PatternScanner(
+            [(r"/home/\w+/", "home"), (r"项目概述", "overview"), (r"a.c", "dot")], re.IGNORECASE
+        )
+        data = "项目概述 /HOME/josé/ aéc".encode()
+
+        matches = list(scanner.scan(data))
+
+        assert [(m.label, m.text) for m in matches] == [
+            ("overview", "项目概述"),
+            ("home", "/HOME/josé/"),
+            ("dot", "aéc"),
+        ]
+        assert data[matches[1].start : matches[1].end] == "/HOME/josé/".encode()
+
+    def test_bytes_fallback(self):
+        """Test patterns without a bytes equivalent still scan bytes (decoded)."""
+        scanner = PatternScanner([(r"[éè]+", "accent")])
+
+        assert scanner.bytes_regex is None
+        assert [m.text for m in scanner.scan("café".encode())] == ["é"]
+        assert [m.pattern_index for m in scanner.scan_each("café".encode())] == [0]
+
+    def test_bytes_pattern(self):
+        """Test translation of word classes, dots and non-ASCII literals."""
+        assert bytes_pattern(r"[\w-]\W") == rb"[\w\x80-\xff-][^\w\x80-\xff]"
+        assert bytes_pattern(r"[]x].") == rb"[]x](?:[^\n\x80-\xff]|[\xc0-\xff][\x80-\xbf]*)"
+        assert bytes_pattern("é+") == "(?:é)+".encode()
+        with pytest.raises(ValueError):
+            bytes_pattern("[é]")
+
+    def test_invalid_pattern(self):
+        """Test an invalid pattern is rejected at construction."""
+        with pytest.raises(re.error):
+            PatternScanner([(r"ok", "ok"), (r"(unclosed", "bad")])
@@ -0,0 +1,230 @@
+"""Tests for the lint language server."""
+
+import io
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from cokodo_agent.server import LanguageServer, LintSession, _to_offset
+
+
+@pytest.fixture
+def project():
+    """Create a project root with a small .agent tree."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        agent_dir = root / ".agent"
+        (agent_dir / "core").mkdir(parents=True)
+        (agent_dir / "start-here.md").write_text(
+            "# Start Here\n\nSee [rules](core/rules.md#naming).\n", encoding="utf-8"
+        )
+        (agent_dir / "core" / "rules.md").write_text("# Rules\n\n## Naming\n", encoding="utf-8")
+        (agent_dir / "manifest.json").write_text(json.dumps({"version": "3.0.0"}))
+        yield root
+
+
+def frame(message: dict) -> bytes:
+    body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf-8")
+    return f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+
+
+def read_frames(data: bytes) -> list[dict]:
+    messages = []
+    while data:
+        header, _, data = data.partition(b"\r\n\r\n")
+        length = int(header.split(b":")[1])
+        messages.append(json.loads(data[:length]))
+        data = data[length:]
+    return messages
+
+
+def run_server(root: Path, messages: list[dict]) -> tuple[int, list[dict]]:
+    reader = io.BytesIO(b"".join(frame(m) for m in messages))
+    writer = io.BytesIO()
+    code = LanguageServer(reader, writer).serve()
+    return code, read_frames(writer.getvalue())
+
+
+def diagnostics_for(messages: list[dict], uri: str) -> list[list[dict]]:
+    return [
+        m["params"]["diagnostics"]
+        for m in messages
+        if m.get("method") == "textDocument/publishDiagnostics" and m["params"]["uri"] == uri
+    ]
+
+
+class TestLanguageServer:
+    """Test the LSP message flow."""
+
+    def test_edit_publishes_diagnostics(self, project):
+        """Test an incremental edit is linted and reported at the right position."""
+        rules = project / ".agent" / "core" / "rules.md"
+        uri = rules.as_uri()
+        text = rules.read_text(encoding="utf-8")
+        code, out = run_server(
+            project,
+            [
+                {"id": 1, "method": "initialize", "params": {"rootUri": project.as_uri()}},
+                {"method": "initialized", "params": {}},
+                {
+                    "method": "textDocument/didOpen",
+                    "params": {
+                        "textDocument": {
+                            "uri": uri,
+                            "languageId": "markdown",
+                            "version": 1,
+                            "text": text,
+                        }
+                    },
+                },
+                {
+                    "method": "textDocument/didChange",
+                    "params": {
+                        "textDocument": {"uri": uri, "version": 2},
+                        "contentChanges": [
+                            {
+                                "range": {
+                                    "start": {"line": 1, "character": 0},
+                                    "end": {"line": 1, "character": 0},
+                                },
+                                "text": "Use localhost:8080.",
+                            }
+                        ],
+                    },
+                },
+                {"id": 2, "method": "shutdown"},
+                {"method": "exit"},
+            ],
+        )
+
+        assert code == 0
+        assert out[0]["id"] == 1
+        assert out[0]["result"]["capabilities"]["textDocumentSync"]["change"] == 2
+        published = diagnostics_for(out, uri)
+        assert published[-2] == []  # didOpen: clean
+        [diagnostic] = published[-1]
+        assert diagnostic["code"] == "engine-pollution"
+        assert diagnostic["range"]["start"] == {"line": 1, "character": 4}
+        assert out[-1] == {"jsonrpc": "2.0", "id": 2, "result": None}
+
+    def test_linking_files_are_relinted(self, project):
+        """Test removing a heading re-publishes the file whose anchor link broke."""
+        rules = project / ".agent" / "core" / "rules.md"
+        start = (project / ".agent" / "start-here.md").as_uri()
+        code, out = run_server(
+            project,
+            [
+                {"id": 1, "method": "initialize", "params": {"rootUri": project.as_uri()}},
+                {
+                    "method": "textDocument/didChange",
+                    "params": {
+                        "textDocument": {"uri": rules.as_uri(), "version": 2},
+                        "contentChanges": [{"text": "# Rules\n"}],
+                    },
+                },
+                {"method": "exit"},
+            ],
+        )
+
+        assert code == 1  # exit without shutdown
+        [diagnostics] = diagnostics_for(out, start)
+        assert [d["code"] for d in diagnostics] == ["internal-links"]
+        assert "#naming" in diagnostics[0]["message"]
+
+    def test_request_before_initialize(self, project):
+        """Test requests other than initialize are rejected until initialized."""
+        _, out = run_server(project, [{"id": 1, "method": "shutdown"}, {"method": "exit"}])
+
+        assert out[0]["error"]["code"] == -32002
+
+    def test_bad_messages_do_not_stop_the_server(self, project):
+        """Test malformed frames and failing handlers are answered or logged, not fatal."""
+        uri = (project / ".agent" / "start-here.md").as_uri()
+        reader = io.BytesIO(
+            frame({"id": 1, "method": "initialize", "params": {"rootUri": project.as_uri()}})
+            + b"Content-Length: 5\r\n\r\n{oops"
+            + b"Content-Length: 2\r\n\r\n\xff\xfe"
+            + frame({"method": "textDocument/didOpen", "params": {"textDocument": {"uri": uri}}})
+            + frame({"method": "textDocument/didChange", "params": "not a dict"})
+            + frame({"id": 2, "method": "shutdown"})
+            + frame({"method": "exit"})
+        )
+        writer = io.BytesIO()
+
+        code = LanguageServer(reader, writer).serve()
+
+        out = read_frames(writer.getvalue())
+        assert code == 0
+        errors = [m["error"]["code"] for m in out if "error" in m]
+        assert errors == [-32700, -32700]
+        logged = [m["params"]["message"] for m in out if m.get("method") == "window/logMessage"]
+        assert len(logged) == 4
+        assert "textDocument/didOpen failed: KeyError" in logged[2]
+        assert out[-1] == {"jsonrpc": "2.0", "id": 2, "result": None}
+
+    def test_non_utf8_document(self, project):
+        """Test findings in a latin-1 file on disk are published, and it can be edited."""
+        notes = project / ".agent" / "core" / "notes.md"
+        notes.write_bytes(b"# Notes\n\xe9t\xe9 on localhost:8080\n")
+        uri = notes.as_uri()
+        position = {"line": 0, "character": 7}
+        change = {"range": {"start": position, "end": position}, "text": "!"}
+        messages = [
+            {"id": 1, "method": "initialize", "params": {"rootUri": project.as_uri()}},
+            {"method": "initialized", "params": {}},
+            {
+                "method": "textDocument/didChange",
+                "params": {"textDocument": {"uri": uri}, "contentChanges": [change]},
+            },
+            {"method": "exit"},
+        ]
+
+        _, out = run_server(project, messages)
+
+        assert not [m for m in out if m.get("method") == "window/logMessage"]
+        initial, changed = diagnostics_for(out, uri)
+        for diagnostics in (initial, changed):
+            (diagnostic,) = diagnostics
+            assert diagnostic["message"] == "Found Hardcoded localhost: localhost:8080"
+            assert diagnostic["range"]["start"] == {"line": 1, "character": 7}
+
+    def test_change_to_unopened_document_edits_disk_contents(self, project):
+        """Test an incremental didChange without didOpen applies to the on-disk text."""
+        uri = (project / ".agent" / "core" / "rules.md").as_uri()
+        position = {"line": 2, "character": 3}
+        change = {"range": {"start": position, "end": position}, "text": "Good "}
+        messages = [
+            {"id": 1, "method": "initialize", "params": {"rootUri": project.as_uri()}},
+            {
+                "method": "textDocument/didChange",
+                "params": {"textDocument": {"uri": uri}, "contentChanges": [change]},
+            },
+            {"method": "exit"},
+        ]
+        reader = io.BytesIO(b"".join(frame(m) for m in messages))
+        server = LanguageServer(reader, io.BytesIO())
+
+        server.serve()
+
+        assert server.documents["core/rules.md"] == "# Rules\n\n## Good Naming\n"
+
+
+class TestLintSession:
+    """Test LintSession bookkeeping."""
+
+    def test_update_returns_linking_files(self, project):
+        """Test an update re-lints the file and the files linking to it."""
+        session = LintSession(project / ".agent")
+
+        assert session.update("core/rules.md", "# Rules\n") == ["core/rules.md", "start-here.md"]
+        assert session.linter.linked_from("start-here.md") == []
+
+    def test_to_offset_utf16(self):
+        """Test LSP UTF-16 positions map to string offsets past astral characters."""
+        text = "a\U0001f600b\nc"
+
+        assert _to_offset(text, 0, 3, utf16=True) == 2
+        assert _to_offset(text, 0, 3, utf16=False) == 3
+        assert _to_offset(text, 1, 1, utf16=True) == 5
@@ -1,19 +1,27 @@
 """Tests for sync module."""
 
 import json
+import os
 import tempfile
+import time
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
+from cokodo_agent.linter import ProtocolLinter
 from cokodo_agent.sync import (
     DiffResult,
     SyncResult,
+    apply_sync_plan,
+    build_sync_plan,
     diff_protocol,
     get_context_files,
     get_protocol_version,
+    is_up_to_date,
+    load_sync_plan,
     sync_protocol,
+    write_sync_plan,
 )
 
 
@@ -427,3 +435,210 @@ class TestSyncProtocol:
             content = (local_dir / "start-here.md").read_text(encoding="utf-8")
             assert content == "# New Content"
             assert len(result.updated) > 0
+
+
+class TestSyncPlan:
+    """Test plan/apply split for sync."""
+
+    @pytest.fixture
+    def dirs(self):
+        """Create a local .agent and a newer remote protocol."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            local_dir = Path(tmpdir) / "local" / ".agent"
+            local_dir.mkdir(parents=True)
+            (local_dir / "core").mkdir()
+            (local_dir / "start-here.md").write_text("# Old", encoding="utf-8")
+            (local_dir / "core" / "gone.md").write_text("# Gone", encoding="utf-8")
+            (local_dir / "core" / "same.md").write_text("# Same", encoding="utf-8")
+            checksums = ProtocolLinter(local_dir).generate_checksums()
+            (local_dir / "manifest.json").write_text(
+                json.dumps({"version": "3.0.0", "checksums": checksums}), encoding="utf-8"
+            )
+
+            remote_dir = Path(tmpdir) / "remote"
+            remote_dir.mkdir()
+            (remote_dir / "core").mkdir()
+            (remote_dir / "start-here.md").write_text("# New", encoding="utf-8")
+            (remote_dir / "core" / "same.md").write_text("# Same", encoding="utf-8")
+            (remote_dir / "core" / "added.md").write_text("# Added", encoding="utf-8")
+            (remote_dir / "manifest.json").write_text(
+                json.dumps({"version": "3.1.0"}), encoding="utf-8"
+            )
+
+            yield local_dir, remote_dir, Path(tmpdir) / "plan.json"
+
+    @patch("cokodo_agent.sync.get_protocol")
+    def test_build_plan_records_operations(self, mock_get_protocol, dirs):
+        """Test plan records version, hashes and operations."""
+        local_dir, remote_dir, _ = dirs
+        mock_get_protocol.return_value = (remote_dir, "3.1.0")
+
+        plan = build_sync_plan(local_dir, offline=True)
+
+        assert plan["source_version"] == "3.1.0"
+        ops = {op["path"]: op for op in plan["operations"]}
+        assert ops["start-here.md"]["op"] == "modified"
+        assert ops["core/added.md"]["op"] == "added"
+        assert ops["core/added.md"]["local_hash"] is None
+        assert ops["core/gone.md"]["op"] == "removed"
+        assert "core/same.md" not in ops
+
+    @patch("cokodo_agent.sync.get_protocol")
+    def test_apply_plan_without_source(self, mock_get_protocol, dirs):
+        """Test applying a plan writes files and updates manifest without fetching."""
+        local_dir, remote_dir, plan_path = dirs
+        mock_get_protocol.return_value = (remote_dir, "3.1.0")
+        write_sync_plan(build_sync_plan(local_dir, offline=True), plan_path)
+        mock_get_protocol.reset_mock()
+
+        result = apply_sync_plan(local_dir, load_sync_plan(plan_path))
+
+        mock_get_protocol.assert_not_called()
+        assert result.errors == []
+        assert (local_dir / "start-here.md").read_text(encoding="utf-8") == "# New"
+        assert (local_dir / "core" / "added.md").exists()
+        assert not (local_dir / "core" / "gone.md").exists()
+        manifest = json.loads((local_dir / "manifest.json").read_text(encoding="utf-8"))
+        assert manifest["version"] == "3.1.0"
+        assert manifest["checksums"] == ProtocolLinter(local_dir).generate_checksums()
+
+    @patch("cokodo_agent.sync.get_protocol")
+    def test_apply_plan_precondition_failure(self, mock_get_protocol, dirs):
+        """Test apply refuses to write when a touched file changed locally."""
+        local_dir, remote_dir, _ = dirs
+        mock_get_protocol.return_value = (remote_dir, "3.1.0")
+        plan = build_sync_plan(local_dir, offline=True)
+
+        (local_dir / "start-here.md").write_text("# Edited", encoding="utf-8")
+        result = apply_sync_plan(local_dir, plan)
+
+        assert any("changed since the plan" in e for e in result.errors)
+        assert result.updated == []
+        assert (local_dir / "core" / "gone.md").exists()
+
+    @patch("cokodo_agent.sync.get_protocol")
+    def test_apply_plan_ignores_untouched_files(self, mock_get_protocol, dirs):
+        """Test preconditions only cover files the plan touches."""
+        local_dir, remote_dir, _ = dirs
+        mock_get_protocol.return_value = (remote_dir, "3.1.0")
+        plan = build_sync_plan(local_dir, offline=True)
+
+        (local_dir / "core" / "same.md").write_text("# Local tweak", encoding="utf-8")
+        result = apply_sync_plan(local_dir, plan)
+
+        assert result.errors == []
+
+    def test_load_plan_rejects_unsafe_path(self):
+        """Test plans with paths escaping .agent are rejected."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            plan_path = Path(tmpdir) / "plan.json"
+            plan = {
+                "format": 1,
+                "source_version": "3.1.0",
+                "operations": [{"path": "../evil.md", "op": "removed"}],
+            }
+            plan_path.write_text(json.dumps(plan), encoding="utf-8")
+
+            with pytest.raises(ValueError):
+                load_sync_plan(plan_path)
+
+    @pytest.mark.parametrize(
+        "corrupt, message",
+        [
+            ({"encoding": "base64", "content": "not base64!"}, "Invalid content"),
+            ({"encoding": "rot13"}, "unknown encoding"),
+            ({"content": None}, "missing content"),
+            ({"remote_hash": None}, "remote hash"),
+            ({"content": "# Tampered"}, "does not match its hash"),
+        ],
+    )
+    @patch("cokodo_agent.sync.get_protocol")
+    def test_load_plan_rejects_corrupt_entry(self, mock_get_protocol, dirs, corrupt, message):
+        """Test a corrupt operation is rejected when the plan is loaded."""
+        local_dir, remote_dir, plan_path = dirs
+        mock_get_protocol.return_value = (remote_dir, "3.1.0")
+        plan = build_sync_plan(local_dir, offline=True)
+        ops = {op["path"]: op for op in plan["operations"]}
+        ops["start-here.md"].update(corrupt)
+        write_sync_plan(plan, plan_path)
+
+        with pytest.raises(ValueError, match=message):
+            load_sync_plan(plan_path)
+
+
+class TestUpToDateFastPath:
+    """Test the stored-digest fast path of diff_protocol."""
+
+    @staticmethod
+    def _age_tree(root: Path) -> None:
+        """Backdate mtimes so the stat snapshot is not considered racy."""
+        old = time.time() - 60
+        for dir_path, _, file_names in os.walk(root):
+            for name in file_names:
+                os.utime(Path(dir_path) / name, (old, old))
+            os.utime(dir_path, (old, old))
+
+    @pytest.fixture
+    def same_dirs(self):
+        """Create identical local and remote trees at the same version."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            local_dir = Path(tmpdir) / "local" / ".agent"
+            remote_dir = Path(tmpdir) / "remote"
+            for root in (local_dir, remote_dir):
+                (root / "core").mkdir(parents=True)
+                (root / "start-here.md").write_text("# Start", encoding="utf-8")
+                (root / "core" / "rules.md").write_text("# Rules", encoding="utf-8")
+                (root / "manifest.json").write_text(
+                    json.dumps({"version": "3.1.0"}), encoding="utf-8"
+                )
+            self._age_tree(local_dir)
+            yield local_dir, remote_dir
+
+    @patch("cokodo_agent.sync.get_protocol")
+    def test_second_diff_skips_hashing(self, mock_get_protocol, same_dirs):
+        """Test an unchanged tree is confirmed without re-hashing."""
+        local_dir, remote_dir = same_dirs
+        mock_get_protocol.return_value = (remote_dir, "3.1.0")
+
+        diff_protocol(local_dir, offline=True)
+
+        with patch.object(ProtocolLinter, "generate_checksums", side_effect=AssertionError):
+            results, _, _ = diff_protocol(local_dir, offline=True)
+
+        assert results
+        assert all(r.status == "unchanged" for r in results)
+
+    @patch("cokodo_agent.sync.get_protocol")
+    def test_modified_file_falls_back_to_full_diff(self, mock_get_protocol, same_dirs):
+        """Test a changed locked file invalidates the fast path."""
+        local_dir, remote_dir = same_dirs
+        mock_get_protocol.return_value = (remote_dir, "3.1.0")
+        diff_protocol(local_dir, offline=True)
+
+        (local_dir / "core" / "rules.md").write_text("# Rules, edited", encoding="utf-8")
+        results, _, _ = diff_protocol(local_dir, offline=True)
+
+        assert [r.path for r in results if r.status == "modified"] == ["core/rules.md"]
+
+    @patch("cokodo_agent.sync.get_protocol")
+    def test_added_locked_file_invalidates(self, mock_get_protocol, same_dirs):
+        """Test a new file in a locked directory is caught by the directory stats."""
+        local_dir, remote_dir = same_dirs
+        mock_get_protocol.return_value = (remote_dir, "3.1.0")
+        results, _, _ = diff_protocol(local_dir, offline=True)
+        checksums = {r.path: r.remote_hash for r in results}
+
+        (local_dir / "core" / "extra.md").write_text("# Extra", encoding="utf-8")
+
+        assert not is_up_to_date(local_dir, "3.1.0", checksums)
+
+    @patch("cokodo_agent.sync.get_protocol")
+    def test_version_mismatch_skips_fast_path(self, mock_get_protocol, same_dirs):
+        """Test a different remote version never uses the stored state."""
+        local_dir, remote_dir = same_dirs
+        mock_get_protocol.return_value = (remote_dir, "3.1.0")
+        results, _, _ = diff_protocol(local_dir, offline=True)
+        checksums = {r.path: r.remote_hash for r in results}
+
+        assert is_up_to_date(local_dir, "3.1.0", checksums)
+        assert not is_up_to_date(local_dir, "3.2.0", checksums)
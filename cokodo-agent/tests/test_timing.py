@@ -0,0 +1,122 @@
+"""Tests for timing spans, recording and profiling."""
+
+import json
+import pstats
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from cokodo_agent import timing
+from cokodo_agent.fsindex import FileIndex, ReadStats, record_reads
+from cokodo_agent.timing import profiling, recording, span, timed_iter, traced
+
+
+@pytest.fixture
+def tmp_dir():
+    """Create a temporary directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+class TestSpans:
+    """Test span, traced and timed_iter."""
+
+    def test_span_without_recorder(self):
+        """Test spans are no-ops (and counters are dropped) when nothing records."""
+        with span("idle") as current:
+            current.add(files=1)
+
+        assert timing.current() is None
+
+    def test_recording_aggregates_by_name(self):
+        """Test calls, time and counters are summed per span name."""
+        with recording() as recorder:
+            for _ in range(2):
+                with span("phase", tool="x") as current:
+                    current.add(bytes_read=10, files=1, cache_hits=2)
+            with span("other"):
+                pass
+
+        phase = recorder.phases["phase"]
+        assert (phase.calls, phase.bytes_read, phase.files, phase.cache_hits) == (2, 20, 2, 4)
+        assert phase.wall >= 0
+        assert [e["name"] for e in recorder.events] == ["phase", "phase", "other"]
+        assert recorder.events[0]["args"]["tool"] == "x"
+        assert timing.current() is None
+
+    def test_file_index_reads_are_counted(self, tmp_dir):
+        """Test bytes and files read through FileIndex are attributed to the open span."""
+        (tmp_dir / "a.md").write_text("12345", encoding="utf-8")
+        index = FileIndex(tmp_dir)
+
+        with recording() as recorder:
+            with span("read"):
+                index.get("a.md").read_bytes()
+
+        assert recorder.phases["read"].bytes_read == 5
+        assert recorder.phases["read"].files == 1
+
+    def test_nested_record_reads_reach_the_recorder(self, tmp_dir):
+        """Test reads inside another record_reads() (e.g. lint --profile) still count."""
+        (tmp_dir / "a.md").write_text("123", encoding="utf-8")
+        index = FileIndex(tmp_dir)
+
+        with recording() as recorder:
+            with span("outer"):
+                with record_reads(ReadStats()):
+                    index.get("a.md").read_bytes()
+
+        assert recorder.phases["outer"].bytes_read == 3
+
+    def test_traced(self):
+        """Test traced runs every call in a span and keeps the return value."""
+
+        @traced("double")
+        def double(value: int) -> int:
+            return value * 2
+
+        with recording() as recorder:
+            assert double(2) == 4
+
+        assert double.__name__ == "double"
+        assert recorder.phases["double"].calls == 1
+
+    def test_timed_iter_excludes_consumer_time(self):
+        """Test timed_iter times producing items, not the work between them."""
+        with recording() as recorder:
+            items = list(timed_iter("produce", iter([1, 2, 3])))
+            for _ in timed_iter("produce-slow-consumer", iter([1, 2])):
+                time.sleep(0.05)
+
+        assert items == [1, 2, 3]
+        assert recorder.phases["produce"].calls == 1
+        assert recorder.phases["produce-slow-consumer"].wall < 0.05
+
+
+class TestOutputs:
+    """Test trace and profile files."""
+
+    def test_write_trace(self, tmp_dir):
+        """Test spans are written as Chrome trace complete events."""
+        with recording() as recorder:
+            with span("phase", path=tmp_dir):
+                pass
+        trace_path = tmp_dir / "trace.json"
+        recorder.write_trace(trace_path)
+
+        trace = json.loads(trace_path.read_text(encoding="utf-8"))
+        (event,) = trace["traceEvents"]
+        assert event["ph"] == "X"
+        assert event["name"] == "phase"
+        assert {"ts", "dur", "pid", "tid"} <= set(event)
+        assert event["args"]["path"] == str(tmp_dir)
+
+    def test_profiling(self, tmp_dir):
+        """Test profiling dumps pstats-readable data."""
+        profile_path = tmp_dir / "out.prof"
+        with profiling(profile_path):
+            sum(range(1000))
+
+        assert pstats.Stats(str(profile_path)).total_calls > 0
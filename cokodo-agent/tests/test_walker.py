@@ -0,0 +1,106 @@
+"""Tests for .agent discovery in monorepos."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from cokodo_agent.walker import PRUNED_DIRS, IgnoreRules, find_agent_dirs, walk_dirs
+
+
+@pytest.fixture
+def monorepo():
+    """Create a root with several sub-projects, some inside ignored directories."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for rel in [
+            ".agent",
+            "services/api/.agent",
+            "services/web/.agent",
+            "services/web/node_modules/pkg/.agent",
+            "build/out/.agent",
+            "libs/keep/.agent",
+            ".git/modules/x/.agent",
+        ]:
+            (root / rel).mkdir(parents=True)
+        (root / ".gitignore").write_text("node_modules/\n/build\nlibs/*\n!libs/keep\n")
+        yield root
+
+
+class TestFindAgentDirs:
+    """Test find_agent_dirs."""
+
+    def test_prunes_ignored_directories(self, monorepo):
+        """Test ignored and .git directories are skipped, negations re-include."""
+        found = [p.relative_to(monorepo).as_posix() for p in find_agent_dirs(monorepo)]
+
+        assert found == [
+            ".agent",
+            "libs/keep/.agent",
+            "services/api/.agent",
+            "services/web/.agent",
+        ]
+
+    def test_nested_gitignore(self, monorepo):
+        """Test .gitignore files in subdirectories apply relative to their directory."""
+        (monorepo / "services" / ".gitignore").write_text("web\n")
+
+        found = [p.relative_to(monorepo).as_posix() for p in find_agent_dirs(monorepo)]
+
+        assert "services/web/.agent" not in found
+        assert "services/api/.agent" in found
+
+
+class TestWalkDirs:
+    """Test walk_dirs."""
+
+    def test_order_depth_and_pruning(self, monorepo):
+        """Test directories come in name order, pruned names and max_depth are honoured."""
+        (monorepo / "node_modules" / "dep").mkdir(parents=True)
+        (monorepo / "services" / "api" / "src").mkdir()
+
+        walked = [rel for rel, _, _ in walk_dirs(monorepo, max_depth=2, prune=PRUNED_DIRS)]
+
+        assert walked == [
+            "",
+            ".agent",
+            "libs",
+            "libs/keep",
+            "services",
+            "services/api",
+            "services/web",
+        ]
+
+    def test_listing(self, monorepo):
+        """Test each directory is yielded with its (is_dir, is_symlink) listing."""
+        (monorepo / "CLAUDE.md").write_text("# Root\n")
+
+        _, path, listing = next(walk_dirs(monorepo))
+
+        assert path == monorepo
+        assert listing["CLAUDE.md"] == (False, False)
+        assert listing["services"] == (True, False)
+
+
+class TestIgnoreRules:
+    """Test gitignore pattern matching."""
+
+    def test_patterns(self):
+        """Test anchoring, globs, ** and directory-only rules."""
+        rules = IgnoreRules("", ["*.log", "/dist", "docs/**/tmp", "cache/", "!keep.log"])
+
+        assert rules.match("a/b/x.log", is_dir=False) is True
+        assert rules.match("keep.log", is_dir=False) is False
+        assert rules.match("dist", is_dir=True) is True
+        assert rules.match("src/dist", is_dir=True) is None
+        assert rules.match("docs/a/b/tmp", is_dir=True) is True
+        assert rules.match("cache", is_dir=False) is None
+        assert rules.match("x/cache", is_dir=True) is True
+
+    def test_base_directory(self):
+        """Test rules only apply below the .gitignore's own directory."""
+        rules = IgnoreRules("services", ["/web"])
+
+        assert rules.match("services/web", is_dir=True) is True
+        assert rules.match("web", is_dir=True) is None
+        assert rules.match("services/api/web", is_dir=True) is None